@@ -1,9 +1,14 @@
-from importlib.metadata import version as _version
-
-__version__ = _version("pygame-cli")
-
 __project__ = "pygame-cli"
 __author__ = "AntonisPylos"
 __license__ = "MIT"
 
-version = __version__
+
+def __getattr__(name):
+    # importlib.metadata is slow to import, only load it when asked
+    if name in ("__version__", "version"):
+        from importlib.metadata import version as _version
+
+        value = _version("pygame-cli")
+        globals().update(__version__=value, version=value)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,4 @@
-from .cli import cli
-from sys import argv
+from sys import argv, exit
 
 # ASCII Art font: Future
 show_art = lambda: print(
@@ -25,6 +24,15 @@ def main():
         show_art()
         show_help()
         return
+    # Served by `pygame daemon` when it is running
+    from .manager.daemon import forward
+
+    code = forward(argv[1:])
+    if code is not None:
+        exit(code)
+
+    from .cli import cli
+
     cli()
 
 
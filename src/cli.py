@@ -1,15 +1,59 @@
-from . import version
-from .manager import *
+from importlib import import_module
 import argparse
 
+# Subcommand handlers as (manager module, function). A module is only
+# imported when its command runs, so `pygame ls` never loads GitPython.
+COMMANDS = {
+    "new": ("new", "new_project"),
+    "run": ("run", "run_project"),
+    "bench": ("bench", "bench_project"),
+    "explore": ("explore", "explore_projects"),
+    "rename": ("rename", "rename_project"),
+    "delete": ("delete", "delete_project"),
+    "format": ("format", "format_projects"),
+    "build": ("build", "build_project"),
+    "info": ("info", "info_project"),
+    "list": ("list", "list_projects"),
+    "du": ("du", "disk_usage"),
+    "env": ("envs", "manage_envs"),
+    "dedupe": ("dedupe", "dedupe_projects"),
+    "clone": ("clone", "clone_project"),
+    "daemon": ("daemon", "manage_daemon"),
+    "cdn": ("cdn", "manage_cdn"),
+    "serve": ("serve", "serve_directory"),
+    "export": ("archive", "export_project"),
+    "import": ("archive", "import_project"),
+    "trash": ("trash", "manage_trash"),
+}
 
-def cli():
+
+def _command(name):
+    module, function = COMMANDS[name]
+
+    def handler(args):
+        manager = import_module(f".manager.{module}", __package__)
+        return getattr(manager, function)(args)
+
+    return handler
+
+
+class _VersionAction(argparse.Action):
+    # Like action="version", but only looks the version up when asked
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings, dest=dest, default=dest, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from . import version
+
+        parser.exit(message=f"v{version}\n")
+
+
+def cli(argv=None):
     parser = argparse.ArgumentParser(prog="pygame", description="pygame CLI")
     parser.add_argument(
         "-v",
         "--version",
-        action="version",
-        version=f"v{version}",
+        action=_VersionAction,
         help="Show the version of pygame",
     )
 
@@ -46,8 +90,13 @@ def cli():
         action="store_true",
         help="Use terminal input to parse the project data",
     )
+    parser_new.add_argument(
+        "--shared-env",
+        action="store_true",
+        help="Link a venv shared with the projects that have the same requirements",
+    )
 
-    parser_new.set_defaults(func=new_project)
+    parser_new.set_defaults(func=_command("new"))
 
     # run
     parser_run = subparsers.add_parser(
@@ -59,7 +108,89 @@ def cli():
     )
     parser_run.add_argument("--cdn", help="CDN URL for pygbag")
     parser_run.add_argument("--template", help="Template for pygbag")
-    parser_run.set_defaults(func=run_project)
+    parser_run.add_argument(
+        "--port",
+        "-p",
+        type=int,
+        default=8000,
+        help="Port for the web server, use different ports to run several at once (default: 8000)",
+    )
+    parser_run.add_argument(
+        "--reinstall",
+        action="store_true",
+        help="Reinstall requirements even if requirements.txt has not changed",
+    )
+    parser_run.add_argument(
+        "--watch",
+        action="store_true",
+        help="Restart the game when project files change",
+    )
+    parser_run.add_argument(
+        "--reload-assets",
+        action="store_true",
+        help="With --watch, signal the game to reload instead of restarting when only assets/ changed",
+    )
+    parser_run.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the game and write profile.pstats and profile.collapsed to <project>/profile",
+    )
+    parser_run.add_argument(
+        "--frame-stats",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="Print frame time stats on exit, and save them to FILE (.json or .csv) if given",
+    )
+    parser_run.set_defaults(func=_command("run"))
+
+    # bench
+    parser_bench = subparsers.add_parser(
+        "bench", aliases=["benchmark"], help="Benchmark a project without a display"
+    )
+    parser_bench.add_argument("name", help="The name of the project to benchmark")
+    parser_bench.add_argument(
+        "--frames",
+        "-f",
+        type=int,
+        default=600,
+        help="Number of frames to measure, 0 for no limit (default: 600)",
+    )
+    parser_bench.add_argument(
+        "--seconds",
+        "-s",
+        type=float,
+        default=0,
+        help="Stop measuring after this many seconds, 0 for no limit (default: 0)",
+    )
+    parser_bench.add_argument(
+        "--warmup",
+        type=int,
+        default=60,
+        help="Frames to run before measuring (default: 60)",
+    )
+    parser_bench.add_argument(
+        "--uncapped",
+        action="store_true",
+        help="Ignore the framerate cap passed to Clock.tick",
+    )
+    parser_bench.add_argument(
+        "--baseline",
+        action="store_true",
+        help="Save the results as the baseline for --compare",
+    )
+    parser_bench.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare against the baseline and exit with status 1 on a regression",
+    )
+    parser_bench.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Allowed slowdown in percent for --compare (default: 10)",
+    )
+    parser_bench.set_defaults(func=_command("bench"))
 
     # explore
     parser_explore = subparsers.add_parser(
@@ -68,13 +199,13 @@ def cli():
         help="Open the project folder in the file manager",
     )
     parser_explore.add_argument("name", help="The name of the project to explore")
-    parser_explore.set_defaults(func=explore_projects)
+    parser_explore.set_defaults(func=_command("explore"))
 
     # rename
     parser_rename = subparsers.add_parser("rename", help="Rename a project")
     parser_rename.add_argument("old_name", help="The old name of the project")
     parser_rename.add_argument("new_name", help="The new name of the project")
-    parser_rename.set_defaults(func=rename_project)
+    parser_rename.set_defaults(func=_command("rename"))
 
     # delete
     parser_delete = subparsers.add_parser(
@@ -86,7 +217,12 @@ def cli():
         action="store_true",
         help="Do not ask for confirmation before deleting the project",
     )
-    parser_delete.set_defaults(func=delete_project)
+    parser_delete.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the project in the trash so it can be restored",
+    )
+    parser_delete.set_defaults(func=_command("delete"))
 
     # format
     parser_format = subparsers.add_parser(
@@ -97,42 +233,299 @@ def cli():
         action="store_true",
         help="Do not ask for confirmation before deleting all the projects",
     )
-    parser_format.set_defaults(func=format_projects)
+    parser_format.set_defaults(func=_command("format"))
 
     # build
     parser_build = subparsers.add_parser(
         "build", aliases=["make", "compile"], help="Build the project"
     )
-    parser_build.add_argument("name", help="The name of the project to build")
+    parser_build.add_argument(
+        "name", nargs="*", help="The name of the project(s) to build"
+    )
+    parser_build.add_argument(
+        "--all", action="store_true", help="Build every project"
+    )
+    parser_build.add_argument(
+        "--tags",
+        "-t",
+        nargs="*",
+        default=[],
+        help="Build every project with any of these tags",
+    )
+    parser_build.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of projects to build in parallel (default: CPU count)",
+    )
+    parser_build.add_argument(
+        "--output",
+        "-o",
+        help="Output directory (default: ./build, or ./build/<name> for batches)",
+    )
     parser_build.add_argument(
         "--web", "-w", action="store_true", help="Use the web builder"
     )
     parser_build.add_argument("--cdn", help="CDN URL for pygbag")
     parser_build.add_argument("--template", help="Template for pygbag")
-    parser_build.set_defaults(func=build_project)
+    parser_build.add_argument(
+        "--clean",
+        action="store_true",
+        help="Ignore the build cache and rebuild from scratch",
+    )
+    parser_build.add_argument(
+        "--checksum",
+        action="store_true",
+        help="Compare asset contents instead of only size and modification time",
+    )
+    parser_build.add_argument(
+        "--no-link",
+        action="store_true",
+        help="Copy assets into the build instead of hardlinking them",
+    )
+    parser_build.add_argument(
+        "--atlas",
+        action="store_true",
+        help="Pack the PNG images in assets/ into texture atlases",
+    )
+    parser_build.add_argument(
+        "--atlas-size",
+        type=int,
+        default=2048,
+        help="Maximum width and height of an atlas page (default: 2048)",
+    )
+    parser_build.add_argument(
+        "--atlas-padding",
+        type=int,
+        default=2,
+        help="Padding in pixels between packed images (default: 2)",
+    )
+    parser_build.add_argument(
+        "--pack",
+        action="store_true",
+        help="Ship assets/ as a single indexed assets.pak file",
+    )
+    parser_build.add_argument(
+        "--hash-names",
+        action="store_true",
+        help="Give web build files content-hashed names so they can be cached long term",
+    )
+    parser_build.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Write gzip variants of the web build files for `pygame serve`",
+    )
+    parser_build.add_argument(
+        "--brotli",
+        action="store_true",
+        help="With --precompress, also write brotli variants (needs the brotli package)",
+    )
+    parser_build.add_argument(
+        "--local-cdn",
+        action="store_true",
+        help="Use the local CDN cache for web builds (the build then needs 'pygame cdn serve')",
+    )
+    parser_build.add_argument(
+        "--cdn-port",
+        type=int,
+        default=8001,
+        help="Port the build loads the local CDN cache from (default: 8001)",
+    )
+    parser_build.set_defaults(func=_command("build"))
 
     # info
     parser_info = subparsers.add_parser(
         "info", aliases=["metadata"], help="Show the project metadata"
     )
     parser_info.add_argument("name", help="The name of the project")
-    parser_info.set_defaults(func=info_project)
+    parser_info.set_defaults(func=_command("info"))
 
     # list
     parser_list = subparsers.add_parser(
         "list", aliases=["ls"], help="List all projects"
     )
-    parser_list.set_defaults(func=list_projects)
+    parser_list.set_defaults(func=_command("list"))
+
+    # du
+    parser_du = subparsers.add_parser(
+        "du", aliases=["usage"], help="Show the disk usage of the projects"
+    )
+    parser_du.add_argument(
+        "name", nargs="*", help="The name of the project(s) to show (default: all)"
+    )
+    parser_du.add_argument(
+        "--sort",
+        "-s",
+        default="size",
+        choices=["size", "name", "env", "git", "build", "assets", "source"],
+        help="Sort by total size, name or one column (default: size)",
+    )
+    parser_du.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Rescan every folder instead of reusing unchanged results",
+    )
+    parser_du.add_argument(
+        "--jobs", "-j", type=int, help="Number of scanner threads (default: CPU count + 4)"
+    )
+    parser_du.set_defaults(func=_command("du"))
+
+    # env
+    parser_env = subparsers.add_parser(
+        "env", help="Share venvs between projects with the same requirements"
+    )
+    env_actions = parser_env.add_subparsers(dest="env_action", required=True)
+    parser_env_share = env_actions.add_parser(
+        "share", help="Link the project(s) to the shared venv for their requirements"
+    )
+    parser_env_share.add_argument(
+        "name", nargs="*", help="The name of the project(s) (default: all)"
+    )
+    parser_env_unshare = env_actions.add_parser(
+        "unshare", help="Give the project(s) their own venv again"
+    )
+    parser_env_unshare.add_argument("name", nargs="+", help="The name of the project(s)")
+    env_actions.add_parser("list", aliases=["ls"], help="List shared venvs and their users")
+    env_actions.add_parser("gc", help="Remove shared venvs no project uses")
+    parser_env.set_defaults(func=_command("env"))
+
+    # dedupe
+    parser_dedupe = subparsers.add_parser(
+        "dedupe", help="Share identical package files between project venvs"
+    )
+    parser_dedupe.add_argument(
+        "name", nargs="*", help="The name of the project(s) to dedupe (default: all)"
+    )
+    parser_dedupe.add_argument(
+        "--gc",
+        action="store_true",
+        help="Remove shared files that no project uses anymore",
+    )
+    parser_dedupe.add_argument(
+        "--jobs", "-j", type=int, help="Number of hashing threads (default: CPU count + 4)"
+    )
+    parser_dedupe.set_defaults(func=_command("dedupe"))
 
     # clone
     parser_clone = subparsers.add_parser(
         "clone",aliases=["git"], help="Clone a Git repository as a new project"
     )
-    parser_clone.add_argument("source", help="Git repository URL (HTTPS or SSH)")
+    parser_clone.add_argument(
+        "source", nargs="?", help="Git repository URL (HTTPS or SSH)"
+    )
     parser_clone.add_argument("--name", "-n", help="Custom name for the cloned project")
-    parser_clone.set_defaults(func=clone_project)
+    parser_clone.add_argument(
+        "--depth", type=int, help="Only fetch the last DEPTH commits"
+    )
+    parser_clone.add_argument("--branch", "-b", help="Branch or tag to clone")
+    parser_clone.add_argument(
+        "--filter",
+        help="Partial clone filter, e.g. blob:none to fetch file contents on demand",
+    )
+    parser_clone.add_argument(
+        "--sparse",
+        nargs="+",
+        metavar="PATH",
+        help="Only check out these folders (top level files are always included)",
+    )
+    parser_clone.add_argument(
+        "--manifest",
+        "-m",
+        help="Clone every repository in a file of '<url> [name]' lines",
+    )
+    parser_clone.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Concurrent clones for --manifest (default: up to 4)",
+    )
+    parser_clone.set_defaults(func=_command("clone"))
+
+    # export
+    parser_export = subparsers.add_parser(
+        "export", help="Export a project to an archive, without its venv"
+    )
+    parser_export.add_argument("name", help="The name of the project to export")
+    parser_export.add_argument(
+        "--output",
+        "-o",
+        help="Archive path (default: ./<name>.tar.gz, use .tar.zst for zstd)",
+    )
+    parser_export.set_defaults(func=_command("export"))
+
+    # import
+    parser_import = subparsers.add_parser(
+        "import", help="Import a project from an archive made by export"
+    )
+    parser_import.add_argument("archive", help="The archive to import")
+    parser_import.add_argument("--name", "-n", help="Custom name for the imported project")
+    parser_import.set_defaults(func=_command("import"))
+
+    # trash
+    parser_trash = subparsers.add_parser(
+        "trash", help="List, restore or purge deleted projects"
+    )
+    trash_actions = parser_trash.add_subparsers(dest="trash_action", required=True)
+    trash_actions.add_parser("list", aliases=["ls"], help="List deleted projects")
+    trash_actions.add_parser(
+        "purge", aliases=["empty"], help="Remove everything in the trash now"
+    )
+    parser_trash_restore = trash_actions.add_parser(
+        "restore", help="Bring a project deleted with --keep back"
+    )
+    parser_trash_restore.add_argument("name", help="The name of the project to restore")
+    parser_trash.set_defaults(func=_command("trash"))
+
+    # daemon
+    parser_daemon = subparsers.add_parser(
+        "daemon", help="Serve read-only commands from a warm background process"
+    )
+    parser_daemon.add_argument(
+        "action", choices=["start", "stop", "status"], help="What to do"
+    )
+    parser_daemon.set_defaults(func=_command("daemon"))
+
+    # cdn
+    parser_cdn = subparsers.add_parser(
+        "cdn", help="Manage the local cache of the pygbag runtime files"
+    )
+    cdn_actions = parser_cdn.add_subparsers(dest="cdn_action", required=True)
+    parser_cdn_populate = cdn_actions.add_parser(
+        "populate", help="Add a pygbag CDN copy from a directory or archive"
+    )
+    parser_cdn_populate.add_argument(
+        "source", help="Directory, .zip or .tar archive with the CDN files"
+    )
+    parser_cdn_populate.add_argument(
+        "--version",
+        help="pygbag version of the files (default: the one pinned in the template)",
+    )
+    cdn_actions.add_parser("list", aliases=["ls"], help="List cached versions")
+    cdn_actions.add_parser("clean", help="Remove versions no project pins")
+    parser_cdn_serve = cdn_actions.add_parser(
+        "serve", help="Serve the cache for builds made with --local-cdn"
+    )
+    parser_cdn_serve.add_argument(
+        "--port", "-p", type=int, default=8001, help="Port to listen on (default: 8001)"
+    )
+    parser_cdn.set_defaults(func=_command("cdn"))
+
+    # serve
+    parser_serve = subparsers.add_parser(
+        "serve", help="Serve a folder, e.g. a web build, with precompressed files"
+    )
+    parser_serve.add_argument(
+        "directory", nargs="?", default="build", help="Folder to serve (default: ./build)"
+    )
+    parser_serve.add_argument(
+        "--port", "-p", type=int, default=8000, help="Port to listen on (default: 8000)"
+    )
+    parser_serve.add_argument(
+        "--host", default="localhost", help="Interface to bind to (default: localhost)"
+    )
+    parser_serve.set_defaults(func=_command("serve"))
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     args.func(args)
 
 
@@ -1,34 +1,52 @@
-# ─────────────────────────────
-# Management
-# ─────────────────────────────
-from .new import new_project
-from .rename import rename_project
-from .delete import delete_project
+from importlib import import_module
 
-# ─────────────────────────────
-# Operations
-# ─────────────────────────────
-from .build import build_project
-from .run import run_project
-from .format import format_projects  # global
-from .explore import explore_projects
-from .clone import clone_project
+# Public functions and the module that defines them. Modules are imported on
+# first access (PEP 562) so importing the package stays cheap.
+_FUNCTIONS = {
+    # ─────────────────────────────
+    # Management
+    # ─────────────────────────────
+    "new_project": "new",
+    "rename_project": "rename",
+    "delete_project": "delete",
+    "manage_trash": "trash",
+    # ─────────────────────────────
+    # Operations
+    # ─────────────────────────────
+    "build_project": "build",
+    "run_project": "run",
+    "format_projects": "format",  # global
+    "explore_projects": "explore",
+    "clone_project": "clone",
+    "bench_project": "bench",
+    "export_project": "archive",
+    "import_project": "archive",
+    # ─────────────────────────────
+    # Information
+    # ─────────────────────────────
+    "list_projects": "list",  # global
+    "info_project": "info",
+    "disk_usage": "du",
+    "dedupe_projects": "dedupe",
+    "manage_envs": "envs",
+    # ─────────────────────────────
+    # Services
+    # ─────────────────────────────
+    "manage_daemon": "daemon",
+    "manage_cdn": "cdn",
+    "serve_directory": "serve",
+}
 
-# ─────────────────────────────
-# Information
-# ─────────────────────────────
-from .list import list_projects  # global
-from .info import info_project
+__all__ = list(_FUNCTIONS)
 
-__all__ = [
-    "new_project",
-    "rename_project",
-    "delete_project",
-    "build_project",
-    "run_project",
-    "format_projects",
-    "explore_projects",
-    "list_projects",
-    "info_project",
-    "clone_project",
-]
+
+def __getattr__(name):
+    if name not in _FUNCTIONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_FUNCTIONS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,310 @@
+from .path import get_path, get_projects_path, valid_project, _validate_name
+from .registry import update_project
+from .seed import create_venv
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter as time
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+MANIFEST_FILE = ".pygame-manifest.json"
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+# Left out of exports, rebuilt or regenerated on the other machine
+EXCLUDED_ROOTS = {".env", "build"}
+EXCLUDED_DIRS = {"__pycache__"}
+
+
+class _HashingReader(io.RawIOBase):
+    """Read a file while hashing it, so each file is only read once."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.f.read(len(buffer))
+        self.digest.update(data)
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _compressor(archive: str) -> Tuple[Optional[list], str]:
+    """Pick an external multi-threaded compressor for the archive name.
+
+    Returns:
+        The command to pipe the tar stream through (None for in-process
+        gzip) and a label for the output.
+    """
+    if archive.endswith((".tar.zst", ".tzst")):
+        if shutil.which("zstd"):
+            return ["zstd", "-T0", "-q", "-c"], "zstd -T0"
+        raise ValueError("zstd is not installed, export to .tar.gz instead")
+    if shutil.which("pigz"):
+        return ["pigz", "-c"], "pigz"
+    return None, "gzip"
+
+
+def _decompressor(archive: str) -> Optional[list]:
+    if archive.endswith((".tar.zst", ".tzst")):
+        if shutil.which("zstd"):
+            return ["zstd", "-d", "-q", "-c", archive]
+        raise ValueError("zstd is not installed, cannot read .tar.zst archives")
+    if archive.endswith((".tar.gz", ".tgz")) and shutil.which("pigz"):
+        return ["pigz", "-d", "-c", archive]
+    return None
+
+
+@contextlib.contextmanager
+def _open_stream(archive: str, mode: str) -> Iterator[tarfile.TarFile]:
+    """Open a tar stream ("w" or "r"), piped through pigz/zstd when available."""
+    if mode == "w":
+        command, _ = _compressor(archive)
+        if command is None:
+            with tarfile.open(archive, "w|gz") as tar:
+                yield tar
+            return
+        with open(archive, "wb") as out:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out)
+            try:
+                with tarfile.open(fileobj=process.stdin, mode="w|") as tar:
+                    yield tar
+            finally:
+                process.stdin.close()
+                if process.wait() != 0:
+                    raise OSError(f"{command[0]} failed with exit code {process.returncode}")
+        return
+
+    command = _decompressor(archive)
+    if command is None:
+        with tarfile.open(archive, "r|*") as tar:
+            yield tar
+        return
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+            yield tar
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def _project_files(project_path: str) -> Iterator[Tuple[str, str]]:
+    for root, dirs, files in os.walk(project_path):
+        if root == project_path:
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_ROOTS]
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            yield path, os.path.relpath(path, project_path).replace(os.sep, "/")
+
+
+def export_project(args: Any) -> Optional[str]:
+    """Export a project to a compressed tar archive, without its venv.
+
+    Files are streamed into the archive one chunk at a time and hashed on
+    the way; the manifest with the hashes is the last member.
+
+    Expects:
+      - args.name (str): project name
+      - args.output (str, optional): archive path (default: ./<name>.tar.gz,
+        use .tar.zst for zstd)
+    """
+    if not hasattr(args, "name") or not args.name:
+        raise ValueError("args.name is required")
+
+    name = args.name
+    if not valid_project(name):
+        print(f"No project found with name '{name}'")
+        return None
+
+    project_path = get_path(name)
+    archive = os.path.abspath(getattr(args, "output", None) or f"{name}.tar.gz")
+    try:
+        _, compressor = _compressor(archive)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return None
+
+    start = time()
+    hashes: Dict[str, str] = {}
+    total = 0
+    print(f"Exporting '{name}' to {archive} ({compressor})...")
+    try:
+        with _open_stream(archive, "w") as tar:
+            for path, relative in _project_files(project_path):
+                info = tar.gettarinfo(path, arcname=f"{name}/{relative}")
+                if info.isreg():
+                    with open(path, "rb") as f:
+                        reader = _HashingReader(f)
+                        tar.addfile(info, io.BufferedReader(reader, CHUNK_SIZE))
+                    hashes[relative] = reader.digest.hexdigest()
+                    total += info.size
+                elif info.issym():
+                    tar.addfile(info)
+
+            manifest = json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "name": name,
+                    "exported": datetime.now().isoformat(timespec="seconds"),
+                    "files": hashes,
+                },
+                indent=1,
+            ).encode()
+            info = tarfile.TarInfo(f"{name}/{MANIFEST_FILE}")
+            info.size = len(manifest)
+            info.mtime = int(datetime.now().timestamp())
+            tar.addfile(info, io.BytesIO(manifest))
+    except (OSError, ValueError) as e:
+        print(f"\t✗ Export failed: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(archive)
+        return None
+
+    size = os.path.getsize(archive)
+    print(f"\t✓ {len(hashes)} files, {total / 1024 / 1024:.1f} MB -> {size / 1024 / 1024:.1f} MB")
+    print(f"✓ Exported in {time() - start:.2f}s: {archive}")
+    return archive
+
+
+def _safe_member(member: tarfile.TarInfo, top: str) -> Optional[str]:
+    """Return the member path inside the project folder, None if unsafe."""
+    parts = member.name.replace("\\", "/").split("/")
+    if parts[0] != top or any(p in ("", ".", "..") for p in parts[1:]):
+        return None
+    relative = "/".join(parts[1:])
+    if not relative:
+        # The project folder itself
+        return "" if member.isdir() else None
+    if not (member.isreg() or member.isdir() or member.issym()):
+        return None
+    if member.issym():
+        target = os.path.normpath(os.path.join(os.path.dirname(relative), member.linkname))
+        if os.path.isabs(member.linkname) or target.startswith(".."):
+            return None
+    return relative
+
+
+def import_project(args: Any) -> Optional[str]:
+    """Import a project from an archive made by `pygame export`.
+
+    The archive is unpacked in a single streaming pass into a staging
+    folder, checked against its manifest, then moved into place. The venv
+    is rebuilt from requirements.txt.
+
+    Expects:
+      - args.archive (str): archive path
+      - args.name (str, optional): project name (default: the exported name)
+    """
+    if not hasattr(args, "archive") or not args.archive:
+        raise ValueError("args.archive is required")
+
+    archive = os.path.abspath(args.archive)
+    if not os.path.isfile(archive):
+        print(f"No archive found at '{archive}'")
+        return None
+
+    start = time()
+    staging = os.path.join(get_projects_path(), f".import-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    top = name = full_path = None
+    hashes: Dict[str, str] = {}
+    manifest = None
+    print(f"Importing {archive}...")
+    try:
+        with _open_stream(archive, "r") as tar:
+            for member in tar:
+                if top is None:
+                    # Exports hold a single <name>/ folder
+                    top = member.name.replace("\\", "/").split("/")[0]
+                    name = getattr(args, "name", None) or top
+                    _validate_name(name)
+                    full_path = get_path(name)
+                    if os.path.exists(full_path):
+                        raise ValueError(f"a project or folder named '{name}' already exists")
+                relative = _safe_member(member, top)
+                if relative is None:
+                    print(f"\t! Skipped unsafe entry: {member.name}")
+                    continue
+                if not relative:
+                    continue
+                target = os.path.join(staging, *relative.split("/"))
+                if relative == MANIFEST_FILE:
+                    manifest = json.load(tar.extractfile(member))
+                    continue
+                if member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if member.issym():
+                    try:
+                        os.symlink(member.linkname, target)
+                    except OSError as e:
+                        print(f"\t! Could not create symlink {relative}: {e}")
+                    continue
+
+                digest = hashlib.sha256()
+                source = tar.extractfile(member)
+                with open(target, "wb") as f:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        f.write(chunk)
+                os.chmod(target, member.mode & 0o777 | 0o600)
+                os.utime(target, (member.mtime, member.mtime))
+                hashes[relative] = digest.hexdigest()
+
+        if top is None:
+            raise ValueError("the archive is empty")
+        if manifest is None or manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError("the archive has no manifest, was it made by pygame export?")
+        expected = manifest.get("files", {})
+        bad = sorted(
+            path for path in expected.keys() | hashes.keys()
+            if expected.get(path) != hashes.get(path)
+        )
+        if bad:
+            raise ValueError(f"{len(bad)} file(s) do not match the manifest, e.g. {bad[0]}")
+        print(f"\t✓ Unpacked and verified {len(hashes)} files")
+
+        if os.path.exists(full_path):
+            raise ValueError(f"a project or folder named '{name}' appeared meanwhile")
+        os.replace(staging, full_path)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        print(f"\t✗ Import failed: {e}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+
+    # run.py pulls in asyncio, only needed here and not by export
+    from .run import _install_requirements_into_venv
+
+    venv_dir = Path(full_path) / ".env"
+    req_file = Path(full_path) / "requirements.txt"
+    print("Rebuilding the virtual environment...")
+    try:
+        create_venv(venv_dir)
+        if req_file.is_file():
+            _install_requirements_into_venv(venv_dir, req_file)
+        else:
+            print("\t! The archive has no requirements.txt, nothing to install")
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"\t! Failed to install requirements: {e}")
+
+    update_project(name)
+    print(f"Path: {full_path}")
+    print(f"✓ Project '{name}' imported in {time() - start:.2f}s")
+    return full_path
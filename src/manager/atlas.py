@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import struct
+import subprocess
+import tempfile
+import textwrap
+from typing import Dict, List, Optional, Tuple
+
+ATLAS_DIR = "atlas"
+INDEX_FILE = "index.json"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_size(path: str) -> Optional[Tuple[int, int]]:
+    """Read the image size from the PNG header without decoding it."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _find_images(assets_dir: str) -> Dict[str, Tuple[int, int]]:
+    images = {}
+    for root, dirs, files in os.walk(assets_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for file in files:
+            if not file.lower().endswith(".png"):
+                continue
+            size = _png_size(os.path.join(root, file))
+            if size:
+                images[os.path.join(root, file)] = size
+    return images
+
+
+class _Skyline:
+    """Bottom-left skyline bin packer for a single atlas page."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.segments = [[0, 0, size]]  # x, y, width
+
+    def _fit(self, index: int, width: int, height: int) -> Optional[int]:
+        x = self.segments[index][0]
+        if x + width > self.size:
+            return None
+        y = 0
+        remaining = width
+        i = index
+        while remaining > 0:
+            if i == len(self.segments):
+                return None
+            y = max(y, self.segments[i][1])
+            remaining -= self.segments[i][2]
+            i += 1
+        if y + height > self.size:
+            return None
+        return y
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        best = None
+        for i, (x, _, _) in enumerate(self.segments):
+            y = self._fit(i, width, height)
+            if y is not None and (best is None or (y, x) < (best[1], best[0])):
+                best = (x, y, i)
+        if best is None:
+            return None
+
+        x, y, index = best
+        self.segments.insert(index, [x, y + height, width])
+
+        # Trim the segments now covered by the new one
+        i = index + 1
+        while i < len(self.segments):
+            seg = self.segments[i]
+            prev_end = self.segments[i - 1][0] + self.segments[i - 1][2]
+            if seg[0] >= prev_end:
+                break
+            shrink = prev_end - seg[0]
+            seg[0] += shrink
+            seg[2] -= shrink
+            if seg[2] > 0:
+                break
+            del self.segments[i]
+
+        # Merge neighbours at the same height
+        i = 0
+        while i < len(self.segments) - 1:
+            if self.segments[i][1] == self.segments[i + 1][1]:
+                self.segments[i][2] += self.segments[i + 1][2]
+                del self.segments[i + 1]
+            else:
+                i += 1
+        return x, y
+
+
+def _pack(
+    sizes: Dict[str, Tuple[int, int]], max_size: int, padding: int
+) -> Tuple[List[dict], List[str]]:
+    """Distribute images over as few atlas pages as possible.
+
+    Returns:
+        The pages, each with its size and image placements, and the images
+        that are too large to fit in any page.
+    """
+    pages, packers, skipped = [], [], []
+    order = sorted(sizes, key=lambda p: (max(sizes[p]), sizes[p][0] * sizes[p][1]), reverse=True)
+
+    for path in order:
+        width, height = sizes[path]
+        padded = (width + padding, height + padding)
+        if padded[0] > max_size or padded[1] > max_size:
+            skipped.append(path)
+            continue
+
+        for page, packer in zip(pages, packers):
+            position = packer.insert(*padded)
+            if position:
+                break
+        else:
+            packer = _Skyline(max_size)
+            page = {"images": []}
+            pages.append(page)
+            packers.append(packer)
+            position = packer.insert(*padded)
+
+        page["images"].append([path, position[0], position[1], width, height])
+
+    for page in pages:
+        page["size"] = [
+            max(x + w for _, x, _, w, _ in page["images"]),
+            max(y + h for _, _, y, _, h in page["images"]),
+        ]
+    return pages, skipped
+
+
+def pack_atlases(
+    project_path: str,
+    build_dir: str,
+    python_exe: str,
+    max_size: int = 2048,
+    padding: int = 2,
+) -> Optional[Dict[str, int]]:
+    """Pack the PNG images under assets/ into texture atlases.
+
+    The atlases and an index mapping each original path (relative to the
+    project, e.g. `assets/player.png`) to its atlas rect are written to
+    `<build_dir>/atlas/`. Composing the pages needs pygame, so that part runs
+    in the project venv.
+
+    Args:
+        project_path: The project directory.
+        build_dir: The build output directory.
+        python_exe: The venv interpreter that has pygame installed.
+        max_size: The maximum width and height of a page.
+        padding: The gap in pixels kept between packed images.
+
+    Returns:
+        A dict with the number of `images`, `pages` and `skipped` images, or
+        None if there is nothing to pack.
+    """
+    assets_dir = os.path.join(project_path, "assets")
+    output = os.path.join(build_dir, ATLAS_DIR)
+    images = _find_images(assets_dir)
+    if not images:
+        return None
+
+    # Skip the work when neither the images nor the settings changed
+    digest = hashlib.sha256(f"{max_size}:{padding}".encode())
+    for path in sorted(images):
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    key = digest.hexdigest()
+
+    index_file = os.path.join(output, INDEX_FILE)
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("key") == key:
+            return index["stats"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    pages, skipped = _pack(images, max_size, padding)
+    os.makedirs(output, exist_ok=True)
+    for file in os.listdir(output):
+        os.remove(os.path.join(output, file))
+
+    index = {"key": key, "pages": [], "images": {}}
+    for number, page in enumerate(pages):
+        page["file"] = f"atlas_{number}.png"
+        index["pages"].append(page["file"])
+        for path, x, y, w, h in page["images"]:
+            rel_path = os.path.relpath(path, project_path).replace(os.sep, "/")
+            index["images"][rel_path] = [number, x, y, w, h]
+
+    compose_code = textwrap.dedent("""\
+        import json
+        import os
+        import sys
+
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+        import pygame
+
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            plan = json.load(f)
+
+        for page in plan["pages"]:
+            atlas = pygame.Surface(page["size"], pygame.SRCALPHA)
+            for path, x, y, w, h in page["images"]:
+                image = pygame.image.load(path).convert(atlas)
+                # Adding onto the transparent page copies the pixels exactly
+                atlas.blit(image, (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+            pygame.image.save(atlas, os.path.join(plan["output"], page["file"]))
+        """)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script_path = os.path.join(temp_dir, "compose_atlas.py")
+        plan_path = os.path.join(temp_dir, "plan.json")
+        with open(script_path, "w") as f:
+            f.write(compose_code)
+        with open(plan_path, "w", encoding="utf-8") as f:
+            json.dump({"output": output, "pages": pages}, f)
+
+        subprocess.run(
+            [python_exe, script_path, plan_path],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    index["stats"] = {
+        "images": len(index["images"]),
+        "pages": len(pages),
+        "skipped": len(skipped),
+    }
+    with open(index_file, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index["stats"]
@@ -0,0 +1,295 @@
+from .envs import sync_shared_env
+from .path import get_path, valid_project
+from .run import (
+    _install_requirements_into_venv,
+    _report_exit,
+    _run_streamed,
+    _venv_python_path,
+)
+
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import textwrap
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter as time
+from typing import Any, Optional
+
+BENCH_DIR = "bench"
+RESULTS_FILE = "results.json"
+BASELINE_FILE = "baseline.json"
+
+# No display, GPU or sound card needed
+SDL_DUMMY_ENV = {"SDL_VIDEODRIVER": "dummy", "SDL_AUDIODRIVER": "dummy"}
+
+# Metrics checked by --compare, lower is better for all of them
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "cpu_per_frame_ms", "max_rss_mb")
+
+# Runs inside the project venv. Frames are counted at display.flip/update,
+# which the game calls once per frame, so no change to the game is needed.
+BOOTSTRAP = textwrap.dedent("""\
+    import json
+    import os
+    import runpy
+    import sys
+    import time
+
+    output_file, warmup, frames, seconds, uncapped = sys.argv[1:6]
+    warmup, frames, seconds = int(warmup), int(frames), float(seconds)
+    sys.argv = ["main.py"]
+    sys.path.insert(0, os.getcwd())
+
+    import pygame
+
+    times = []
+    state = {"last": None, "start": None, "cpu": None, "count": 0}
+
+    def max_rss_mb():
+        try:
+            import resource
+        except ImportError:
+            return None
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Bytes on macOS, kilobytes elsewhere
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    def save():
+        end = time.perf_counter()
+        result = {
+            "frame_times_ms": times,
+            "wall_s": end - state["start"] if state["start"] else 0.0,
+            "cpu_s": time.process_time() - state["cpu"] if state["cpu"] else 0.0,
+            "max_rss_mb": max_rss_mb(),
+            "pygame": pygame.version.ver,
+        }
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+
+    class Done(Exception):
+        pass
+
+    def frame():
+        now = time.perf_counter()
+        state["count"] += 1
+        if state["count"] == warmup + 1:
+            state["start"], state["cpu"] = now, time.process_time()
+        elif state["count"] > warmup + 1:
+            times.append((now - state["last"]) * 1000)
+        state["last"] = now
+        if frames and len(times) >= frames:
+            raise Done
+        if seconds and state["start"] and now - state["start"] >= seconds:
+            raise Done
+
+    def timed(func):
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            frame()
+            return result
+        return wrapper
+
+    pygame.display.flip = timed(pygame.display.flip)
+    pygame.display.update = timed(pygame.display.update)
+
+    if uncapped == "1":
+        # Wraps the real clock, a C type that may not allow subclasses
+        RealClock = pygame.time.Clock
+
+        class Clock:
+            def __init__(self, *args, **kwargs):
+                self._clock = RealClock(*args, **kwargs)
+
+            def tick(self, framerate=0):
+                return self._clock.tick()
+
+            def tick_busy_loop(self, framerate=0):
+                return self._clock.tick_busy_loop()
+
+            def __getattr__(self, name):
+                return getattr(self._clock, name)
+
+        pygame.time.Clock = Clock
+
+    try:
+        runpy.run_path(os.path.join(os.getcwd(), "main.py"), run_name="__main__")
+    except (Done, SystemExit, KeyboardInterrupt):
+        pass
+    finally:
+        save()
+    """)
+
+
+def _summarize(raw: dict, warmup: int, uncapped: bool) -> dict:
+    times = sorted(raw["frame_times_ms"])
+    count = len(times)
+
+    def percentile(p):
+        return times[min(count - 1, int(count * p / 100))] if count else 0.0
+
+    mean = sum(times) / count if count else 0.0
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "pygame": raw.get("pygame"),
+        "frames": count,
+        "warmup": warmup,
+        "uncapped": uncapped,
+        "wall_s": round(raw["wall_s"], 3),
+        "fps": round(1000 / mean, 2) if mean else 0.0,
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(percentile(50), 3),
+        "p95_ms": round(percentile(95), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(times[-1], 3) if count else 0.0,
+        "cpu_s": round(raw["cpu_s"], 3),
+        "cpu_per_frame_ms": round(raw["cpu_s"] * 1000 / count, 3) if count else 0.0,
+        "max_rss_mb": round(raw["max_rss_mb"], 1) if raw["max_rss_mb"] else None,
+        "frame_times_ms": [round(t, 3) for t in raw["frame_times_ms"]],
+    }
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Print the results next to the baseline, return True on regression."""
+    regressed = False
+    print(f"{'Metric':<18} {'Baseline':>10} {'Current':>10} {'Change':>9}")
+    for metric in COMPARED_METRICS:
+        old, new = baseline.get(metric), results.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        mark = "✗" if change > threshold else "✓"
+        regressed |= change > threshold
+        print(f"{metric:<18} {old:>10.3f} {new:>10.3f} {change:>+8.1f}% {mark}")
+    return regressed
+
+
+def bench_project(args: Any) -> Optional[dict]:
+    """Benchmark a project headlessly and store the results.
+
+    Runs main.py with the dummy SDL video and audio drivers, so it works
+    without a display (e.g. in CI). Results go to `<project>/bench/`.
+
+    Expects:
+      - args.name (str): project name
+      - args.frames (int): frames to measure, 0 for no limit
+      - args.seconds (float): seconds to measure, 0 for no limit
+      - args.warmup (int): frames to skip before measuring
+      - args.uncapped (bool, optional): ignore the framerate passed to Clock.tick
+      - args.baseline (bool, optional): save the results as the baseline
+      - args.compare (bool, optional): compare against the baseline and exit
+        with status 1 on a regression
+      - args.threshold (float): allowed slowdown in percent for --compare
+    """
+    if not hasattr(args, "name") or not args.name:
+        raise ValueError("args.name is required")
+
+    name = args.name
+    if not valid_project(name):
+        print(f"No project found with name '{name}'")
+        return None
+
+    frames = getattr(args, "frames", 600)
+    seconds = getattr(args, "seconds", 0)
+    warmup = getattr(args, "warmup", 60)
+    uncapped = getattr(args, "uncapped", False)
+    if not frames and not seconds:
+        print("Set --frames or --seconds, or the benchmark never ends")
+        return None
+
+    full_path = Path(get_path(name))
+    venv_dir = full_path / ".env"
+    bench_dir = full_path / BENCH_DIR
+    baseline_file = bench_dir / BASELINE_FILE
+
+    baseline = None
+    if getattr(args, "compare", False):
+        try:
+            with baseline_file.open("r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"No baseline found, run 'pygame bench {name} --baseline' first")
+            return None
+
+    try:
+        sync_shared_env(full_path)
+        _install_requirements_into_venv(venv_dir, full_path / "requirements.txt")
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Failed to install requirements: {e}")
+        return None
+
+    limit = f"{frames} frames" if frames else f"{seconds:g}s"
+    print(f"Benchmarking '{name}' for {limit} after {warmup} warmup frames...")
+
+    saved_env = {key: os.environ.get(key) for key in SDL_DUMMY_ENV}
+    os.environ.update(SDL_DUMMY_ENV)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bootstrap = os.path.join(temp_dir, "bench_main.py")
+            output_file = os.path.join(temp_dir, "bench.json")
+            with open(bootstrap, "w", encoding="utf-8") as f:
+                f.write(BOOTSTRAP)
+            cmd = [
+                str(_venv_python_path(venv_dir)),
+                "-u",
+                bootstrap,
+                output_file,
+                str(warmup),
+                str(frames),
+                str(seconds),
+                "1" if uncapped else "0",
+            ]
+            returncode, stderr_output = asyncio.run(
+                _run_streamed(cmd, full_path, time())
+            )
+            if returncode != 0:
+                _report_exit(name, returncode, stderr_output, full_path)
+                return None
+            try:
+                with open(output_file, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                print("The game exited before the benchmark started")
+                return None
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    results = _summarize(raw, warmup, uncapped)
+    if not results["frames"]:
+        print("No frames were measured, does the game call pygame.display.flip()?")
+        return None
+
+    bench_dir.mkdir(exist_ok=True)
+    with (bench_dir / RESULTS_FILE).open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+
+    print("-----------------------------------")
+    print(f"Frames:  {results['frames']} in {results['wall_s']:.2f}s ({results['fps']:.1f} fps)")
+    print(
+        f"Frame:   p50 {results['p50_ms']:.2f} ms | p95 {results['p95_ms']:.2f} ms"
+        f" | p99 {results['p99_ms']:.2f} ms | max {results['max_ms']:.2f} ms"
+    )
+    print(f"CPU:     {results['cpu_s']:.2f}s ({results['cpu_per_frame_ms']:.2f} ms/frame)")
+    if results["max_rss_mb"] is not None:
+        print(f"RSS:     {results['max_rss_mb']:.1f} MB max")
+    print("-----------------------------------")
+    print(f"Results: {bench_dir / RESULTS_FILE}")
+
+    if getattr(args, "baseline", False):
+        with baseline_file.open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {baseline_file}")
+
+    if baseline is not None:
+        threshold = getattr(args, "threshold", 10.0)
+        if _compare(results, baseline, threshold):
+            print(f"Regression: slower than the baseline by more than {threshold:g}%")
+            raise SystemExit(1)
+        print(f"No regression above {threshold:g}%")
+
+    return results
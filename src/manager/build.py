@@ -1,16 +1,35 @@
+from .atlas import ATLAS_DIR, pack_atlases
+from .cdn import CDN_PORT, cached_cdn, pinned_pygbag, serve_cache
+from .envs import sync_shared_env
 from .info import info_project as info
-from .path import get_path, valid_project
-
+from .pack import PACK_FILE, write_pack
+from .path import get_cache_path, get_path, valid_project
+from .registry import lookup_project, registered_projects
+from .run import _venv_python_path
+from .sync import _place_file, sync_tree
+from .web import MANIFEST_FILE, hash_names, precompress
+
+import argparse
+import contextlib
+import email.parser
+import glob
+import hashlib
 import json
 import os
+import py_compile
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
 import textwrap
+import urllib.error
 import urllib.request
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
 from time import perf_counter as time
-from typing import Any
+from typing import Any, Optional
 
 
 def _parse_package_names(requirements: str) -> list[str]:
@@ -28,111 +47,260 @@ def _parse_package_names(requirements: str) -> list[str]:
     return includes
 
 
-def _get_installed_version(
-    venv_site_packages: str, package_name: str, pypi_name: str
-) -> str:
-    # Temporarily add the venv site-packages to sys.path
-    original_path = sys.path.copy()
-    sys.path.insert(0, venv_site_packages)
+LICENSE_CACHE_FILE = "licenses.json"
+LICENSE_FETCH_WORKERS = 8
+
+
+def _normalize_dist_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _find_distributions(venv_site_packages: str) -> dict[str, str]:
+    """Map normalized distribution names to their dist-info directories."""
+    distributions = {}
+    try:
+        entries = os.listdir(venv_site_packages)
+    except OSError:
+        return distributions
+
+    for entry in entries:
+        if entry.endswith(".dist-info"):
+            dist_name = entry[: -len(".dist-info")].rsplit("-", 1)[0]
+            distributions[_normalize_dist_name(dist_name)] = os.path.join(
+                venv_site_packages, entry
+            )
+    return distributions
 
-    from importlib.metadata import version, PackageNotFoundError
 
-    # Try different naming conventions
-    possible_names = [package_name, pypi_name, pypi_name.replace("-", "_")]
+def _read_local_license(dist_info: str) -> Optional[dict]:
+    """Read license details from an installed dist-info directory."""
+    try:
+        with open(
+            os.path.join(dist_info, "METADATA"), "r", encoding="utf-8", errors="replace"
+        ) as f:
+            metadata = email.parser.HeaderParser().parse(f)
+    except OSError:
+        return None
 
-    for name in possible_names:
+    name = metadata.get("Name", "")
+    version = metadata.get("Version", "unknown")
+
+    project_url = f"https://pypi.org/project/{name}/{version}/"
+    for url in metadata.get_all("Project-URL") or []:
+        label, _, link = url.partition(",")
+        if label.strip().lower() in ("homepage", "home", "source", "repository"):
+            project_url = link.strip()
+            break
+
+    # PEP 639 puts license files under licenses/, older wheels at the top level
+    license_files = {}
+    candidates = [
+        os.path.join(dist_info, "licenses", f)
+        for f in metadata.get_all("License-File") or []
+    ]
+    candidates += glob.glob(os.path.join(dist_info, "LICEN[CS]E*"))
+    candidates += glob.glob(os.path.join(dist_info, "COPYING*"))
+    for candidate in candidates:
+        if not os.path.isfile(candidate):
+            candidate = os.path.join(dist_info, os.path.basename(candidate))
+        filename = os.path.basename(candidate)
+        if filename in license_files or not os.path.isfile(candidate):
+            continue
         try:
-            return version(name)
-        except (PackageNotFoundError, Exception):
+            with open(candidate, "r", encoding="utf-8", errors="replace") as f:
+                license_files[filename] = f.read()
+        except OSError:
             continue
-        return None
 
-    # Return sys.path back to normal
-    sys.path = original_path
+    return {
+        "name": name,
+        "version": version,
+        "license": metadata.get("License-Expression") or metadata.get("License"),
+        "author": metadata.get("Author") or metadata.get("Author-email") or "Unknown",
+        "home_page": metadata.get("Home-page") or "",
+        "project_url": project_url,
+        "classifiers": [
+            c for c in metadata.get_all("Classifier") or [] if c.startswith("License :: ")
+        ],
+        "license_files": license_files,
+    }
 
 
-def _collect_licenses(
-    venv_site_packages: str, build_dir: str, includes: list[str], output: str
-) -> int:
-    os.makedirs(output, exist_ok=True)
+def _fetch_pypi_license(pypi_name: str, installed_version: str) -> dict:
+    """Fetch license details from the PyPI JSON API."""
+    if installed_version != "unknown":
+        pypi_url = f"https://pypi.org/pypi/{pypi_name}/{installed_version}/json"
+    else:
+        pypi_url = f"https://pypi.org/pypi/{pypi_name}/json"
+
+    with urllib.request.urlopen(pypi_url, timeout=5) as response:
+        data = json.loads(response.read().decode())
+
+    info_data = data.get("info", {})
+    version = info_data.get("version", installed_version)
+    return {
+        "name": pypi_name,
+        "version": version,
+        "license": info_data.get("license"),
+        "author": info_data.get("author") or "Unknown",
+        "home_page": info_data.get("home_page") or "",
+        "project_url": info_data.get(
+            "project_url", f"https://pypi.org/project/{pypi_name}/{version}/"
+        ),
+        "classifiers": [
+            c
+            for c in info_data.get("classifiers", [])
+            if c.startswith("License :: ")
+        ],
+        "license_files": {},
+    }
 
-    licenses_collected = 0
 
-    print(f"\tFetching license info for {len(includes)} dependencies...")
+def _has_license(license_info: dict) -> bool:
+    return bool(
+        license_info["license"]
+        or license_info["classifiers"]
+        or license_info["license_files"]
+    )
+
 
-    for package_name in includes:
-        # Try different name variations
-        pypi_name = package_name.replace("_", "-")
-        installed_version = _get_installed_version(
-            venv_site_packages, package_name, pypi_name
-        )
+def _load_license_cache() -> dict:
+    try:
+        with open(
+            os.path.join(get_cache_path(), LICENSE_CACHE_FILE), "r", encoding="utf-8"
+        ) as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_license_cache(cache: dict) -> None:
+    cache_file = os.path.join(get_cache_path(), LICENSE_CACHE_FILE)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+def _write_license_file(output: str, license_info: dict) -> None:
+    pypi_name = license_info["name"]
+    version = license_info["version"]
+    license_text = license_info["license"]
+
+    # Create license file with version in filename
+    license_file_path = os.path.join(output, f"{pypi_name}_{version}_LICENSE.txt")
+
+    with open(license_file_path, "w", encoding="utf-8") as f:
+        f.write(f"Package: {pypi_name}\n")
+        f.write(f"Version: {version}\n")
+        f.write(f"Author: {license_info['author']}\n")
+        if license_info["home_page"]:
+            f.write(f"Site: {license_info['home_page']}\n")
+        f.write("=" * 70 + "\n\n")
 
-        if not installed_version:
-            print(f"\t! Warning: Could not determine version for {pypi_name}")
-            installed_version = "unknown"
+        if license_text:
+            f.write(f"License: {license_text}\n\n")
 
-        if installed_version != "unknown":
-            pypi_url = f"https://pypi.org/pypi/{pypi_name}/{installed_version}/json"
-        else:
-            pypi_url = f"https://pypi.org/pypi/{pypi_name}/json"
+        if license_info["classifiers"]:
+            f.write("License Classifiers:\n")
+            for classifier in license_info["classifiers"]:
+                f.write(f"  - {classifier}\n")
+            f.write("\n")
 
-        try:
-            with urllib.request.urlopen(pypi_url, timeout=5) as response:
-                data = json.loads(response.read().decode())
-
-                # Get metadata
-                info_data = data.get("info", {})
-                license_text = info_data.get("license", "Not specified")
-                author = info_data.get("author", "Unknown")
-                version = info_data.get("version", installed_version)
-                home_page = info_data.get("home_page", "")
-                project_url = info_data.get(
-                    "project_url", f"https://pypi.org/project/{pypi_name}/{version}/"
-                )
+        f.write("-" * 70 + "\n")
+        if license_info["license_files"]:
+            for filename, text in license_info["license_files"].items():
+                f.write(f"{filename}:\n\n")
+                f.write(text.rstrip() + "\n\n")
+        else:
+            f.write("For the full license text, please visit:\n")
+            f.write(f"{license_info['project_url']}\n")
 
-                # Get classifiers for additional license info
-                classifiers = info_data.get("classifiers", [])
-                license_classifiers = [
-                    c for c in classifiers if c.startswith("License ::  ")
-                ]
 
-                # Create license file with version in filename
-                license_file_path = os.path.join(
-                    output, f"{pypi_name}_{version}_LICENSE.txt"
-                )
+def _collect_licenses(
+    venv_site_packages: str, build_dir: str, includes: list[str], output: str
+) -> int:
+    os.makedirs(output, exist_ok=True)
 
-                if not license_text or license_text == "Not specified":
-                    print(f"\t! Warning: Could not determine the {pypi_name} license")
+    print(f"\tCollecting license info for {len(includes)} dependencies...")
 
-                with open(license_file_path, "w", encoding="utf-8") as f:
-                    f.write(f"Package: {pypi_name}\n")
-                    f.write(f"Version: {version}\n")
-                    f.write(f"Author: {author}\n")
-                    if home_page:
-                        f.write(f"Site: {home_page}\n")
-                    f.write("=" * 70 + "\n\n")
+    distributions = _find_distributions(venv_site_packages)
+    cache = _load_license_cache()
+    cache_changed = False
 
-                    if license_text and license_text != "Not specified":
-                        f.write(f"License: {license_text}\n\n")
+    resolved = {}
+    pending = {}
 
-                    if license_classifiers:
-                        f.write("License Classifiers:\n")
-                        for classifier in license_classifiers:
-                            f.write(f"  - {classifier}\n")
-                        f.write("\n")
+    # 1) persistent cache, 2) installed metadata, 3) PyPI
+    for package_name in includes:
+        pypi_name = package_name.replace("_", "-")
+        dist_info = distributions.get(_normalize_dist_name(package_name))
+        local_info = _read_local_license(dist_info) if dist_info else None
+        installed_version = local_info["version"] if local_info else "unknown"
 
-                    f.write("-" * 70 + "\n")
-                    f.write("For the full license text, please visit:\n")
-                    f.write(f"{project_url}\n")
+        if not local_info:
+            print(f"\t! Warning: Could not determine version for {pypi_name}")
 
-                licenses_collected += 1
+        cache_key = f"{_normalize_dist_name(package_name)}=={installed_version}"
+        if installed_version != "unknown" and cache_key in cache:
+            resolved[package_name] = cache[cache_key]
+        elif local_info and _has_license(local_info):
+            resolved[package_name] = local_info
+            cache[cache_key] = local_info
+            cache_changed = True
+        else:
+            pending[package_name] = (pypi_name, installed_version, cache_key)
+
+    if pending:
+        print(f"\tFetching {len(pending)} licenses from PyPI...")
+        with ThreadPoolExecutor(
+            max_workers=min(LICENSE_FETCH_WORKERS, len(pending))
+        ) as executor:
+            futures = {
+                executor.submit(_fetch_pypi_license, pypi_name, installed_version): (
+                    package_name
+                )
+                for package_name, (pypi_name, installed_version, _) in pending.items()
+            }
+            for future in as_completed(futures):
+                package_name = futures[future]
+                pypi_name, installed_version, cache_key = pending[package_name]
+                try:
+                    license_info = future.result()
+                except urllib.error.HTTPError as e:
+                    print(
+                        f"\t! Warning: HTTP {e.code} for {pypi_name} (v{installed_version})"
+                    )
+                    continue
+                except Exception as e:
+                    print(
+                        f"\t! Warning: Failed to fetch license for {pypi_name}: {str(e)[:50]}"
+                    )
+                    continue
+
+                resolved[package_name] = license_info
+                if installed_version != "unknown":
+                    cache[cache_key] = license_info
+                    cache_changed = True
+
+    if cache_changed:
+        _save_license_cache(cache)
 
-        except urllib.error.HTTPError as e:
-            print(f"\t! Warning: HTTP {e.code} for {pypi_name} (v{installed_version})")
-        except Exception as e:
+    licenses_collected = 0
+    for package_name in includes:
+        license_info = resolved.get(package_name)
+        if license_info is None:
+            continue
+        if not license_info["license"] and not license_info["license_files"]:
             print(
-                f"\t! Warning: Failed to fetch license for {pypi_name}: {str(e)[:50]}"
+                f"\t! Warning: Could not determine the {license_info['name']} license"
             )
+        _write_license_file(output, license_info)
+        licenses_collected += 1
 
     # Create a small README
     readme_path = os.path.join(output, "README.txt")
@@ -141,17 +309,195 @@ def _collect_licenses(
         f.write("=" * 70 + "\n\n")
         f.write("This directory contains license information for all third-party\n")
         f.write("libraries included in this application.\n\n")
-        f.write("All license information was retrieved from PyPI.\n\n")
+        f.write("License information was read from the installed package\n")
+        f.write("metadata, or retrieved from PyPI when it was missing.\n\n")
         f.write("=" * 70 + "\n\n")
 
     return licenses_collected
 
 
+BUILD_STATE_FILE = ".build-cache.json"
+# Left out of the copy of the project that pygbag archives with --pack
+WEB_PACK_SKIP = {".env", ".git", "build", "assets", PACK_FILE}
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _project_sources(project_path: str) -> dict[str, str]:
+    """Hash every Python source of the project, keyed by its relative path."""
+    sources = {}
+    for root, dirs, files in os.walk(project_path):
+        rel_root = os.path.relpath(root, project_path)
+        dirs[:] = [
+            d
+            for d in dirs
+            if not d.startswith(".")
+            and d != "__pycache__"
+            and not (rel_root == "." and d.lower() in ("build", "assets", "data"))
+        ]
+        for file in files:
+            if file.endswith(".py"):
+                path = os.path.join(root, file)
+                rel_path = os.path.relpath(path, project_path).replace(os.sep, "/")
+                sources[rel_path] = _hash_file(path)
+    return sources
+
+
+def _dependencies_key(
+    requirements: str, venv_site_packages: str, freeze_config: list[str]
+) -> str:
+    """Hash everything that makes the frozen lib/ tree reusable."""
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        cx_freeze_version = version("cx_Freeze")
+    except PackageNotFoundError:
+        cx_freeze_version = "unknown"
+
+    # dist-info names carry the resolved version of every installed package
+    installed = sorted(
+        d for d in os.listdir(venv_site_packages) if d.endswith(".dist-info")
+    )
+
+    digest = hashlib.sha256()
+    for part in [sys.version, cx_freeze_version, requirements] + installed + freeze_config:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _load_build_state(build_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(build_dir, BUILD_STATE_FILE), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_build_state(build_dir: str, state: Optional[dict]) -> None:
+    state_file = os.path.join(build_dir, BUILD_STATE_FILE)
+    try:
+        if state is None:
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            return
+        with open(state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    except OSError:
+        pass
+
+
+def _compile_module(source: str) -> bytes:
+    # Compiled with the interpreter that runs cx_Freeze, like the rest of lib/
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cfile = os.path.join(temp_dir, "module.pyc")
+        py_compile.compile(source, cfile=cfile, doraise=True)
+        with open(cfile, "rb") as f:
+            return f.read()
+
+
+def _patch_frozen_modules(
+    build_dir: str, project_path: str, changed: list[str], removed: list[str]
+) -> bool:
+    """Replace changed project modules inside an existing frozen build.
+
+    Modules live either as .pyc files under lib/ or inside lib/library.zip,
+    depending on how cx_Freeze stored their package.
+
+    Returns:
+        False if a change could not be mapped onto the frozen tree.
+    """
+    lib_dir = os.path.join(build_dir, "lib")
+    zip_path = os.path.join(lib_dir, "library.zip")
+    zip_names = set()
+    if os.path.exists(zip_path):
+        with zipfile.ZipFile(zip_path) as zf:
+            zip_names = set(zf.namelist())
+
+    def locate(rel_path: str) -> Optional[tuple[str, str]]:
+        if rel_path == "main.py":
+            main_entries = [n for n in zip_names if n.endswith("__main__.pyc")]
+            if len(main_entries) == 1:
+                return "zip", main_entries[0]
+            return None
+        pyc = rel_path[:-3] + ".pyc"
+        top = pyc.split("/")[0]
+        if os.path.exists(os.path.join(lib_dir, pyc)) or (
+            "/" in pyc and os.path.isdir(os.path.join(lib_dir, top))
+        ):
+            return "fs", pyc
+        if pyc in zip_names or any(n.startswith(top + "/") for n in zip_names):
+            return "zip", pyc
+        return None
+
+    try:
+        fs_updates, zip_updates, zip_removals = {}, {}, set()
+        for rel_path in changed:
+            target = locate(rel_path)
+            if target is None:
+                return False
+            code = _compile_module(os.path.join(project_path, rel_path))
+            (fs_updates if target[0] == "fs" else zip_updates)[target[1]] = code
+
+        for rel_path in removed:
+            target = locate(rel_path)
+            if target is None:
+                continue
+            if target[0] == "fs":
+                fs_updates[target[1]] = None
+            else:
+                zip_removals.add(target[1])
+
+        for pyc, code in fs_updates.items():
+            path = os.path.join(lib_dir, *pyc.split("/"))
+            if code is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(code)
+
+        if zip_updates or zip_removals:
+            # Zip members can't be replaced in place, rewrite the archive
+            tmp_path = zip_path + ".tmp"
+            with zipfile.ZipFile(zip_path) as src, zipfile.ZipFile(
+                tmp_path, "w", zipfile.ZIP_DEFLATED
+            ) as dst:
+                for entry in src.infolist():
+                    if entry.filename in zip_updates or entry.filename in zip_removals:
+                        continue
+                    dst.writestr(entry, src.read(entry.filename))
+                for pyc, code in zip_updates.items():
+                    dst.writestr(pyc, code)
+            os.replace(tmp_path, zip_path)
+    except (OSError, py_compile.PyCompileError, zipfile.BadZipFile) as e:
+        print(f"\t! Warning: Failed to patch the frozen modules: {e}")
+        return False
+
+    return True
+
+
 def local_build(args):
     """Build a local executable using cx_Freeze.
 
     Expects:
         - args.name (str): project name
+        - args.output (str, optional): output directory (default: ./build)
+        - args.clean (bool, optional): ignore the build cache and freeze from scratch
+        - args.checksum (bool, optional): compare asset contents, not just mtimes
+        - args.no_link (bool, optional): always copy assets instead of hardlinking
+        - args.atlas (bool, optional): pack assets/ PNGs into texture atlases
+        - args.atlas_size (int, optional): maximum atlas page size in pixels
+        - args.atlas_padding (int, optional): gap between packed images in pixels
+        - args.pack (bool, optional): ship assets/ as a single assets.pak file
     """
     x1 = time()
     name = args.name
@@ -162,6 +508,11 @@ def local_build(args):
 
     project_path = get_path(name)
     main_script = os.path.join(project_path, "main.py")
+    try:
+        sync_shared_env(Path(project_path))
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"\t✗ Could not prepare the shared venv: {e}")
+        return
 
     print("BUILD METADATA")
 
@@ -173,7 +524,7 @@ def local_build(args):
     if not app_version:
         app_version = "1.0.0"
 
-    build_dir = os.path.abspath("build")
+    build_dir = os.path.abspath(getattr(args, "output", None) or "build")
 
     # Determine executable type
     if sys.platform == "win32":
@@ -224,8 +575,40 @@ def local_build(args):
     print(f"Platform:    {sys.platform}")
     print("=======================")
 
-    # Remove previous build
-    if os.path.exists(build_dir):
+    # Find project modules and packages
+    project_packages = []  # Directories with __init__.py
+    project_modules = []  # .py files
+
+    for item in os.listdir(project_path):
+        item_path = os.path.join(project_path, item)
+        if os.path.isdir(item_path) and not item.startswith("."):
+            init_file = os.path.join(item_path, "__init__.py")
+            if os.path.exists(init_file):
+                project_packages.append(item)
+
+        elif item.endswith(".py") and item != "main.py":
+            project_modules.append(item[:-3])  # Remove .py extension
+
+    # Anything that changes what cx_Freeze collects forces a full freeze
+    deps_key = _dependencies_key(
+        requirements,
+        venv_site_packages,
+        [app_name, app_version, target_name, base]
+        + sorted(project_packages)
+        + sorted(project_modules),
+    )
+    sources = _project_sources(project_path)
+
+    state = None if getattr(args, "clean", False) else _load_build_state(build_dir)
+    incremental = (
+        state is not None
+        and state.get("deps_key") == deps_key
+        and os.path.isdir(os.path.join(build_dir, "lib"))
+    )
+
+    if incremental:
+        print("[1/5] Reusing previous build (dependencies unchanged)")
+    elif os.path.exists(build_dir):
         print(f"[1/5] Cleaning previous build...")
         try:
             shutil.rmtree(build_dir)
@@ -244,126 +627,192 @@ def local_build(args):
         )
         return
 
-    print(f"[2/5] Running cx_Freeze...")
-
-    # Find project modules and packages
-    project_packages = []  # Directories with __init__.py
-    project_modules = []  # .py files
-
-    for item in os.listdir(project_path):
-        item_path = os.path.join(project_path, item)
-        if os.path.isdir(item_path) and not item.startswith("."):
-            init_file = os.path.join(item_path, "__init__.py")
-            if os.path.exists(init_file):
-                project_packages.append(item)
-
-        elif item.endswith(".py") and item != "main.py":
-            project_modules.append(item[:-3])  # Remove .py extension
-
-    print(f"\tFound {len(includes)} dependencies: {includes}")
-    print(f"\tFound {len(project_packages)} packages: {project_packages}")
-    print(f"\tFound {len(project_modules)} modules: {project_modules}")
-
-    # Generate cx_Freeze setup script
-    setup_code = textwrap.dedent(f"""\
-        import sys
-        from cx_Freeze import setup, Executable
-
-        # Add virtual environment site-packages to sys.path
-        sys.path.insert(0, r"{venv_site_packages}")
-        # Add project path
-        sys.path.insert(0, r"{project_path}")
-
-        # Packages (directories with __init__.py)
-        packages = {project_packages!r}
-
-        # Standalone modules (.py files)
-        modules = {project_modules!r}
-
-        # External packages from requirements.txt
-        external_packages = {includes!r}
-
-        setup(
-            name="{app_name}",
-            version="{app_version}",
-            description="{app_name} Build",
-            executables=[Executable(r"{main_script}", target_name="{target_name}", base={base})],
-            options={{
-                "build_exe": {{
-                    "build_exe": r"{build_dir}",
-                    "packages": packages + external_packages,
-                    "includes": modules,  # Standalone modules go here
-                    "include_files": [],
-                    "path": [r"{venv_site_packages}", r"{project_path}"] + sys.path,
+    if incremental:
+        print("[2/5] Updating frozen modules...")
+        old_sources = state.get("sources", {})
+        changed = [p for p, h in sources.items() if old_sources.get(p) != h]
+        removed = [p for p in old_sources if p not in sources]
+
+        # Invalidate first so an interrupted patch can't be mistaken for a good build
+        _save_build_state(build_dir, None)
+        if not changed and not removed:
+            print("\t✓ No source changes")
+        elif _patch_frozen_modules(build_dir, project_path, changed, removed):
+            print(f"\t✓ Replaced {len(changed)} and removed {len(removed)} modules")
+        else:
+            print("\t! Changes could not be patched in, running a full freeze")
+            incremental = False
+            shutil.rmtree(build_dir)
+            os.makedirs(build_dir, exist_ok=True)
+
+    if not incremental:
+        print("[2/5] Running cx_Freeze...")
+        print(f"\tFound {len(includes)} dependencies: {includes}")
+        print(f"\tFound {len(project_packages)} packages: {project_packages}")
+        print(f"\tFound {len(project_modules)} modules: {project_modules}")
+
+        # Generate cx_Freeze setup script
+        setup_code = textwrap.dedent(f"""\
+            import sys
+            from cx_Freeze import setup, Executable
+
+            # Add virtual environment site-packages to sys.path
+            sys.path.insert(0, r"{venv_site_packages}")
+            # Add project path
+            sys.path.insert(0, r"{project_path}")
+
+            # Packages (directories with __init__.py)
+            packages = {project_packages!r}
+
+            # Standalone modules (.py files)
+            modules = {project_modules!r}
+
+            # External packages from requirements.txt
+            external_packages = {includes!r}
+
+            setup(
+                name="{app_name}",
+                version="{app_version}",
+                description="{app_name} Build",
+                executables=[Executable(r"{main_script}", target_name="{target_name}", base={base})],
+                options={{
+                    "build_exe": {{
+                        "build_exe": r"{build_dir}",
+                        "packages": packages + external_packages,
+                        "includes": modules,  # Standalone modules go here
+                        "include_files": [],
+                        "path": [r"{venv_site_packages}", r"{project_path}"] + sys.path,
+                    }}
                 }}
-            }}
-        )
-        """)
-
-    # Create temp script file for cx_freeze
-    with tempfile.TemporaryDirectory() as temp_dir:
-        setup_script_path = os.path.join(temp_dir, "setup_cxfreeze.py")
-        with open(setup_script_path, "w") as f:
-            f.write(setup_code)
-
-        try:
-            # Run cx_Freeze using system Python (which has cx_Freeze installed)
-            # but with the venv site-packages in PYTHONPATH
-            env = os.environ.copy()
-            if "PYTHONPATH" in env:
-                env["PYTHONPATH"] = (
-                    f"{venv_site_packages}{os.pathsep}{env['PYTHONPATH']}"
-                )
-            else:
-                env["PYTHONPATH"] = venv_site_packages
-
-            result = subprocess.run(
-                [sys.executable, setup_script_path, "build"],
-                check=True,
-                cwd=temp_dir,
-                env=env,
-                stdout=subprocess.DEVNULL,
-                # stderr=subprocess.DEVNULL,
             )
-            print(f"\t✓ cx_Freeze completed")
-        except subprocess.CalledProcessError as e:
-            print(f"\t✗ cx_Freeze failed (exit code {e.returncode})")
-            if e.stderr:
-                error_msg = e.stderr.decode()
-                print(f"\tError output:")
-                for line in error_msg.splitlines()[:10]:
-                    print(f"\t  {line}")
-            if e.stdout:
-                print(f"\tstdout: {e.stdout.decode()}")
-            return
+            """)
 
-    print(f"[3/5] Copying project assets...")
+        # Create temp script file for cx_freeze
+        with tempfile.TemporaryDirectory() as temp_dir:
+            setup_script_path = os.path.join(temp_dir, "setup_cxfreeze.py")
+            with open(setup_script_path, "w") as f:
+                f.write(setup_code)
 
+            try:
+                # Run cx_Freeze using system Python (which has cx_Freeze installed)
+                # but with the venv site-packages in PYTHONPATH
+                env = os.environ.copy()
+                if "PYTHONPATH" in env:
+                    env["PYTHONPATH"] = (
+                        f"{venv_site_packages}{os.pathsep}{env['PYTHONPATH']}"
+                    )
+                else:
+                    env["PYTHONPATH"] = venv_site_packages
+
+                subprocess.run(
+                    [sys.executable, setup_script_path, "build"],
+                    check=True,
+                    cwd=temp_dir,
+                    env=env,
+                    stdout=subprocess.DEVNULL,
+                    # stderr=subprocess.DEVNULL,
+                )
+                print("\t✓ cx_Freeze completed")
+            except subprocess.CalledProcessError as e:
+                print(f"\t✗ cx_Freeze failed (exit code {e.returncode})")
+                if e.stderr:
+                    error_msg = e.stderr.decode()
+                    print("\tError output:")
+                    for line in error_msg.splitlines()[:10]:
+                        print(f"\t  {line}")
+                if e.stdout:
+                    print(f"\tstdout: {e.stdout.decode()}")
+                return
+
+    print("[3/5] Syncing project assets...")
 
     # Data folders
     whitelist = {
         "assets", "data"
     }
 
-    copied_count = 0
+    synced_count = 0
+    pack = getattr(args, "pack", False)
+    pack_path = os.path.join(build_dir, PACK_FILE)
+
+    for item in os.listdir(build_dir):
+        if item.lower() in whitelist and (
+            not os.path.isdir(os.path.join(project_path, item))
+            or (pack and item.lower() == "assets")
+        ):
+            shutil.rmtree(os.path.join(build_dir, item), ignore_errors=True)
+            print(f"\t✓ Removed stale {item}/")
 
     for item in os.listdir(project_path):
         src = os.path.join(project_path, item)
         dst = os.path.join(build_dir, item)
 
-        if os.path.isdir(src) and item.lower() in whitelist:
+        if pack and item.lower() == "assets" and os.path.isdir(src):
             try:
-                shutil.copytree(src, dst)
-                print(f"\t✓ Moved {item}/")
-                copied_count += 1
+                stats = write_pack(project_path, item, pack_path)
+                if stats is not None:
+                    pack_state = "unchanged" if stats["reused"] else "written"
+                    print(
+                        f"\t✓ Packed {item}/ into {PACK_FILE}: {stats['files']} files, "
+                        f"{stats['size'] / 1024 / 1024:.1f} MB ({pack_state})"
+                    )
+                    synced_count += 1
             except Exception as e:
-                print(f"\t✗ Failed to move {item}/: {e}")
+                print(f"\t✗ Failed to pack {item}/: {e}")
 
-    print(f"Total files moved: {copied_count}")
+        elif os.path.isdir(src) and item.lower() in whitelist:
+            try:
+                stats = sync_tree(
+                    src,
+                    dst,
+                    checksum=getattr(args, "checksum", False),
+                    link=not getattr(args, "no_link", False),
+                )
+                placed = stats["linked"] + stats["cloned"] + stats["copied"]
+                print(
+                    f"\t✓ Synced {item}/: {placed} updated "
+                    f"({stats['linked']} linked, {stats['cloned']} cloned, "
+                    f"{stats['copied']} copied), {stats['skipped']} unchanged, "
+                    f"{stats['removed']} removed"
+                )
+                synced_count += 1
+            except Exception as e:
+                print(f"\t✗ Failed to sync {item}/: {e}")
+
+    print(f"Total folders synced: {synced_count}")
 
-    if copied_count == 0:
+    if synced_count == 0:
         print(f"\t!  No assets folder found")
 
+    if not pack and os.path.exists(pack_path):
+        os.remove(pack_path)
+
+    if getattr(args, "atlas", False):
+        try:
+            stats = pack_atlases(
+                project_path,
+                build_dir,
+                str(_venv_python_path(Path(env_folder))),
+                max_size=getattr(args, "atlas_size", 2048),
+                padding=getattr(args, "atlas_padding", 2),
+            )
+            if stats is None:
+                print("\t! No PNG images found for the texture atlas")
+            else:
+                print(
+                    f"\t✓ Packed {stats['images']} images into {stats['pages']} atlas pages"
+                )
+                if stats["skipped"]:
+                    print(
+                        f"\t! {stats['skipped']} images are larger than "
+                        f"the atlas page size and were left as files"
+                    )
+        except subprocess.CalledProcessError as e:
+            print(f"\t✗ Failed to pack the texture atlas (exit code {e.returncode})")
+    elif os.path.isdir(os.path.join(build_dir, ATLAS_DIR)):
+        # A stale atlas would shadow the loose images at runtime
+        shutil.rmtree(os.path.join(build_dir, ATLAS_DIR), ignore_errors=True)
+
     print(f"[4/5] Collecting licenses...")
 
     includes.remove("pygame")
@@ -380,21 +829,68 @@ def local_build(args):
     else:
         print(f"\t! No license files found")
 
-    shutil.move(os.path.join(build_dir, "frozen_application_license.txt"), licenses_dir)
+    frozen_license = os.path.join(build_dir, "frozen_application_license.txt")
+    if os.path.exists(frozen_license):
+        os.replace(
+            frozen_license,
+            os.path.join(licenses_dir, os.path.basename(frozen_license)),
+        )
 
     x2 = time()
     build_time = x2 - x1
 
     print(f"[5/5] Finalizing...")
+    _save_build_state(build_dir, {"deps_key": deps_key, "sources": sources})
     print(f"\t✓ BUILD COMPLETED in {build_time:.2f}s")
     print(f"Output: {build_dir}")
+    return build_dir
+
+
+def _optimize_web_output(build_dir: str, args) -> None:
+    hashed = getattr(args, "hash_names", False)
+    compressed = getattr(args, "precompress", False) or getattr(args, "brotli", False)
+    if not hashed and not compressed:
+        print("\t! Skipped (use --hash-names and --precompress)")
+        return
+
+    # pygbag writes the page to build/web next to the web.zip archive
+    web_dir = os.path.join(build_dir, "web")
+    if not os.path.isdir(web_dir):
+        web_dir = build_dir
+
+    if hashed:
+        renames = hash_names(web_dir)
+        print(f"\t✓ Content-hashed {len(renames)} file names ({MANIFEST_FILE})")
+
+    if compressed:
+        stats = precompress(web_dir, use_brotli=getattr(args, "brotli", False))
+        if stats is None:
+            print("\t! brotli is not installed (pip install brotli), writing gzip only")
+            stats = precompress(web_dir)
+        saved = f"gzip saves {stats['gzip'] / 1024:.0f} KB"
+        if stats["brotli"]:
+            saved += f", brotli saves {stats['brotli'] / 1024:.0f} KB"
+        print(f"\t✓ Precompressed {stats['files']} files: {saved}")
 
 
 def web_build(args):
     """Build a web version using pygbag.
 
+    pygbag archives the folder it runs in. With --pack it runs in a linked
+    copy of the project without assets/, so the archive holds the pack
+    instead of the loose files.
+
     Expects:
         - args.name (str): project name
+        - args.output (str, optional): output directory (default: ./build)
+        - args.pack (bool, optional): ship assets/ as assets.pak instead of loose files
+        - args.hash_names (bool, optional): content-hash static file names
+        - args.precompress (bool, optional): write .gz variants of the files
+        - args.brotli (bool, optional): also write .br variants
+        - args.local_cdn (bool, optional): build against the local CDN cache
+          (`pygame cdn`); the output then loads the runtime from localhost,
+          served by `pygame cdn serve`
+        - args.cdn_port (int, optional): port of the local CDN (default: 8001)
     """
     x1 = time()
     name = args.name
@@ -406,11 +902,16 @@ def web_build(args):
         return
 
     project_path = get_path(name)
-    build_dir = os.path.abspath("build")
+    build_dir = os.path.abspath(getattr(args, "output", None) or "build")
+    try:
+        sync_shared_env(Path(project_path))
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"\t✗ Could not prepare the shared venv: {e}")
+        return
 
     # Remove previous build
     if os.path.exists(build_dir):
-        print(f"[1/3] Cleaning previous build...")
+        print("[1/5] Cleaning previous build...")
         try:
             shutil.rmtree(build_dir)
             print(f"\t✓ Removed: {build_dir}")
@@ -418,11 +919,30 @@ def web_build(args):
             print(f"\t✗ Error: {e}")
             return
     else:
-        print(f"[1/3] No previous build found")
+        print("[1/5] No previous build found")
 
     os.makedirs(build_dir, exist_ok=True)
 
-    print(f"[2/3] Running pygbag...")
+    print("[2/5] Running pygbag...")
+
+    cdn_server = contextlib.ExitStack()
+    if cdn is None and getattr(args, "local_cdn", False):
+        req_file = os.path.join(project_path, "requirements.txt")
+        local_cdn = cached_cdn(req_file)
+        if local_cdn is None:
+            print("\t! pinned pygbag version is not in the CDN cache, using the remote CDN")
+        else:
+            # A fixed port, the build keeps loading its runtime from there
+            port = getattr(args, "cdn_port", None) or CDN_PORT
+            try:
+                cdn_url = cdn_server.enter_context(serve_cache(port))
+            except OSError as e:
+                print(f"\t✗ Could not serve the local CDN on port {port}: {e}")
+                return
+            cdn = f"{cdn_url}{pinned_pygbag(req_file)}/"
+            print(f"\t✓ Using the local CDN cache: {local_cdn}")
+            print(f"\t! The build loads its runtime from {cdn}")
+            print(f"\t  Serve it with: pygame cdn serve --port {port}")
 
     cmd = [sys.executable, "-m", "pygbag", "--archive"]
     if cdn is not None:
@@ -455,24 +975,57 @@ def web_build(args):
     else:
         env["PYTHONPATH"] = venv_site_packages
 
+    source_dir = project_path
+    staging = None
+    if getattr(args, "pack", False) and os.path.isdir(
+        os.path.join(project_path, "assets")
+    ):
+        # Next to the project so files can be hardlinked, and named like it
+        # since pygbag names the app after its folder
+        staging = tempfile.TemporaryDirectory(
+            prefix=f".{name}-web-", dir=os.path.dirname(project_path)
+        )
+        source_dir = os.path.join(staging.name, name)
+        try:
+            shutil.copytree(
+                project_path,
+                source_dir,
+                ignore=lambda folder, names: (
+                    WEB_PACK_SKIP.intersection(names) if folder == project_path else []
+                ),
+                copy_function=lambda src, dst: _place_file(src, dst, True),
+            )
+            stats = write_pack(project_path, "assets", os.path.join(source_dir, PACK_FILE))
+        except Exception as e:
+            print(f"\t✗ Failed to pack assets/: {e}")
+            cdn_server.close()
+            staging.cleanup()
+            return
+        if stats is not None:
+            print(f"\t✓ Packed assets/ into {PACK_FILE}: {stats['files']} files")
+
     try:
         subprocess.run(
             cmd,
             check=True,
             env=env,
-            cwd=project_path,
+            cwd=source_dir,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
         print(f"\t✓ pygbag completed")
     except subprocess.CalledProcessError as e:
         print(f"\t✗ pygbag failed (exit code {e.returncode})")
+        if staging is not None:
+            staging.cleanup()
         return
+    finally:
+        cdn_server.close()
 
     # Move build from project to current directory
-    pygbag_output_dir = os.path.join(project_path, "build")
+    pygbag_output_dir = os.path.join(source_dir, "build")
 
-    print(f"[3/4] Moving build files...")
+    print("[3/5] Moving build files...")
 
     try:
         shutil.rmtree(build_dir)
@@ -485,8 +1038,11 @@ def web_build(args):
         except Exception:
             pass
         return
+    finally:
+        if staging is not None:
+            staging.cleanup()
 
-    print(f"[4/4] Collecting licenses...")
+    print("[4/5] Collecting licenses...")
 
     # Find site-packages in the virtual environment
     env_folder = os.path.join(project_path, ".env")
@@ -529,23 +1085,138 @@ def web_build(args):
     else:
         print(f"\t! No license files found")
 
+    print("[5/5] Optimizing web output...")
+    _optimize_web_output(build_dir, args)
+
     x2 = time()
     build_time = x2 - x1
 
     print(f"✓ WEB BUILD COMPLETED in {build_time:.2f}s")
     print(f"Output: {build_dir}")
+    return build_dir
+
+
+class _PrefixedOutput:
+    """Write complete lines to stdout with a project prefix."""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.buffer = ""
+
+    def write(self, text: str) -> int:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        for line in lines:
+            sys.__stdout__.write(f"{self.prefix}{line}\n")
+        sys.__stdout__.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.write("\n")
+
+
+def _build_worker(name: str, options: dict) -> dict:
+    args = argparse.Namespace(**options)
+    args.name = name
+    args.output = os.path.join(options["output"] or "build", name)
+
+    start = time()
+    output = _PrefixedOutput(f"[{name}] ")
+    with contextlib.redirect_stdout(output):
+        try:
+            build_dir = web_build(args) if args.web else local_build(args)
+        except Exception as e:
+            print(f"✗ Build crashed: {e}")
+            build_dir = None
+    output.flush()
+
+    size = 0
+    if build_dir:
+        for root, _, files in os.walk(build_dir):
+            for file in files:
+                try:
+                    size += os.lstat(os.path.join(root, file)).st_size
+                except OSError:
+                    pass
+
+    return {
+        "name": name,
+        "ok": build_dir is not None,
+        "time": time() - start,
+        "size": size,
+        "output": build_dir,
+    }
+
+
+def batch_build(args: Any) -> list[dict]:
+    """Build several projects in parallel, each into its own directory.
+
+    Expects:
+        - args.name (list[str]): project names
+        - args.all (bool, optional): build every project
+        - args.tags (list[str], optional): build projects with any of these tags
+        - args.jobs (int, optional): number of parallel builds
+        - args.output (str, optional): parent output directory (default: ./build)
+    """
+    names = list(args.name or [])
+    tags = set(getattr(args, "tags", None) or [])
+    if getattr(args, "all", False) or tags:
+        for project in registered_projects():
+            if project in names:
+                continue
+            metadata = (lookup_project(project) or {}).get("metadata") or {}
+            project_tags = metadata.get("tags") or []
+            if getattr(args, "all", False) or tags.intersection(project_tags):
+                names.append(project)
+
+    if not names:
+        print("No projects to build")
+        return []
+
+    jobs = max(1, getattr(args, "jobs", None) or os.cpu_count() or 1)
+    options = {k: v for k, v in vars(args).items() if k not in ("func", "name")}
+    options.setdefault("output", None)
+    options.setdefault("web", False)
+
+    print(f"Building {len(names)} projects with {min(jobs, len(names))} workers...")
+    results = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(names))) as executor:
+        futures = [executor.submit(_build_worker, name, options) for name in names]
+        for future in as_completed(futures):
+            results.append(future.result())
+
+    results.sort(key=lambda r: names.index(r["name"]))
+    width = max(len("Project"), *(len(r["name"]) for r in results))
+    print("=======================")
+    print(f"{'Project':<{width}}  Status  {'Time':>8}  {'Size':>10}")
+    for r in results:
+        status = "ok" if r["ok"] else "failed"
+        size = f"{r['size'] / 1024 / 1024:.1f} MB" if r["ok"] else "-"
+        print(f"{r['name']:<{width}}  {status:<6}  {r['time']:>7.1f}s  {size:>10}")
+    print("=======================")
+    failed = sum(not r["ok"] for r in results)
+    print(f"Built {len(results) - failed}/{len(results)} projects")
+    return results
 
 
 def build_project(args: Any) -> None:
     """Build a project for local or web.
 
     Expects:
-        - args.name (str): project name
+        - args.name (str | list[str]): project name(s)
         - args.web (bool, optional): web builds
+        - args.all / args.tags / args.jobs (optional): batch builds
     """
+    names = [args.name] if isinstance(getattr(args, "name", None), str) else args.name
+    if getattr(args, "all", False) or getattr(args, "tags", None) or len(names or []) > 1:
+        batch_build(args)
+        return
 
-    if not hasattr(args, "name") or not args.name:
-        raise ValueError("args.name is required")
+    if not names:
+        print("No project given, pass a name, --all or --tags")
+        return
+    args.name = names[0]
     if args.web:
         web_build(args)
     else:
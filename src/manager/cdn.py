@@ -0,0 +1,333 @@
+from .path import get_cache_path
+from .registry import lookup_project, registered_projects
+
+import contextlib
+import functools
+import http.server
+import os
+import re
+import shutil
+import tarfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+CDN_DIR = "cdn"
+# Web builds made with --local-cdn load the runtime from this port
+CDN_PORT = 8001
+CDN_HEADER = "X-Pygame-CDN"
+TEMPLATE_REQUIREMENTS = Path(__file__).parent.parent / "template" / "requirements.txt"
+
+_PYGBAG_PIN = re.compile(r"^\s*pygbag\s*==\s*([^\s;#]+)", re.IGNORECASE)
+_VERSION = re.compile(r"[A-Za-z0-9][A-Za-z0-9._+-]*")
+
+
+def _cdn_root() -> str:
+    return os.path.join(get_cache_path(), CDN_DIR)
+
+
+def _valid_version(version: str) -> bool:
+    # Versions become folder names, so no separators or parent references
+    return bool(_VERSION.fullmatch(version)) and ".." not in version
+
+
+def _version_dir(version: str) -> str:
+    if not _valid_version(version):
+        raise ValueError(f"not a valid version: {version!r}")
+    return os.path.join(_cdn_root(), version)
+
+
+def pinned_pygbag(requirements: Path) -> Optional[str]:
+    """Return the pygbag version pinned in a requirements file, if any."""
+    try:
+        with open(requirements, "r", encoding="utf-8") as f:
+            for line in f:
+                match = _PYGBAG_PIN.match(line)
+                if match:
+                    return match.group(1)
+    except OSError:
+        pass
+    return None
+
+
+def cached_cdn(requirements: Path) -> Optional[str]:
+    """Return the cache directory for the pygbag pinned in requirements.txt.
+
+    Returns:
+        The directory, or None if nothing is pinned or that version has not
+        been populated.
+    """
+    version = pinned_pygbag(requirements)
+    if version is None or not _valid_version(version):
+        return None
+    directory = _version_dir(version)
+    return directory if os.path.isdir(directory) else None
+
+
+class _CDNRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # The game page is served by pygbag from another port
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        ".wasm": "application/wasm",
+        ".mjs": "text/javascript",
+    }
+
+    def end_headers(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header(CDN_HEADER, "1")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _CDNServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # On Windows this would let two servers share the port
+    allow_reuse_address = os.name != "nt"
+
+
+def _serves_cache(port: int) -> bool:
+    """Whether the local CDN cache is already served on the port."""
+    # Only needed when the port is taken, urllib is slow to import
+    import urllib.error
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(f"http://localhost:{port}/", timeout=1.0) as response:
+            return response.headers.get(CDN_HEADER) == "1"
+    except (OSError, urllib.error.URLError):
+        return False
+
+
+def _server(directory: str, port: int) -> _CDNServer:
+    handler = functools.partial(_CDNRequestHandler, directory=directory)
+    return _CDNServer(("localhost", port), handler)
+
+
+@contextlib.contextmanager
+def _serving(server: _CDNServer) -> Iterator[str]:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://localhost:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def serve_cdn(directory: str, port: int = 0) -> ContextManager[str]:
+    """Serve a CDN directory on a local port, a free one by default.
+
+    Yields:
+        The URL to pass to pygbag as --cdn.
+
+    Raises:
+        OSError: If the port is in use.
+    """
+    return _serving(_server(directory, port))
+
+
+@contextlib.contextmanager
+def serve_cache(port: int = CDN_PORT) -> Iterator[str]:
+    """Serve the whole CDN cache on a fixed port, each version in its folder.
+
+    A server already serving the cache there, like `pygame cdn serve` or a
+    parallel build, is used instead of starting another one.
+
+    Yields:
+        The URL of the cache, `<url><version>/` is the --cdn for a version.
+
+    Raises:
+        OSError: If the port is used by something else.
+    """
+    try:
+        server = _server(_cdn_root(), port)
+    except OSError:
+        if not _serves_cache(port):
+            raise
+        yield f"http://localhost:{port}/"
+        return
+    with _serving(server) as url:
+        yield url
+
+
+def _extract(source: str, destination: str) -> None:
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(destination)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(destination, filter="data")
+            else:
+                archive.extractall(destination)
+    else:
+        raise ValueError(f"Not a zip or tar archive: {source}")
+
+
+def _single_subfolder(directory: str) -> str:
+    # Archives usually wrap everything in one folder, e.g. archives/0.9/
+    entries = os.listdir(directory)
+    if len(entries) == 1 and os.path.isdir(os.path.join(directory, entries[0])):
+        return os.path.join(directory, entries[0])
+    return directory
+
+
+def _folder_size(directory: str) -> int:
+    total = 0
+    for root, _, files in os.walk(directory):
+        for file in files:
+            with contextlib.suppress(OSError):
+                total += os.lstat(os.path.join(root, file)).st_size
+    return total
+
+
+def _pinned_versions() -> Dict[str, list]:
+    pins: Dict[str, list] = {}
+    for name in registered_projects():
+        entry = lookup_project(name)
+        if entry is None:
+            continue
+        version = pinned_pygbag(Path(entry["path"]) / "requirements.txt")
+        if version is not None:
+            pins.setdefault(version, []).append(name)
+    return pins
+
+
+def _populate(source: str, version: Optional[str]) -> None:
+    version = version or pinned_pygbag(TEMPLATE_REQUIREMENTS)
+    if not version:
+        print("No version given and none pinned in the template, use --version")
+        return
+    if not os.path.exists(source):
+        print(f"✗ Not found: {source}")
+        return
+
+    if not _valid_version(version):
+        print(f"✗ Not a valid version: {version!r}")
+        return
+
+    root = _cdn_root()
+    os.makedirs(root, exist_ok=True)
+    target = _version_dir(version)
+    staging = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    print(f"Populating pygbag {version} CDN cache from {source}...")
+    try:
+        if os.path.isdir(source):
+            shutil.copytree(source, staging)
+            content = staging
+        else:
+            os.makedirs(staging)
+            _extract(source, staging)
+            content = _single_subfolder(staging)
+
+        # Swap in the new version only once it is complete
+        old = f"{target}.{os.getpid()}.old"
+        if os.path.exists(target):
+            os.replace(target, old)
+        try:
+            os.replace(content, target)
+        except OSError:
+            if os.path.exists(old):
+                os.replace(old, target)
+            raise
+        shutil.rmtree(old, ignore_errors=True)
+    except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as e:
+        print(f"\t✗ Failed: {e}")
+        return
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    files = sum(len(files) for _, _, files in os.walk(target))
+    size = _folder_size(target) / (1024 * 1024)
+    print(f"\t✓ Cached {files} files ({size:.1f} MB) in {target}")
+
+
+def _list() -> None:
+    root = _cdn_root()
+    versions = sorted(os.listdir(root)) if os.path.isdir(root) else []
+    versions = [v for v in versions if _valid_version(v) and not v.endswith((".tmp", ".old"))]
+    if not versions:
+        print("No cached CDN versions")
+        return
+
+    pins = _pinned_versions()
+    print(f"{'Version':<12} {'Size':>10}  Used by")
+    for version in versions:
+        size = _folder_size(_version_dir(version)) / (1024 * 1024)
+        users = ", ".join(pins.get(version, [])) or "-"
+        print(f"{version:<12} {size:>8.1f}MB  {users}")
+
+
+def _clean() -> None:
+    root = _cdn_root()
+    if not os.path.isdir(root):
+        print("No cached CDN versions")
+        return
+
+    keep = set(_pinned_versions())
+    template_version = pinned_pygbag(TEMPLATE_REQUIREMENTS)
+    if template_version:
+        keep.add(template_version)
+
+    removed = kept = 0
+    for version in sorted(os.listdir(root)):
+        if version.endswith((".tmp", ".old")) or not _valid_version(version):
+            # Staged by a download that may still be running
+            continue
+        if version in keep:
+            kept += 1
+            continue
+        shutil.rmtree(_version_dir(version), ignore_errors=True)
+        print(f"\t✓ Removed {version}")
+        removed += 1
+    print(f"Removed {removed} unused version(s), kept {kept}")
+
+
+def _serve(port: int) -> None:
+    os.makedirs(_cdn_root(), exist_ok=True)
+    try:
+        server = _server(_cdn_root(), port)
+    except OSError as e:
+        print(f"✗ Could not serve on port {port}: {e}")
+        return
+    print(f"Serving the CDN cache on http://localhost:{port}/, Ctrl+C to stop")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def manage_cdn(args: Any) -> None:
+    """Manage the local cache of the pygbag runtime (the CDN files).
+
+    `pygame run --web` serves the cached version matching the pygbag pinned
+    in the project's requirements.txt and passes it to pygbag as --cdn.
+    Builds made with `pygame build --web --local-cdn` load it from
+    localhost:8001 (--cdn-port), `pygame cdn serve` serves it there.
+
+    Expects:
+      - args.cdn_action (str): "populate", "list", "clean" or "serve"
+      - args.source (str): directory or archive to populate from
+      - args.version (str, optional): pygbag version of the files (default:
+        the version pinned in the project template)
+      - args.port (int, optional): port for serve (default: 8001)
+    """
+    if not hasattr(args, "cdn_action") or not args.cdn_action:
+        raise ValueError("args.cdn_action is required")
+
+    if args.cdn_action == "populate":
+        _populate(args.source, getattr(args, "version", None))
+    elif args.cdn_action in ("list", "ls"):
+        _list()
+    elif args.cdn_action == "clean":
+        _clean()
+    elif args.cdn_action == "serve":
+        _serve(getattr(args, "port", None) or CDN_PORT)
+    else:
+        print(f"Unknown cdn action '{args.cdn_action}'")
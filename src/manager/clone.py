@@ -1,49 +1,204 @@
-from .path import valid_project, create_path
+from .path import get_path, valid_project, create_path
+from .registry import update_project
+from .seed import create_venv
 
+import os
 import shutil
-import venv
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
+from time import perf_counter as time
+from typing import Any, List, Optional, Sequence
 
-from git import Repo
+from git import GitCommandError, RemoteProgress, Repo
 
-def clone_project(args: Any) -> Optional[str]:
-    """Clone a Git repository as a new project.
+# The registry index is rewritten in place, one writer at a time
+_registry_lock = threading.Lock()
 
-    Expects:
-        - source (str): Git repository URL HTTPS/SSH
-    """
-    if not hasattr(args, "source") or not args.source:
-        raise ValueError("args.source is required")
 
-    source = args.source
+class _CloneProgress(RemoteProgress):
+    """Print git's clone progress as lines prefixed with the project name."""
+
+    STEP = 10
+    STAGES = {
+        RemoteProgress.COUNTING: "Counting objects",
+        RemoteProgress.COMPRESSING: "Compressing objects",
+        RemoteProgress.RECEIVING: "Receiving objects",
+        RemoteProgress.RESOLVING: "Resolving deltas",
+        RemoteProgress.CHECKING_OUT: "Checking out files",
+        RemoteProgress.FINDING_SOURCES: "Finding sources",
+        RemoteProgress.WRITING: "Writing objects",
+    }
+
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+        self.last = None
+
+    def update(self, op_code, cur_count, max_count=None, message=""):
+        if not max_count:
+            return
+        stage = self.STAGES.get(op_code & self.OP_MASK, "Working")
+        percent = int(cur_count * 100 / max_count)
+        step = (stage, percent // self.STEP)
+        # One line per stage and 10%, not one per object
+        if step == self.last:
+            return
+        self.last = step
+        print(f"{self.prefix}{stage}: {percent}% ({int(cur_count)}/{int(max_count)})")
+
+
+def _project_name(source: str) -> str:
     name = source.rstrip("/").split("/")[-1]
     if name.endswith(".git"):
         name = name[:-4]
+    return name
+
 
+def _clone(
+    source: str,
+    name: str,
+    depth: Optional[int] = None,
+    branch: Optional[str] = None,
+    filter_spec: Optional[str] = None,
+    sparse: Optional[Sequence[str]] = None,
+    prefix: str = "",
+) -> Optional[str]:
     if valid_project(name):
-        print(f"Project `{name}` already exists")
+        print(f"{prefix}Project `{name}` already exists")
+        return None
+    if os.path.isdir(get_path(name)) and os.listdir(get_path(name)):
+        print(f"{prefix}Folder `{get_path(name)}` already exists and is not empty")
         return None
 
     full_path = Path(create_path(name))
 
+    options = {}
+    if depth:
+        options["depth"] = depth
+    if branch:
+        options["branch"] = branch
+    if filter_spec:
+        options["filter"] = filter_spec
+    if sparse:
+        # Only the top level files are checked out until the set below
+        options["sparse"] = True
+
+    progress = _CloneProgress(prefix)
     try:
-        print(f"Cloning from {source} ...")
-        Repo.clone_from(source, str(full_path))
+        print(f"{prefix}Cloning from {source} ...")
+        try:
+            repo = Repo.clone_from(source, str(full_path), progress=progress, **options)
+        except GitCommandError as e:
+            # The progress handler reads stderr, so git's message ends up there
+            if progress.error_lines:
+                raise RuntimeError(progress.error_lines[0].strip()) from e
+            raise
+        if sparse:
+            repo.git.sparse_checkout("set", *sparse)
+            print(f"{prefix}Sparse checkout: {', '.join(sparse)}")
+
         venv_dir = full_path / ".env"
-        print("Creating virtual environment...")
-        builder = venv.EnvBuilder(with_pip=True)
-        builder.create(str(venv_dir))
+        print(f"{prefix}Creating virtual environment...")
+        create_venv(venv_dir)
 
         if not valid_project(name):
-            print(f"{name} is not a valid project")
+            print(f"{prefix}{name} is not a valid project")
             shutil.rmtree(full_path)
             return None
 
-        print(f"Path: {full_path}")
-        print(f"Project '{name}' cloned successfully!")
+        with _registry_lock:
+            update_project(name)
+        print(f"{prefix}Path: {full_path}")
+        print(f"{prefix}Project '{name}' cloned successfully!")
         return str(full_path)
 
     except Exception:
-        shutil.rmtree(full_path)
+        shutil.rmtree(full_path, ignore_errors=True)
         raise
+
+
+def _read_manifest(manifest: str) -> List[tuple]:
+    """Read `<url> [name]` lines, `#` starts a comment."""
+    entries = []
+    with open(manifest, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            name = parts[1] if len(parts) > 1 else _project_name(parts[0])
+            entries.append((parts[0], name))
+    return entries
+
+
+def _clone_many(entries: List[tuple], jobs: int, options: dict) -> List[dict]:
+    width = max(len(name) for _, name in entries)
+
+    def worker(entry):
+        source, name = entry
+        start = time()
+        prefix = f"[{name:<{width}}] "
+        try:
+            path = _clone(source, name, prefix=prefix, **options)
+        except Exception as e:
+            path = None
+            print(f"{prefix}✗ {e}")
+        return {"name": name, "ok": path is not None, "time": time() - start}
+
+    print(f"Cloning {len(entries)} repositories with {jobs} workers...")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(worker, entries))
+
+    print("=======================")
+    print(f"{'Project':<{width}}  Status  {'Time':>8}")
+    for r in results:
+        status = "ok" if r["ok"] else "failed"
+        print(f"{r['name']:<{width}}  {status:<6}  {r['time']:>7.1f}s")
+    print("=======================")
+    failed = sum(not r["ok"] for r in results)
+    print(f"Cloned {len(results) - failed}/{len(results)} projects")
+    return results
+
+
+def clone_project(args: Any) -> Optional[str]:
+    """Clone a Git repository as a new project.
+
+    Expects:
+        - source (str): Git repository URL HTTPS/SSH
+        - name (str, optional): project name (default: the repository name)
+        - depth (int, optional): shallow clone with this many commits
+        - branch (str, optional): branch or tag to clone
+        - filter (str, optional): partial clone filter, e.g. blob:none
+        - sparse (list[str], optional): only check out these folders
+        - manifest (str, optional): file of `<url> [name]` lines to clone
+        - jobs (int, optional): concurrent clones for --manifest
+    """
+    options = {
+        "depth": getattr(args, "depth", None),
+        "branch": getattr(args, "branch", None),
+        "filter_spec": getattr(args, "filter", None),
+        "sparse": getattr(args, "sparse", None),
+    }
+
+    manifest = getattr(args, "manifest", None)
+    if manifest:
+        try:
+            entries = _read_manifest(manifest)
+        except OSError as e:
+            print(f"Failed to read manifest: {e}")
+            return None
+        if not entries:
+            print("The manifest lists no repositories")
+            return None
+        jobs = getattr(args, "jobs", None) or min(4, len(entries))
+        _clone_many(entries, jobs, options)
+        return None
+
+    if not getattr(args, "source", None):
+        print("Give a repository URL, or a file of them with --manifest")
+        return None
+
+    source = args.source
+    name = getattr(args, "name", None) or _project_name(source)
+    return _clone(source, name, **options)
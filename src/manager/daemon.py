@@ -0,0 +1,217 @@
+from .path import get_cache_path
+
+import contextlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, List, Optional
+
+SOCKET_FILE = "daemon.sock"
+START_TIMEOUT = 5.0
+REQUEST_TIMEOUT = 30.0
+# A client gets this long to send its request, and it may be this large, so
+# a stuck or misbehaving client can't block the daemon for the others
+READ_TIMEOUT = 2.0
+MAX_REQUEST_SIZE = 64 * 1024
+
+# Read-only commands that are safe to run inside the daemon. Everything else
+# (interactive prompts, long running games, builds) runs in its own process.
+FORWARDED_COMMANDS = {"list", "ls", "info", "metadata"}
+
+
+def _socket_path() -> str:
+    return os.path.join(get_cache_path(), SOCKET_FILE)
+
+
+def _supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def _request(message: dict, timeout: float = REQUEST_TIMEOUT) -> Optional[dict]:
+    """Send a message to the daemon, None if it is not running."""
+    path = _socket_path()
+    if not _supported() or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path)
+            client.sendall(json.dumps(message).encode() + b"\n")
+            client.shutdown(socket.SHUT_WR)
+            data = b"".join(iter(lambda: client.recv(65536), b""))
+        return json.loads(data)
+    except (OSError, ValueError):
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """Run a command through the daemon if possible.
+
+    Args:
+        argv: The command line arguments, without the program name.
+
+    Returns:
+        The exit code of the command, or None when it has to run locally
+        (no daemon running, or a command the daemon does not serve).
+    """
+    if not argv or argv[0] not in FORWARDED_COMMANDS:
+        return None
+    response = _request({"argv": argv})
+    if response is None:
+        return None
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    return response.get("code", 0)
+
+
+def _read_message(connection: socket.socket) -> dict:
+    connection.settimeout(READ_TIMEOUT)
+    data = b""
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST_SIZE:
+            raise ValueError("request too large")
+    message = json.loads(data)
+    if not isinstance(message, dict):
+        raise ValueError("request is not an object")
+    return message
+
+
+def _run_command(argv: List[str]) -> dict:
+    from ..cli import cli
+
+    output = io.StringIO()
+    code = 0
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            cli(argv)
+        except SystemExit as e:
+            # argparse errors and --help
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"Error: {e}")
+            code = 1
+    return {"output": output.getvalue(), "code": code}
+
+
+def serve() -> None:
+    """Serve commands on the daemon socket until a stop request arrives.
+
+    Requests are handled one at a time, since the commands print to the
+    process-wide stdout. A client that does not send its request within
+    READ_TIMEOUT is dropped.
+    """
+    path = _socket_path()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+    # Import the served commands up front so the first request is warm too
+    from . import info, list as _list  # noqa: F401
+    from ..cli import cli  # noqa: F401
+
+    started = time.time()
+    served = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        os.chmod(path, 0o600)
+        server.listen()
+        try:
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    try:
+                        message = _read_message(connection)
+                    except (OSError, ValueError):
+                        # socket.timeout is an OSError
+                        continue
+
+                    if message.get("stop"):
+                        connection.sendall(json.dumps({"stopped": True}).encode())
+                        break
+                    if message.get("status"):
+                        response = {
+                            "pid": os.getpid(),
+                            "uptime": time.time() - started,
+                            "served": served,
+                        }
+                    elif (message.get("argv") or [None])[0] in FORWARDED_COMMANDS:
+                        response = _run_command(message["argv"])
+                        served += 1
+                    else:
+                        response = {"output": "Command not served by the daemon\n", "code": 1}
+
+                    with contextlib.suppress(OSError):
+                        connection.sendall(json.dumps(response).encode())
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def _start() -> None:
+    status = _request({"status": True})
+    if status is not None:
+        print(f"Daemon already running (pid {status['pid']})")
+        return
+
+    subprocess.Popen(
+        [sys.executable, "-c", "from pygame_cli.manager.daemon import serve; serve()"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        status = _request({"status": True}, timeout=1.0)
+        if status is not None:
+            print(f"Daemon started (pid {status['pid']})")
+            print(f"Serving: {', '.join(sorted(FORWARDED_COMMANDS))}")
+            return
+        time.sleep(0.05)
+    print("Daemon did not start in time")
+
+
+def _stop() -> None:
+    if _request({"stop": True}) is None:
+        print("Daemon is not running")
+        return
+    print("Daemon stopped")
+
+
+def _status() -> None:
+    status = _request({"status": True})
+    if status is None:
+        print("Daemon is not running")
+        return
+    print(f"Daemon running (pid {status['pid']})")
+    print(f"Uptime:  {status['uptime']:.0f}s")
+    print(f"Served:  {status['served']} commands")
+    print(f"Socket:  {_socket_path()}")
+
+
+def manage_daemon(args: Any) -> None:
+    """Start, stop or query the background daemon.
+
+    Expects:
+      - args.action (str): "start", "stop" or "status"
+    """
+    if not hasattr(args, "action") or not args.action:
+        raise ValueError("args.action is required")
+
+    if not _supported():
+        print("The daemon needs Unix domain sockets, which this platform lacks")
+        return
+
+    actions = {"start": _start, "stop": _stop, "status": _status}
+    if args.action not in actions:
+        print(f"Unknown daemon action '{args.action}'")
+        return
+    actions[args.action]()
@@ -0,0 +1,250 @@
+from .path import get_path, get_projects_path, valid_project
+from .registry import registered_projects
+
+import contextlib
+import hashlib
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter as time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+STORE_DIR = ".store"
+CHUNK_SIZE = 1024 * 1024
+
+# Only installed packages are shared. bin/, Scripts/ and pyvenv.cfg hold
+# paths of their own venv and are left alone.
+SHARED_DIRS = ("lib", "Lib", "lib64")
+
+
+def _store_path() -> str:
+    return os.path.join(get_projects_path(), STORE_DIR)
+
+
+def _candidates(venv_dir: Path) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield the regular files of the venv packages that are not linked yet."""
+    for shared in SHARED_DIRS:
+        top = venv_dir / shared
+        if top.is_symlink() or not top.is_dir():
+            # lib64 is a symlink to lib on some systems
+            continue
+        for root, _, files in os.walk(top):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    info = os.lstat(path)
+                except OSError:
+                    continue
+                # Linked files are already in the store, empty ones gain nothing
+                if stat.S_ISREG(info.st_mode) and info.st_size and info.st_nlink == 1:
+                    yield path, info
+
+
+def _digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(path: str, info: os.stat_result, store: str) -> Tuple[int, int]:
+    """Replace a file with a hardlink to its copy in the store.
+
+    The first copy of some content becomes the store entry itself. Store
+    entries are made read-only on POSIX: pip replaces files instead of
+    writing to them, so an upgrade in one venv leaves the others alone, and
+    anything that does write in place fails instead of changing them all
+    (except as root, which ignores the permission).
+
+    Returns:
+        The number of bytes saved and of files added to the store.
+    """
+    digest = _digest(path)
+    executable = os.name != "nt" and info.st_mode & 0o111
+    target = os.path.join(store, digest[:2], digest + ("-x" if executable else ""))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(path, target)
+        if os.name != "nt":
+            os.chmod(target, stat.S_IMODE(info.st_mode) & ~0o222)
+        return 0, 1
+    except FileExistsError:
+        pass
+
+    tmp = f"{path}.{os.getpid()}.dedupe"
+    try:
+        os.link(target, tmp)
+        os.replace(tmp, path)
+    except OSError:
+        # e.g. a loaded .pyd on Windows, keep the private copy
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        return 0, 0
+    return info.st_size, 0
+
+
+def _source_of(pyc: str) -> str:
+    # pkg/__pycache__/mod.cpython-311.opt-1.pyc -> pkg/mod.py
+    module = os.path.basename(pyc).split(".", 1)[0]
+    return os.path.join(os.path.dirname(os.path.dirname(pyc)), module + ".py")
+
+
+def _retarget_pyc(path: str, moved: Dict[str, Tuple[int, int]]) -> None:
+    """Point a pyc at the new mtime of its deduped source.
+
+    A linked source takes the mtime of the store entry, which would make its
+    pyc look stale and be compiled again on the next import. The code is the
+    same, so only the header changes. The pycs themselves are not shared,
+    they hold the absolute path of their own venv.
+    """
+    source = _source_of(path)
+    if source not in moved:
+        return
+    old, new = moved[source]
+    with open(path, "r+b") as f:
+        header = f.read(16)
+        if len(header) < 16:
+            return
+        flags = int.from_bytes(header[4:8], "little")
+        mtime = int.from_bytes(header[8:12], "little")
+        # Hash based pycs (flags != 0) do not depend on the mtime
+        if flags != 0 or mtime != old & 0xFFFFFFFF:
+            return
+        f.seek(8)
+        f.write((new & 0xFFFFFFFF).to_bytes(4, "little"))
+
+
+def dedupe_env(venv_dir: Path, workers: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """Hardlink the package files of a venv into the shared store.
+
+    Returns:
+        The files seen, bytes saved and files added to the store, or None if
+        the filesystem does not support hardlinks.
+    """
+    store = _store_path()
+    stats = {"files": 0, "saved": 0, "stored": 0}
+    candidates = list(_candidates(Path(venv_dir)))
+    if not candidates:
+        return stats
+    try:
+        os.makedirs(store, exist_ok=True)
+        # Try one link first, so unsupported filesystems fail fast
+        os.link(candidates[0][0], os.path.join(store, f".probe-{os.getpid()}"))
+        os.remove(os.path.join(store, f".probe-{os.getpid()}"))
+    except OSError:
+        return None
+
+    sources, pycs = [], []
+    for candidate in candidates:
+        is_pyc = os.path.basename(os.path.dirname(candidate[0])) == "__pycache__"
+        (pycs if is_pyc else sources).append(candidate)
+    moved: Dict[str, Tuple[int, int]] = {}
+
+    def link_source(candidate):
+        path, info = candidate
+        try:
+            saved, stored = _link(path, info, store)
+        except OSError:
+            return 0, 0
+        if saved and path.endswith(".py"):
+            with contextlib.suppress(OSError):
+                mtime = int(os.stat(path).st_mtime)
+                if mtime != int(info.st_mtime):
+                    moved[path] = (int(info.st_mtime), mtime)
+        return saved, stored
+
+    # hashlib releases the GIL, so hashing runs in parallel
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for saved, stored in executor.map(link_source, sources):
+            stats["files"] += 1
+            stats["saved"] += saved
+            stats["stored"] += stored
+    for path, _ in pycs:
+        with contextlib.suppress(OSError):
+            _retarget_pyc(path, moved)
+    return stats
+
+
+def dedupe_after_install(venv_dir: Path) -> None:
+    """Dedupe a freshly created or updated venv, printing the savings."""
+    stats = dedupe_env(venv_dir)
+    if stats and stats["saved"]:
+        print(f"\t✓ Shared {stats['saved'] / 1024 / 1024:.1f} MB of packages with other projects")
+
+
+def collect_garbage() -> Dict[str, int]:
+    """Remove store entries no venv links to anymore."""
+    stats = {"removed": 0, "freed": 0, "kept": 0, "size": 0}
+    store = _store_path()
+    if not os.path.isdir(store):
+        return stats
+    for prefix in os.listdir(store):
+        folder = os.path.join(store, prefix)
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    # DirEntry.stat has no link count on Windows
+                    info = os.lstat(entry.path) if os.name == "nt" else entry.stat(follow_symlinks=False)
+                    if info.st_nlink > 1:
+                        stats["kept"] += 1
+                        stats["size"] += info.st_size
+                        continue
+                    if os.name == "nt":
+                        os.chmod(entry.path, stat.S_IWRITE)
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                stats["removed"] += 1
+                stats["freed"] += info.st_size
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+    return stats
+
+
+def dedupe_projects(args: Any) -> Optional[List[Dict[str, Any]]]:
+    """Share identical package files between project venvs.
+
+    Every file in the venvs' site-packages is hashed and replaced by a
+    hardlink into a content-addressed store (<data>/.store), so a package
+    installed in many projects is only stored once. New venvs and pip
+    installs are deduped automatically; this converts existing ones.
+
+    Expects:
+      - args.name (list[str], optional): projects to dedupe (default: all)
+      - args.gc (bool, optional): remove store files no venv uses anymore
+      - args.jobs (int, optional): number of hashing threads
+    """
+    start = time()
+    if getattr(args, "gc", False):
+        stats = collect_garbage()
+        print(f"✓ Removed {stats['removed']} unused files ({stats['freed'] / 1024 / 1024:.1f} MB)")
+        print(f"Store: {stats['kept']} files, {stats['size'] / 1024 / 1024:.1f} MB")
+        return None
+
+    names = getattr(args, "name", None) or registered_projects()
+    if not names:
+        print("No projects found")
+        return []
+
+    results = []
+    for name in names:
+        if not valid_project(name):
+            print(f"No project found with name '{name}'")
+            continue
+        stats = dedupe_env(Path(get_path(name)) / ".env", getattr(args, "jobs", None))
+        if stats is None:
+            print(f"\t✗ {name}: the filesystem does not support hardlinks")
+            return None
+        stats["name"] = name
+        results.append(stats)
+        print(f"\t✓ {name}: {stats['files']} files, {stats['saved'] / 1024 / 1024:.1f} MB saved")
+
+    saved = sum(r["saved"] for r in results)
+    print(f"✓ Deduped {len(results)} projects in {time() - start:.2f}s, {saved / 1024 / 1024:.1f} MB saved")
+    return results
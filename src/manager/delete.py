@@ -1,7 +1,7 @@
 from .path import get_path, valid_project
+from .registry import remove_project
+from .trash import move_to_trash, purge_in_background
 
-import shutil
-import time
 from pathlib import Path
 from typing import Any, Optional
 
@@ -9,24 +9,30 @@ from typing import Any, Optional
 def delete_project(args: Any) -> Optional[str]:
     """Delete a project
 
+    The project is moved into the trash, which is instant, and its files
+    are removed by a background process.
+
     Expects:
       - args.name (str): project name
-      - args.force (bool, optional): to skip confirmation and timer
+      - args.force (bool, optional): to skip confirmation
+      - args.keep (bool, optional): leave the project in the trash, so
+        `pygame trash restore` can bring it back
     """
     if not hasattr(args, "name") or not args.name:
         raise ValueError("args.name is required")
 
     name = args.name
     force = args.force
+    keep = getattr(args, "keep", False)
 
     path = Path(get_path(name))
     if not valid_project(name):
         print(f"No project found with name '{name}'")
         return None
 
-    timer = 3
     if not force:
-        print("WARNING: This action is irreversible")
+        if not keep:
+            print("WARNING: This action is irreversible")
         try:
             confirm = (
                 input(f"Are you sure you want to delete project '{name}'? [y/N] ")
@@ -40,16 +46,16 @@ def delete_project(args: Any) -> Optional[str]:
             print("No action taken")
             return None
 
-        while timer > 0:
-            print(f"Deleting in {timer} second{'s' if timer != 1 else ''}...")
-            time.sleep(1)
-            timer -= 1
-
     try:
-        shutil.rmtree(path)
+        move_to_trash(str(path))
     except Exception as exc:
         print(f"Failed to delete project '{name}': {exc}")
         return None
 
-    print(f"project `{name}` deleted successfully!")
+    remove_project(name)
+    if keep:
+        print(f"project `{name}` moved to the trash, restore it with `pygame trash restore {name}`")
+    else:
+        purge_in_background()
+        print(f"project `{name}` deleted successfully!")
     return str(path)
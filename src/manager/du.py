@@ -0,0 +1,233 @@
+from .path import get_cache_path, get_projects_path
+from .registry import REGISTRY_DIR
+from .trash import _is_link
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import perf_counter as time
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_FILE = "du.json"
+CACHE_VERSION = 1
+
+# Top level folders of a project and the column they are counted in
+CATEGORIES = {".env": "env", ".git": "git", "build": "build", "assets": "assets"}
+COLUMNS = ["env", "git", "build", "assets", "source"]
+SORT_KEYS = ["size", "name"] + COLUMNS
+
+
+def _load_cache() -> Dict[str, Any]:
+    try:
+        with open(os.path.join(get_cache_path(), CACHE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["projects"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    return {}
+
+
+def _save_cache(projects: Dict[str, Any]) -> None:
+    cache_file = os.path.join(get_cache_path(), CACHE_FILE)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "projects": projects}, f, separators=(",", ":"))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _allocated(stat: os.stat_result) -> int:
+    # Blocks on disk where available, sparse and small files differ from st_size
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+def _scan(
+    path: str, root: str, relative: str, cached: Optional[list]
+) -> Tuple[str, str, list, bool]:
+    """Sum the files of one directory, or reuse the cached sums.
+
+    Returns:
+        The root and relative path, [mtime, bytes, files, linked, subdirs] and
+        whether the directory was read. `linked` holds [dev, inode, bytes] of
+        files with more than one link, which are only counted once in the end.
+    """
+    stat = os.lstat(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns:
+        return root, relative, cached, False
+
+    size = _allocated(stat)
+    files = 0
+    linked = []
+    subdirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False) and not _is_link(entry):
+                    subdirs.append(entry.name)
+                    continue
+                # DirEntry.stat has no inode or link count on Windows
+                info = os.lstat(entry.path) if os.name == "nt" else entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            files += 1
+            if info.st_nlink > 1:
+                linked.append([info.st_dev, info.st_ino, _allocated(info)])
+            else:
+                size += _allocated(info)
+    return root, relative, [stat.st_mtime_ns, size, files, linked, sorted(subdirs)], True
+
+
+def _walk(
+    roots: List[str], cache: Dict[str, Any], workers: Optional[int]
+) -> Tuple[Dict[str, Dict[str, list]], int]:
+    """Scan every folder below the given data dir entries in one thread pool.
+
+    Returns:
+        The directory entries per root and the number of directories read.
+    """
+    data_dir = get_projects_path()
+    results: Dict[str, Dict[str, list]] = {root: {} for root in roots}
+    read = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def submit(root: str, relative: str):
+            path = os.path.join(data_dir, root, *relative.split("/"))
+            return executor.submit(_scan, path, root, relative, cache.get(root, {}).get(relative))
+
+        pending = {submit(root, "") for root in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    root, relative, entry, scanned = future.result()
+                except OSError:
+                    # Removed while walking
+                    continue
+                results[root][relative] = entry
+                read += scanned
+                for name in entry[4]:
+                    child = f"{relative}/{name}" if relative else name
+                    pending.add(submit(root, child))
+    return results, read
+
+
+def _category(root: str, relative: str) -> str:
+    if root.startswith("."):
+        # Data folders like the trash or the package store are not projects
+        return "other"
+    return CATEGORIES.get(relative.split("/", 1)[0], "source")
+
+
+def _usage(
+    roots: List[str], walked: Dict[str, Dict[str, list]]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Sum the directory entries into columns, counting each inode once.
+
+    A file linked from several places is counted where it is seen first, in
+    name order, so the result does not depend on the walk order.
+
+    Returns:
+        One row per root and the bytes saved by hardlinks.
+    """
+    seen = set()
+    shared = 0
+    rows = []
+    for root in sorted(roots):
+        row = {"name": root, "files": 0, "other": 0, **{column: 0 for column in COLUMNS}}
+        for relative, (_, size, files, linked, _) in sorted(walked[root].items()):
+            column = _category(root, relative)
+            row[column] += size
+            row["files"] += files
+            for dev, inode, linked_size in linked:
+                if (dev, inode) in seen:
+                    shared += linked_size
+                    continue
+                seen.add((dev, inode))
+                row[column] += linked_size
+        row["size"] = sum(row[column] for column in COLUMNS) + row["other"]
+        rows.append(row)
+    return rows, shared
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f}"
+
+
+def disk_usage(args: Any) -> Optional[List[Dict[str, Any]]]:
+    """Show the disk usage of the projects, split by folder.
+
+    Each project is broken down into .env, .git, build, assets and the rest
+    (source). Files hardlinked more than once are counted a single time.
+    Directory sums are cached by mtime, so only folders that changed since
+    the last run are read again. Files rewritten in place do not change their
+    folder's mtime; use --refresh to rescan everything.
+
+    Expects:
+      - args.name (list[str], optional): projects to show (default: all,
+        including the trash and other data folders)
+      - args.sort (str, optional): "size" (default), "name" or a column
+      - args.refresh (bool, optional): ignore the cache
+      - args.jobs (int, optional): number of scanner threads
+    """
+    start = time()
+    data_dir = get_projects_path()
+    names = getattr(args, "name", None) or []
+    sort = getattr(args, "sort", None) or "size"
+    if sort not in SORT_KEYS:
+        print(f"Unknown sort key '{sort}', use one of: {', '.join(SORT_KEYS)}")
+        return None
+
+    with os.scandir(data_dir) as it:
+        available = {
+            e.name for e in it if e.is_dir(follow_symlinks=False) and e.name != REGISTRY_DIR
+        }
+    missing = [name for name in names if name not in available]
+    if missing:
+        print(f"No project found with name '{missing[0]}'")
+        return None
+    roots = names or sorted(available)
+    if not roots:
+        print("No projects found")
+        return []
+
+    cache = {} if getattr(args, "refresh", False) else _load_cache()
+    walked, read = _walk(roots, cache, getattr(args, "jobs", None))
+    # Entries of projects not shown this time are kept for the next run
+    cache.update(walked)
+    _save_cache({root: entries for root, entries in cache.items() if root in available})
+
+    rows, shared = _usage(roots, walked)
+    if sort == "name":
+        rows.sort(key=lambda row: row["name"])
+    else:
+        rows.sort(key=lambda row: row[sort], reverse=True)
+
+    width = max(len("Project"), *(len(row["name"]) for row in rows))
+    header = f"{'Project':<{width}}  " + "  ".join(
+        f"{column:>8}" for column in [".env", ".git", "build", "assets", "source", "total"]
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        if row["name"].startswith("."):
+            sizes = "  ".join(f"{'-':>8}" for _ in COLUMNS) + f"  {_mb(row['size']):>8}"
+        else:
+            sizes = "  ".join(f"{_mb(row[column]):>8}" for column in COLUMNS + ["size"])
+        print(f"{row['name']:<{width}}  {sizes}")
+    print("-" * len(header))
+    totals = "  ".join(
+        f"{_mb(sum(row[column] for row in rows)):>8}" for column in COLUMNS + ["size"]
+    )
+    print(f"{'Total':<{width}}  {totals}")
+    print(f"Sizes in MB, {sum(row['files'] for row in rows)} files")
+    if shared:
+        print(f"Hardlinked files counted once, {_mb(shared)} MB shared")
+    print(f"Scanned {read} of {sum(len(w) for w in walked.values())} folders in {time() - start:.2f}s")
+    return rows
@@ -0,0 +1,345 @@
+from .path import get_path, get_projects_path, valid_project
+from .registry import registered_projects
+from .seed import LOCK_SUFFIX, STALE_LOCK, build_once, create_venv
+from .trash import move_to_trash, purge_in_background
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ENVS_DIR = ".envs"
+REFS_FILE = "refs.json"
+# Written into a pooled venv once its requirements are installed, a pool
+# without it is half built and gets rebuilt
+POOL_FILE = ".pygame-env.json"
+# A pool used this recently may be about to be linked, gc leaves it alone
+POOL_GRACE = 60
+
+
+def _envs_path() -> str:
+    path = os.path.join(get_projects_path(), ENVS_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def normalized_requirements(req_file: Path) -> Optional[List[str]]:
+    """Return the requirements in a canonical form, sorted.
+
+    Comments, blank lines, spacing and the spelling of package names
+    (PEP 503) do not matter. Returns None when the file refers to anything
+    outside it (options, paths, URLs), which can differ between projects.
+    """
+    lines = []
+    for line in req_file.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith("-") or "/" in line or "\\" in line or ":" in line:
+            return None
+        line = re.sub(r"\s+", "", line).lower()
+        match = re.match(r"([a-z0-9._-]+)(.*)", line)
+        if match is None:
+            return None
+        lines.append(re.sub(r"[-_.]+", "-", match.group(1)) + match.group(2))
+    return sorted(lines)
+
+
+def env_key(req_file: Path) -> Optional[str]:
+    """Return the pool name for a requirements file and this Python."""
+    requirements = normalized_requirements(req_file)
+    if requirements is None:
+        return None
+    digest = hashlib.sha256("\n".join(requirements).encode()).hexdigest()
+    return f"py{sys.version_info[0]}{sys.version_info[1]}-{digest[:16]}"
+
+
+def pooled(venv_dir: Path) -> bool:
+    """Whether a venv, or the venv a link points to, is a shared pool."""
+    target = os.path.realpath(venv_dir)
+    envs = os.path.realpath(os.path.join(get_projects_path(), ENVS_DIR))
+    return os.path.normcase(os.path.dirname(target)) == os.path.normcase(envs)
+
+
+def shared_key(project_path: Path) -> Optional[str]:
+    """Return the pool a project's .env points to, None for a private venv."""
+    env = project_path / ".env"
+    if not os.path.lexists(env) or not pooled(env):
+        return None
+    return os.path.basename(os.path.realpath(env))
+
+
+def _link(target: str, link: Path) -> None:
+    try:
+        os.symlink(target, link, target_is_directory=True)
+    except OSError:
+        if os.name != "nt":
+            raise
+        # Symlinks need developer mode on Windows, junctions do not
+        import _winapi
+
+        _winapi.CreateJunction(target, str(link))
+
+
+def _unlink(link: Path) -> None:
+    # Directory symlinks and junctions are removed with rmdir on Windows
+    if os.name == "nt":
+        os.rmdir(link)
+    else:
+        os.unlink(link)
+
+
+def _load_refs() -> Dict[str, List[str]]:
+    try:
+        with open(os.path.join(_envs_path(), REFS_FILE), "r", encoding="utf-8") as f:
+            refs = json.load(f)
+        if isinstance(refs, dict):
+            return refs
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _save_refs(refs: Dict[str, List[str]]) -> None:
+    refs_file = os.path.join(_envs_path(), REFS_FILE)
+    tmp_file = f"{refs_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({k: sorted(v) for k, v in refs.items() if v}, f, indent=4, sort_keys=True)
+        os.replace(tmp_file, refs_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _set_ref(name: str, key: Optional[str]) -> None:
+    """Record that a project uses the pool `key` (None: no pool)."""
+    refs = _load_refs()
+    for names in refs.values():
+        if name in names:
+            names.remove(name)
+    if key is not None:
+        refs.setdefault(key, []).append(name)
+    _save_refs(refs)
+
+
+def _scan_refs() -> Dict[str, List[str]]:
+    """Rebuild the reference counts from the projects' .env links."""
+    refs: Dict[str, List[str]] = {}
+    for name in registered_projects():
+        key = shared_key(Path(get_path(name)))
+        if key is not None:
+            refs.setdefault(key, []).append(name)
+    _save_refs(refs)
+    return refs
+
+
+def _create_venv(venv_dir: Path, req_file: Path) -> None:
+    # run.py pulls in asyncio, only needed when a venv is built
+    from .run import _install_requirements_into_venv
+
+    print(f"Creating virtual environment in {venv_dir}...")
+    create_venv(venv_dir)
+    # Raises if pip fails, a pool is then removed again by build_once
+    _install_requirements_into_venv(venv_dir, req_file)
+
+
+def _ensure_pool(key: str, req_file: Path) -> Path:
+    pool = Path(_envs_path()) / key
+
+    def build() -> None:
+        _create_venv(pool, req_file)
+        with (pool / POOL_FILE).open("w", encoding="utf-8") as f:
+            json.dump({"requirements": normalized_requirements(req_file)}, f, indent=4)
+
+    build_once(pool, POOL_FILE, build)
+    # Marks the pool as in use until it is linked, see _gc
+    with contextlib.suppress(OSError):
+        os.utime(pool / POOL_FILE)
+    return pool
+
+
+def _point_to(project_path: Path, pool: Path) -> None:
+    """Replace the project's .env by a link to the pool."""
+    env = project_path / ".env"
+    if shared_key(project_path) is not None:
+        _unlink(env)
+    elif os.path.lexists(env):
+        move_to_trash(str(env))
+        purge_in_background()
+    _link(str(pool), env)
+    _set_ref(project_path.name, pool.name)
+
+
+def sync_shared_env(project_path: Path) -> None:
+    """Make a shared .env match the project's current requirements.
+
+    Called before a project is run or built: a project whose requirements
+    changed moves to the pool of the new requirements, instead of installing
+    them into the pool it shares with other projects. Private venvs are
+    left alone.
+    """
+    key = shared_key(project_path)
+    if key is None:
+        return
+    req_file = project_path / "requirements.txt"
+    new_key = env_key(req_file)
+    if new_key == key:
+        return
+    if new_key is None:
+        print("\t! requirements.txt refers to local files, giving the project its own venv")
+        _unshare(project_path)
+        return
+    print(f"\t! requirements.txt changed, switching to the shared env {new_key}")
+    _point_to(project_path, _ensure_pool(new_key, req_file))
+
+
+def share_env(project_path: Path) -> Optional[str]:
+    """Point a project's .env at the pool for its requirements.
+
+    Returns:
+        The pool name, or None if the requirements cannot be shared.
+    """
+    req_file = project_path / "requirements.txt"
+    key = env_key(req_file)
+    if key is None:
+        return None
+    if shared_key(project_path) != key:
+        _point_to(project_path, _ensure_pool(key, req_file))
+    return key
+
+
+def _unshare(project_path: Path) -> None:
+    env = project_path / ".env"
+    if shared_key(project_path) is not None:
+        _unlink(env)
+    _create_venv(env, project_path / "requirements.txt")
+    _set_ref(project_path.name, None)
+
+
+def _share(names: List[str]) -> None:
+    for name in names or registered_projects():
+        if not valid_project(name):
+            print(f"No project found with name '{name}'")
+            continue
+        try:
+            key = share_env(Path(get_path(name)))
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"\t✗ {name}: {e}")
+            continue
+        if key is None:
+            print(f"\t! {name}: requirements.txt refers to local files, keeping its own venv")
+        else:
+            print(f"\t✓ {name} -> {key}")
+
+
+def _unshare_projects(names: List[str]) -> None:
+    for name in names:
+        project_path = Path(get_path(name))
+        if not valid_project(name) or shared_key(project_path) is None:
+            print(f"'{name}' does not use a shared env")
+            continue
+        try:
+            _unshare(project_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"\t✗ {name}: {e}")
+            continue
+        print(f"\t✓ {name} has its own venv again")
+
+
+def _pools() -> List[str]:
+    with os.scandir(_envs_path()) as it:
+        return sorted(
+            e.name
+            for e in it
+            if e.is_dir(follow_symlinks=False) and not e.name.endswith(LOCK_SUFFIX)
+        )
+
+
+def _list() -> None:
+    pools = _pools()
+    if not pools:
+        print("No shared envs")
+        return
+    refs = _scan_refs()
+    print(f"{'Env':<24} {'Refs':>4}  Requirements")
+    for key in pools:
+        try:
+            with open(os.path.join(_envs_path(), key, POOL_FILE), "r", encoding="utf-8") as f:
+                requirements = ", ".join(json.load(f)["requirements"]) or "(none)"
+        except (OSError, ValueError, KeyError, TypeError):
+            requirements = "(incomplete)"
+        print(f"{key:<24} {len(refs.get(key, [])):>4}  {requirements}")
+
+
+def _recently_used(pool: str) -> bool:
+    try:
+        return time.time() - os.stat(os.path.join(pool, POOL_FILE)).st_mtime < POOL_GRACE
+    except OSError:
+        return False
+
+
+def _gc() -> None:
+    refs = _scan_refs()
+    removed = 0
+    for key in _pools():
+        if refs.get(key):
+            continue
+        pool = os.path.join(_envs_path(), key)
+        # Hold the pool's build lock, a pool being built is skipped and no
+        # build can start on it while it is moved away
+        lock = pool + LOCK_SUFFIX
+        try:
+            os.mkdir(lock)
+        except FileExistsError:
+            with contextlib.suppress(OSError):
+                if time.time() - os.stat(lock).st_mtime > STALE_LOCK:
+                    os.rmdir(lock)
+            continue
+        try:
+            # Built or reused by a share that has not linked it yet
+            if _recently_used(pool) or _load_refs().get(key):
+                continue
+            move_to_trash(pool)
+        finally:
+            os.rmdir(lock)
+        removed += 1
+        print(f"\t✓ Removed {key}")
+    if removed:
+        purge_in_background()
+    print(f"✓ Removed {removed} unused shared env(s)")
+
+
+def manage_envs(args: Any) -> None:
+    """Manage venvs shared between projects with the same requirements.
+
+    A shared project's .env is a symlink (a junction on Windows) to a pooled
+    venv in <data>/.envs, named after the hash of the normalized
+    requirements.txt and the Python version. Run, bench and build follow the
+    link, and move the project to another pool when its requirements change.
+
+    Expects:
+      - args.env_action (str): "share", "unshare", "list" or "gc"
+      - args.name (list[str]): projects to (un)share (default for share: all)
+    """
+    if not hasattr(args, "env_action") or not args.env_action:
+        raise ValueError("args.env_action is required")
+
+    if args.env_action == "share":
+        _share(getattr(args, "name", None) or [])
+    elif args.env_action == "unshare":
+        _unshare_projects(getattr(args, "name", None) or [])
+    elif args.env_action in ("list", "ls"):
+        _list()
+    elif args.env_action == "gc":
+        _gc()
+    else:
+        print(f"Unknown env action '{args.env_action}'")
@@ -1,15 +1,18 @@
 from .path import get_projects_path
+from .trash import TRASH_DIR, move_to_trash, purge_in_background
 
+import os
 from random import randint as random
-from shutil import rmtree as rm
 from typing import Any, Optional
 
 
 def format_projects(args: Any) -> Optional[str]:
     """Format the project directory by removing all projects.
 
+    Everything is moved into the trash and removed by a background process.
+
     Expects:
-      - args.force (bool, optional): to skip confirmation and timer
+      - args.force (bool, optional): to skip confirmation
     """
     force = args.force
     path = get_projects_path()
@@ -24,10 +27,19 @@ def format_projects(args: Any) -> Optional[str]:
             print("No action taken")
             return None
 
-    try:
-        rm(path)
-    except Exception as exc:
-        print(f"Failed to delete project '{name}': {exc}")
+    # The registry goes too, it only describes the projects being removed
+    failed = []
+    for entry in os.listdir(path):
+        if entry == TRASH_DIR:
+            continue
+        try:
+            move_to_trash(os.path.join(path, entry))
+        except Exception as exc:
+            failed.append(entry)
+            print(f"Failed to delete '{entry}': {exc}")
+
+    purge_in_background()
+    if failed:
         return None
 
     print("All projects deleted successfully!")
@@ -1,4 +1,5 @@
-from .path import get_path, valid_project
+from .path import get_path
+from .registry import lookup_project
 
 import json
 from pathlib import Path
@@ -17,21 +18,24 @@ def info_project(args: Any) -> Optional[dict]:
     name = args.name
     project_path = Path(get_path(name))
 
-    if not valid_project(name):
+    entry = lookup_project(name)
+    if entry is None or not entry["valid"]:
         print(f"No project found with name '{name}'")
         return None
 
-    metadata_file = project_path / "metadata.json"
-
-    try:
-        with metadata_file.open("r", encoding="utf-8") as f:
-            metadata = json.load(f)
-    except json.JSONDecodeError:
-        print("Error: Failed to parse metadata.json. Is it valid JSON?")
-        return None
-    except Exception as exc:
-        print(f"Failed to read metadata for '{name}': {exc}")
-        return None
+    metadata = entry["metadata"]
+    if metadata is None:
+        # Not cached because it failed to load, read it again for the error
+        metadata_file = project_path / "metadata.json"
+        try:
+            with metadata_file.open("r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except json.JSONDecodeError:
+            print("Error: Failed to parse metadata.json. Is it valid JSON?")
+            return None
+        except Exception as exc:
+            print(f"Failed to read metadata for '{name}': {exc}")
+            return None
 
     tags = metadata.get("tags") or []
     if not isinstance(tags, (list, tuple)):
@@ -1,4 +1,5 @@
-from .path import get_projects_path, valid_project
+from .path import get_projects_path
+from .registry import registered_projects
 
 from pathlib import Path
 from typing import Any, List, Optional
@@ -14,11 +15,7 @@ def list_projects(args: Any) -> Optional[str]:
         return []
 
     try:
-        projects = [
-            p.name
-            for p in projects_root.iterdir()
-            if p.is_dir() and valid_project(p.name)
-        ]
+        projects = registered_projects()
     except Exception as exc:
         print(f"Failed to read projects directory: {exc}")
         return None
@@ -27,7 +24,7 @@ def list_projects(args: Any) -> Optional[str]:
         print("No projects found")
         return []
 
-    projects_sorted = sorted(projects)
+    projects_sorted = projects
     print("Total:", len(projects_sorted))
     print("List:")
     for name in projects_sorted:
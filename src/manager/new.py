@@ -1,9 +1,11 @@
+from .envs import share_env
 from .path import get_path, valid_project, create_path
+from .registry import update_project
+from .seed import create_venv
 
 import json
 import shutil
 import getpass
-import venv
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable, List, Optional
@@ -99,19 +101,21 @@ def new_project(args: Any) -> str:
         with open(metadata_file, "w", encoding="utf-8") as f:
             json.dump(metadata, f, indent=4)
 
-        # create virtual environment in .env (with pip)
-        builder = venv.EnvBuilder(with_pip=True)
-        builder.create(str(venv_dir))
-
         # Simple template copy
         template_src = Path(__file__).parent.parent / "template"
         shutil.copytree(str(template_src), str(full_path), dirs_exist_ok=True)
 
+        # create virtual environment in .env from the seed, or link the
+        # shared one for the template requirements
+        if not (getattr(args, "shared_env", False) and share_env(full_path)):
+            create_venv(venv_dir)
+
         # create .git
         repo = Repo.init(str(full_path))
         repo.git.add(A=True)
         repo.index.commit(f"init")
         repo.git.branch("-M", "main")
+        update_project(name)
 
         print(f"Path: {full_path}")
         print(f"Project '{name}' created successfully!")
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import struct
+import zlib
+from typing import Dict, Optional
+
+PACK_FILE = "assets.pak"
+PACK_MAGIC = b"PGPK"
+PACK_VERSION = 1
+
+# magic, version, flags, entry count, index offset, source key
+HEADER = struct.Struct("<4sHHIQ32s")
+# path length, data offset, stored size, original size, compression
+ENTRY = struct.Struct("<HQQQB")
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+# Formats that are already compressed gain nothing from zlib
+COMPRESSED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif",
+    ".ogg", ".mp3", ".flac", ".opus",
+    ".zip", ".gz", ".ttf", ".otf", ".woff", ".woff2",
+}
+
+
+def _source_key(files: Dict[str, str], compress: bool) -> bytes:
+    digest = hashlib.sha256(f"{PACK_VERSION}:{compress}".encode())
+    for name in sorted(files):
+        stat = os.stat(files[name])
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.digest()
+
+
+def read_pack_key(pack_path: str) -> Optional[bytes]:
+    """Return the source key stored in a pack header, or None if unreadable."""
+    try:
+        with open(pack_path, "rb") as f:
+            header = f.read(HEADER.size)
+        magic, version, _, _, _, key = HEADER.unpack(header)
+    except (OSError, struct.error):
+        return None
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        return None
+    return key
+
+
+def write_pack(
+    project_path: str, folder: str, pack_path: str, compress: bool = True
+) -> Optional[Dict[str, int]]:
+    """Write every file of a project folder into a single indexed pack.
+
+    Entries are named by their path relative to the project, e.g.
+    `assets/player.png`. File data is streamed in, optionally zlib compressed
+    per entry when that saves space, and the index of offsets and sizes is
+    written after the data so the pack is produced in one pass.
+
+    Args:
+        project_path: The project directory.
+        folder: The folder inside the project to pack.
+        pack_path: The pack file to write.
+        compress: Compress entries that are not already compressed.
+
+    Returns:
+        A dict with the number of `files`, the pack `size` and whether the
+        existing pack was `reused`, or None if the folder has no files.
+    """
+    files = {}
+    for root, dirs, names in os.walk(os.path.join(project_path, folder)):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for file in names:
+            path = os.path.join(root, file)
+            files[os.path.relpath(path, project_path).replace(os.sep, "/")] = path
+    if not files:
+        return None
+
+    key = _source_key(files, compress)
+    if read_pack_key(pack_path) == key:
+        return {"files": len(files), "size": os.path.getsize(pack_path), "reused": True}
+
+    entries = []
+    tmp_path = f"{pack_path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(b"\0" * HEADER.size)
+
+        for name in sorted(files):
+            offset = out.tell()
+            original_size = 0
+            compression = COMPRESSION_NONE
+            extension = os.path.splitext(name)[1].lower()
+
+            with open(files[name], "rb") as f:
+                if compress and extension not in COMPRESSED_EXTENSIONS:
+                    compressor = zlib.compressobj(6)
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        original_size += len(chunk)
+                        out.write(compressor.compress(chunk))
+                    out.write(compressor.flush())
+                    compression = COMPRESSION_ZLIB
+
+                    # Store it raw instead when compression didn't pay off
+                    if out.tell() - offset >= original_size * 0.9:
+                        out.seek(offset)
+                        out.truncate()
+                        f.seek(0)
+                        compression = COMPRESSION_NONE
+
+                if compression == COMPRESSION_NONE:
+                    original_size = 0
+                    for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                        original_size += len(chunk)
+                        out.write(chunk)
+
+            entries.append(
+                (name, offset, out.tell() - offset, original_size, compression)
+            )
+
+        index_offset = out.tell()
+        for name, offset, stored_size, original_size, compression in entries:
+            encoded = name.encode("utf-8")
+            out.write(
+                ENTRY.pack(len(encoded), offset, stored_size, original_size, compression)
+            )
+            out.write(encoded)
+
+        out.seek(0)
+        out.write(
+            HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(entries), index_offset, key)
+        )
+
+    os.replace(tmp_path, pack_path)
+    return {"files": len(entries), "size": os.path.getsize(pack_path), "reused": False}
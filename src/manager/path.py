@@ -39,6 +39,20 @@ def get_projects_path() -> str:
     return projects_dir
 
 
+def get_cache_path() -> str:
+    """Return the path to the CLI cache directory.
+
+    Creates the directory if it doesn't exist. Everything stored here can be
+    regenerated, so it is safe to delete at any time.
+
+    Returns:
+        The absolute path to the cache directory.
+    """
+    cache_dir = appdirs.user_cache_dir(ORG, appauthor=False)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
 def get_path(name: str) -> str:
     """Return the path to the named project directory.
     Does NOT create the directory - only returns the path where it would be.
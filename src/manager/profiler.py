@@ -0,0 +1,127 @@
+import contextlib
+import os
+import pstats
+import tempfile
+import textwrap
+from pathlib import Path
+from typing import Iterator
+
+PROFILE_DIR = "profile"
+PSTATS_FILE = "profile.pstats"
+COLLAPSED_FILE = "profile.collapsed"
+SAMPLE_INTERVAL = 0.005
+
+# Runs inside the project venv: cProfile for exact call counts and times,
+# plus a sampling thread for full stacks that flamegraph tools can read.
+BOOTSTRAP = textwrap.dedent("""\
+    import cProfile
+    import collections
+    import os
+    import runpy
+    import signal
+    import sys
+    import threading
+
+    output_dir, interval = sys.argv[1], float(sys.argv[2])
+    pstats_file, collapsed_file = sys.argv[3], sys.argv[4]
+    sys.argv = ["main.py"]
+    sys.path.insert(0, os.getcwd())
+
+    skipped_files = {__file__, runpy.__file__, "<frozen runpy>"}
+    main_thread = threading.get_ident()
+    stacks = collections.Counter()
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(main_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename not in skipped_files:
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                stacks[";".join(reversed(stack))] += 1
+
+    # `pygame run` stops the profiled game with SIGTERM, exit through the
+    # finally below so the results are still written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    sampler = threading.Thread(target=sample, daemon=True)
+    profiler = cProfile.Profile()
+    sampler.start()
+    profiler.enable()
+    try:
+        # SystemExit and KeyboardInterrupt pass through, keeping the exit code
+        runpy.run_path(os.path.join(os.getcwd(), "main.py"), run_name="__main__")
+    finally:
+        profiler.disable()
+        # A second Ctrl+C or SIGTERM must not cut the results short
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        stop.set()
+        sampler.join()
+        os.makedirs(output_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(output_dir, pstats_file))
+        with open(os.path.join(output_dir, collapsed_file), "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\\n")
+    """)
+
+
+@contextlib.contextmanager
+def profiled_command(python_exe: Path, project_path: Path) -> Iterator[list[str]]:
+    """Yield a command that runs the project's main.py under the profilers.
+
+    The results are written to `<project>/profile/`: a cProfile `.pstats`
+    file and a `.collapsed` file of sampled stacks (one `a;b;c count` line
+    per stack) for flamegraph tools.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bootstrap = os.path.join(temp_dir, "profile_main.py")
+        with open(bootstrap, "w", encoding="utf-8") as f:
+            f.write(BOOTSTRAP)
+        yield [
+            str(python_exe),
+            "-u",
+            bootstrap,
+            str(project_path / PROFILE_DIR),
+            str(SAMPLE_INTERVAL),
+            PSTATS_FILE,
+            COLLAPSED_FILE,
+        ]
+
+
+def print_hotspots(project_path: Path, limit: int = 15) -> None:
+    """Print the functions of the project that took the most time.
+
+    Like the crash traceback, only frames from files inside the project are
+    shown, the venv excluded.
+    """
+    output_dir = project_path / PROFILE_DIR
+    try:
+        stats = pstats.Stats(str(output_dir / PSTATS_FILE))
+    except (OSError, EOFError, ValueError, TypeError) as e:
+        print(f"Could not read the profile: {e}")
+        return
+
+    venv_dir = str(project_path / ".env")
+    hotspots = [
+        (func, data)
+        for func, data in stats.stats.items()
+        if str(project_path) in func[0] and not func[0].startswith(venv_dir)
+    ]
+    hotspots.sort(key=lambda item: item[1][2], reverse=True)
+
+    print("-----------------------------------")
+    print(f"Profile: {stats.total_tt:.2f}s total")
+    print(f"{'Self (s)':>9} {'Total (s)':>10} {'Calls':>9}  Function")
+    for (filename, line, function), (_, calls, self_time, total_time, _) in hotspots[
+        :limit
+    ]:
+        location = f"{os.path.basename(filename)}:{line}"
+        print(f"{self_time:>9.3f} {total_time:>10.3f} {calls:>9}  {function} ({location})")
+    print("-----------------------------------")
+    print(f"Stats:      {output_dir / PSTATS_FILE}")
+    print(f"Flamegraph: {output_dir / COLLAPSED_FILE}")
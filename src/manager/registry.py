@@ -0,0 +1,174 @@
+from .path import get_projects_path, get_path, valid_project
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+REGISTRY_DIR = ".registry"
+REGISTRY_FILE = "index.json"
+REGISTRY_VERSION = 1
+
+# Parsed index kept in memory with the mtime it was read at, so long running
+# processes (`pygame daemon`) only parse the file again when it changes
+_memory: Optional[Tuple[int, Dict[str, Any]]] = None
+
+
+def _registry_file() -> str:
+    # Kept in its own directory so rewriting the index does not touch the
+    # mtime of the projects directory, which is used to detect new projects.
+    return os.path.join(get_projects_path(), REGISTRY_DIR, REGISTRY_FILE)
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load() -> Dict[str, Any]:
+    global _memory
+    registry_file = _registry_file()
+    mtime = _mtime(registry_file)
+    if _memory is not None and mtime is not None and _memory[0] == mtime:
+        return _memory[1]
+    try:
+        with open(registry_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == REGISTRY_VERSION:
+            _memory = (mtime, data)
+            return data
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": REGISTRY_VERSION, "root_mtime": None, "projects": {}}
+
+
+def _save(data: Dict[str, Any]) -> None:
+    global _memory
+    registry_file = _registry_file()
+    tmp_file = f"{registry_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(registry_file), exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_file, registry_file)
+        _memory = (_mtime(registry_file), data)
+    except OSError:
+        # The registry is only a cache, the filesystem stays the source of truth
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _scan_entry(name: str) -> Dict[str, Any]:
+    path = get_path(name)
+    metadata_file = os.path.join(path, "metadata.json")
+    entry = {
+        "path": path,
+        "valid": valid_project(name),
+        "mtime": _mtime(path),
+        "metadata_mtime": _mtime(metadata_file),
+        "metadata": None,
+    }
+    if entry["valid"]:
+        try:
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            if isinstance(metadata, dict):
+                entry["metadata"] = metadata
+        except (OSError, ValueError):
+            pass
+    return entry
+
+
+def _is_stale(entry: Dict[str, Any]) -> bool:
+    path = entry["path"]
+    return entry["mtime"] != _mtime(path) or entry["metadata_mtime"] != _mtime(
+        os.path.join(path, "metadata.json")
+    )
+
+
+def _refresh(data: Dict[str, Any]) -> bool:
+    projects = data["projects"]
+    changed = False
+
+    root = get_projects_path()
+    root_mtime = _mtime(root)
+    if root_mtime != data["root_mtime"]:
+        names = set()
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.name.startswith(".") and entry.is_dir():
+                    names.add(entry.name)
+        for name in set(projects) - names:
+            del projects[name]
+        for name in names - set(projects):
+            try:
+                projects[name] = _scan_entry(name)
+            except ValueError:
+                # Not a usable project name, e.g. stray folders with spaces
+                continue
+        data["root_mtime"] = root_mtime
+        changed = True
+
+    for name, entry in list(projects.items()):
+        if _is_stale(entry):
+            projects[name] = _scan_entry(name)
+            changed = True
+
+    return changed
+
+
+def registered_projects() -> List[str]:
+    """Return the sorted names of all valid projects.
+
+    The index is revalidated against the directory mtimes, so projects
+    created, edited or removed outside the CLI are picked up.
+    """
+    data = _load()
+    if _refresh(data):
+        _save(data)
+    return sorted(name for name, entry in data["projects"].items() if entry["valid"])
+
+
+def lookup_project(name: str) -> Optional[Dict[str, Any]]:
+    """Return the registry entry of a single project.
+
+    Args:
+        name: The project name.
+
+    Returns:
+        A dict with the keys `path`, `valid` and `metadata` (None if the
+        metadata could not be parsed), or None if the project does not exist.
+    """
+    data = _load()
+    projects = data["projects"]
+    entry = projects.get(name)
+    if entry is None or _is_stale(entry):
+        entry = _scan_entry(name)
+        if entry["mtime"] is None:
+            if projects.pop(name, None) is not None:
+                _save(data)
+            return None
+        projects[name] = entry
+        _save(data)
+    return entry
+
+
+def update_project(name: str) -> None:
+    """Rescan a project and store the result in the registry."""
+    data = _load()
+    entry = _scan_entry(name)
+    if entry["mtime"] is None:
+        data["projects"].pop(name, None)
+    else:
+        data["projects"][name] = entry
+    _save(data)
+
+
+def remove_project(name: str) -> None:
+    """Drop a project from the registry."""
+    data = _load()
+    if data["projects"].pop(name, None) is not None:
+        _save(data)
@@ -1,4 +1,5 @@
 from .path import get_projects_path, valid_project
+from .registry import remove_project, update_project
 
 import json
 import shutil
@@ -49,5 +50,8 @@ def rename_project(args: Any) -> Optional[str]:
         print(f"Failed to rename project: {exc}")
         return None
 
+    remove_project(args.old_name)
+    update_project(args.new_name)
+
     print(f"Project renamed from '{args.old_name}' to '{args.new_name}'")
     return str(new_dir)
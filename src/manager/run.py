@@ -1,17 +1,29 @@
+from .cdn import cached_cdn, serve_cdn
+from .dedupe import dedupe_after_install
+from .envs import normalized_requirements, pooled, sync_shared_env
 from .path import get_path, valid_project
+from .profiler import print_hotspots, profiled_command
+from .watch import Watcher
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import subprocess
 import webbrowser
 import threading
 import shutil
+import signal
+import socket
 import time
 import os
 import sys
 import venv
 from time import perf_counter as time
 from time import sleep
+from collections import deque
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 
 def _venv_python_path(venv_dir: Path) -> Path:
@@ -21,21 +33,255 @@ def _venv_python_path(venv_dir: Path) -> Path:
         return venv_dir / "bin" / "python"
 
 
-def _install_requirements_into_venv(venv_dir: Path, req_file: Path) -> None:
-    python_exe = _venv_python_path(venv_dir)
-    subprocess.run(
-        [str(python_exe), "-m", "pip", "install", "-r", str(req_file)],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+FINGERPRINT_FILE = ".requirements-fingerprint.json"
+
+# pygbag server readiness polling, with exponential backoff
+WEB_HOST = "localhost"
+WEB_DEFAULT_PORT = 8000
+WEB_READY_TIMEOUT = 120.0
+WEB_POLL_MIN = 0.05
+WEB_POLL_MAX = 0.25
+# Only the end of stderr is needed for the crash summary
+STDERR_TAIL_LINES = 200
+STREAM_LIMIT = 1024 * 1024
+# Lines of pip's stderr shown when an install fails
+PIP_ERROR_LINES = 20
+# A profiled run is stopped gently, so it can still write its results
+PROFILE_STOP_TIMEOUT = 10.0
+
+# Environment variables read by the template's frame_stats.py
+FRAME_STATS_ENV = "PYGAME_FRAME_STATS"
+FRAME_STATS_OUTPUT_ENV = "PYGAME_FRAME_STATS_OUTPUT"
+
+
+def _venv_python_version(venv_dir: Path) -> str:
+    # Read the version from pyvenv.cfg instead of spawning the interpreter
+    cfg = venv_dir / "pyvenv.cfg"
+    try:
+        with cfg.open("r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return value.strip()
+    except OSError:
+        pass
+    return "unknown"
+
+
+def _requirements_fingerprint(venv_dir: Path, req_file: Path) -> str:
+    digest = hashlib.sha256()
+    digest.update(_venv_python_version(venv_dir).encode())
+    digest.update(b"\0")
+    # Projects sharing a pool may differ in comments and spacing only, which
+    # must not make pip run again in the pool on every switch
+    requirements = normalized_requirements(req_file) if pooled(venv_dir) else None
+    if requirements is not None:
+        digest.update("\n".join(requirements).encode())
+    else:
+        digest.update(req_file.read_bytes())
+    return digest.hexdigest()
+
+
+def _read_fingerprint(venv_dir: Path) -> dict:
+    try:
+        with (venv_dir / FINGERPRINT_FILE).open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_fingerprint(venv_dir: Path, fingerprint: str, install_time: float) -> None:
+    data = {"fingerprint": fingerprint, "install_time": round(install_time, 3)}
+    try:
+        with (venv_dir / FINGERPRINT_FILE).open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+    except OSError:
+        pass
+
 
+def _install_requirements_into_venv(
+    venv_dir: Path, req_file: Path, force: bool = False
+) -> bool:
+    """Install requirements.txt into the venv unless its fingerprint is unchanged.
 
-def _print_program_output(start_time: float, output: str) -> None:
+    Returns:
+        True if pip was run, False if the install was skipped.
+
+    Raises:
+        subprocess.CalledProcessError: If pip failed, after printing the end
+        of its output. The fingerprint is left alone, so the next run
+        installs again.
+    """
+    fingerprint = _requirements_fingerprint(venv_dir, req_file)
+    cached = _read_fingerprint(venv_dir)
+    if not force and cached.get("fingerprint") == fingerprint:
+        saved = cached.get("install_time") or 0.0
+        print(f"Requirements unchanged, skipped pip install (saved ~{saved:.2f}s)")
+        return False
+
+    python_exe = _venv_python_path(venv_dir)
+    cmd = [str(python_exe), "-m", "pip", "install", "-r", str(req_file)]
+    start_time = time()
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    install_time = time() - start_time
+    if result.returncode != 0:
+        print(f"\t✗ pip install failed (exit code {result.returncode}):")
+        lines = result.stderr.decode(errors="replace").rstrip().splitlines()
+        for line in lines[-PIP_ERROR_LINES:]:
+            print(f"\t  {line}")
+        raise subprocess.CalledProcessError(result.returncode, cmd, stderr=result.stderr)
+    _write_fingerprint(venv_dir, fingerprint, install_time)
+    print(f"Installed requirements in {install_time:.2f}s")
+    dedupe_after_install(venv_dir)
+    return True
+
+
+def _print_program_output(start_time: float, output: str, file=None) -> None:
     if not output.strip():
         return
     runtime = time() - start_time
     for line in output.rstrip().splitlines():
-        print(f"[{runtime:.2f}] {output}", end="")
+        print(f"[{runtime:.2f}] {line}", file=file)
+
+
+async def _stream_output(
+    stream: asyncio.StreamReader,
+    start_time: float,
+    file=None,
+    tail: Optional[deque] = None,
+) -> None:
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # A single line longer than the stream limit, skip it
+            continue
+        if not line:
+            break
+        text = line.decode(errors="replace")
+        _print_program_output(start_time, text, file=file)
+        if tail is not None:
+            tail.append(text)
+
+
+async def _run_streamed(
+    cmd: list[str],
+    cwd: Path,
+    start_time: float,
+    on_start: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    stop_timeout: Optional[float] = None,
+) -> tuple[int, str]:
+    """Run a command while draining stdout and stderr at the same time.
+
+    If the run is interrupted, the process is killed. With `stop_timeout`,
+    it is asked to exit first (SIGTERM, on Windows it only gets the console's
+    Ctrl+C) and killed if it is still running after that many seconds.
+
+    Returns:
+        The exit code and the last STDERR_TAIL_LINES lines of stderr.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=str(cwd),
+        env=os.environ.copy(),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LIMIT,
+    )
+    if on_start is not None:
+        on_start(process)
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    try:
+        await asyncio.gather(
+            _stream_output(process.stdout, start_time),
+            _stream_output(process.stderr, start_time, sys.stderr, stderr_tail),
+        )
+        returncode = await process.wait()
+    finally:
+        if process.returncode is None and stop_timeout:
+            if os.name != "nt":
+                process.terminate()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(process.wait(), stop_timeout)
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    return returncode, "".join(stderr_tail)
+
+
+def _report_exit(
+    name: str, returncode: int, stderr_output: str, project_path: Path
+) -> None:
+    if returncode == 0:
+        return
+    if stderr_output.strip():
+        _handle_local_run_error(
+            stderr=stderr_output,
+            title=f"{name} crashed",
+            project_path=project_path,
+        )
+    else:
+        print(f"ProcessError: Process exited with code {returncode}")
+
+
+async def _watch_run(
+    name: str,
+    cmd: list[str],
+    full_path: Path,
+    venv_dir: Path,
+    req_file: Path,
+    reload_assets: bool = False,
+) -> None:
+    """Run the game and restart it whenever the project changes."""
+    loop = asyncio.get_running_loop()
+    watcher = Watcher(str(full_path))
+    processes = []
+    can_signal = reload_assets and hasattr(signal, "SIGUSR1")
+    print(f"Watching {full_path} for changes ({watcher.backend}), Ctrl+C to stop")
+
+    try:
+        while True:
+            start_time = time()
+            run_task = asyncio.ensure_future(
+                _run_streamed(cmd, full_path, start_time, on_start=processes.append)
+            )
+
+            while True:
+                change_task = loop.run_in_executor(None, watcher.wait)
+                done, _ = await asyncio.wait(
+                    {run_task, change_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if run_task in done:
+                    _report_exit(name, *run_task.result(), full_path)
+                    print("Waiting for changes to restart...")
+                    changes = await change_task
+                    break
+
+                changes = change_task.result()
+                if can_signal and all(c.startswith("assets/") for c in changes):
+                    processes[-1].send_signal(signal.SIGUSR1)
+                    print(f"Assets changed ({len(changes)} files), sent reload signal")
+                    continue
+
+                run_task.cancel()
+                try:
+                    await run_task
+                except asyncio.CancelledError:
+                    pass
+                break
+
+            print(f"Detected {len(changes)} changed files, restarting '{name}'...")
+            if "requirements.txt" in changes:
+                try:
+                    await loop.run_in_executor(
+                        None, _install_requirements_into_venv, venv_dir, req_file
+                    )
+                except subprocess.CalledProcessError:
+                    # pip's error is printed, restart with the packages installed so far
+                    pass
+    finally:
+        watcher.close()
 
 
 def _handle_local_run_error(
@@ -106,15 +352,52 @@ def _handle_local_run_error(
     )
 
 
-def _open_browser(url: str, delay: float) -> None:
-    def delayed_open() -> None:
+def _port_in_use(host: str, port: int) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def _wait_until_ready(
+    host: str, port: int, process: subprocess.Popen, timeout: float
+) -> Optional[float]:
+    """Poll a TCP port with backoff until it accepts connections.
+
+    Returns:
+        The seconds it took, or None if the process exited or the timeout
+        passed first.
+    """
+    start = time()
+    delay = WEB_POLL_MIN
+    while time() - start < timeout:
+        if process.poll() is not None:
+            return None
+        if _port_in_use(host, port):
+            return time() - start
         sleep(delay)
+        delay = min(delay * 2, WEB_POLL_MAX)
+    return None
+
+
+def _open_when_ready(
+    url: str, host: str, port: int, process: subprocess.Popen, timeout: float
+) -> None:
+    def wait_and_open() -> None:
+        elapsed = _wait_until_ready(host, port, process, timeout)
+        if elapsed is None:
+            if process.poll() is None:
+                print(f"\t! Server not ready after {timeout:.0f}s, open {url} manually")
+            return
+        print(f"Server ready: {url} (in {elapsed:.2f}s)")
+        print("\nPress Ctrl+C to stop the server")
         try:
             webbrowser.open(url)
         except Exception:
             pass
 
-    threading.Thread(target=delayed_open, daemon=True).start()
+    threading.Thread(target=wait_and_open, daemon=True).start()
 
 
 def local_run(args: Any) -> None:
@@ -122,6 +405,13 @@ def local_run(args: Any) -> None:
 
     Expects:
       - args.name (str): project name
+      - args.reinstall (bool, optional): force a pip install of requirements.txt
+      - args.watch (bool, optional): restart the game when project files change
+      - args.reload_assets (bool, optional): in watch mode, signal the game
+        (SIGUSR1) instead of restarting it when only assets/ changed
+      - args.profile (bool, optional): run under cProfile and a stack sampler
+      - args.frame_stats (str, optional): enable the template's frame stats,
+        an empty string only prints them, a path also saves them
     """
 
     if not hasattr(args, "name") or not args.name:
@@ -138,7 +428,10 @@ def local_run(args: Any) -> None:
     req_file = full_path / "requirements.txt"
 
     try:
-        _install_requirements_into_venv(venv_dir, req_file)
+        sync_shared_env(full_path)
+        _install_requirements_into_venv(
+            venv_dir, req_file, force=getattr(args, "reinstall", False)
+        )
     except subprocess.CalledProcessError as e:
         print(f"Failed to install requirements: {e}")
         return
@@ -146,53 +439,70 @@ def local_run(args: Any) -> None:
         print(f"Error preparing virtualenv: {e}")
         return
 
+    frame_stats = getattr(args, "frame_stats", None)
+    if frame_stats is not None:
+        # Read by FrameStats in the project's frame_stats.py
+        os.environ[FRAME_STATS_ENV] = "1"
+        if frame_stats:
+            os.environ[FRAME_STATS_OUTPUT_ENV] = os.path.abspath(frame_stats)
+        if not (full_path / "frame_stats.py").exists():
+            print("\t! This project has no frame_stats.py, copy it from a new project")
+
     python_exe = _venv_python_path(venv_dir)
+    cmd = [str(python_exe), "-u", "main.py"]
     start_time = time()
 
     try:
-        process = subprocess.Popen(
-            [str(python_exe), "-u", "main.py"],
-            cwd=str(full_path),
-            env=os.environ.copy(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-
-        while True:
-            output = process.stdout.readline()
-            if output:
-                _print_program_output(start_time, output)
-            elif process.poll() is not None:
-                break
-
-        remaining = process.stdout.read()
-        if remaining:
-            _print_program_output(start_time, remaining)
-
-        stderr_output = process.stderr.read()
-        if process.returncode != 0:
-            if stderr_output.strip():
-                _handle_local_run_error(
-                    stderr=stderr_output,
-                    title=f"{name} crashed",
-                    project_path=full_path,
+        if getattr(args, "profile", False):
+            if getattr(args, "watch", False):
+                print("--profile can't be combined with --watch")
+                return
+            with profiled_command(python_exe, full_path) as profile_cmd:
+                try:
+                    returncode, stderr_output = asyncio.run(
+                        _run_streamed(
+                            profile_cmd,
+                            full_path,
+                            start_time,
+                            stop_timeout=PROFILE_STOP_TIMEOUT,
+                        )
+                    )
+                    _report_exit(name, returncode, stderr_output, full_path)
+                finally:
+                    print_hotspots(full_path)
+        elif getattr(args, "watch", False):
+            asyncio.run(
+                _watch_run(
+                    name,
+                    cmd,
+                    full_path,
+                    venv_dir,
+                    req_file,
+                    reload_assets=getattr(args, "reload_assets", False),
                 )
-            else:
-                print(f"ProcessError: Process exited with code {process.returncode}")
+            )
+        else:
+            returncode, stderr_output = asyncio.run(
+                _run_streamed(cmd, full_path, start_time)
+            )
+            _report_exit(name, returncode, stderr_output, full_path)
 
     except KeyboardInterrupt:
         print(f"\nProject '{name}' was keyboard interrupted")
 
 
-def web_run(args: Any, open_delay: int = 10) -> None:
+def web_run(args: Any, ready_timeout: float = WEB_READY_TIMEOUT) -> None:
     """Run a project in web mode using pygbag.
 
+    The browser is opened as soon as the pygbag server accepts connections.
+
     Expects:
       - args.name (str): project name
-      - args.cdn (str, optional): CDN option for pygbag
+      - args.cdn (str, optional): CDN option for pygbag, defaults to the
+        local CDN cache when it has the pinned pygbag version (`pygame cdn`)
       - args.template (str, optional): template option for pygbag
-      - open_delay (int): delay before opening browser
+      - args.port (int, optional): port for the pygbag server (default 8000)
+      - ready_timeout (float): give up waiting for the server after this long
     """
     if not hasattr(args, "name") or not args.name:
         raise ValueError("args.name is required")
@@ -204,6 +514,11 @@ def web_run(args: Any, open_delay: int = 10) -> None:
 
     cdn = getattr(args, "cdn", None)
     template = getattr(args, "template", None)
+    port = getattr(args, "port", None) or WEB_DEFAULT_PORT
+
+    if _port_in_use(WEB_HOST, port):
+        print(f"Port {port} is already in use, pick another one with --port")
+        return
 
     full_path = Path(get_path(name))
     main_py = full_path / "main.py"
@@ -211,6 +526,12 @@ def web_run(args: Any, open_delay: int = 10) -> None:
         print(f"No main.py found in project '{name}' ({main_py})")
         return
 
+    try:
+        sync_shared_env(full_path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error preparing virtualenv: {e}")
+        return
+
     env_folder = os.path.join(full_path, ".env")
     if sys.platform == "win32":
         venv_site_packages = os.path.join(env_folder, "Lib", "site-packages")
@@ -235,31 +556,43 @@ def web_run(args: Any, open_delay: int = 10) -> None:
     else:
         env["PYTHONPATH"] = venv_site_packages
 
-    url = "http://localhost:8000/"
+    url = f"http://{WEB_HOST}:{port}/"
+    process = None
+    cdn_server = contextlib.ExitStack()
     try:
+        if cdn is None:
+            local_cdn = cached_cdn(full_path / "requirements.txt")
+            if local_cdn is not None:
+                cdn = cdn_server.enter_context(serve_cdn(local_cdn))
+                print(f"Serving pygbag runtime from the local cache: {local_cdn}")
+
         print("Running pygbag ...")
-        print(f"Server ready: {url}")
-        print("\nPress Ctrl+C to stop the server")
-        _open_browser(url, open_delay)
 
-        cmd = [sys.executable, "-m", "pygbag"]
+        cmd = [sys.executable, "-m", "pygbag", "--port", str(port)]
         if cdn is not None:
             cmd.extend(["--cdn", str(cdn)])
         if template is not None:
             cmd.extend(["--template", str(template)])
         cmd.append("main.py")
 
-        subprocess.run(
+        process = subprocess.Popen(
             cmd,
-            check=True,
             cwd=str(full_path),
             env=env,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
-    except subprocess.CalledProcessError as e:
-        print(f"pygbag failed with exit code {e.returncode}")
+        _open_when_ready(url, WEB_HOST, port, process, ready_timeout)
+        returncode = process.wait()
+        if returncode != 0:
+            print(f"pygbag failed with exit code {returncode}")
     except KeyboardInterrupt:
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
         build_path = full_path / "build"
         if build_path.exists():
             shutil.rmtree(build_path, ignore_errors=True)
@@ -268,6 +601,8 @@ def web_run(args: Any, open_delay: int = 10) -> None:
         print(
             "pygbag command not found. Please ensure pygbag is installed and available."
         )
+    finally:
+        cdn_server.close()
 
 
 def run_project(args: Any) -> None:
@@ -0,0 +1,202 @@
+from .dedupe import dedupe_env
+from .path import get_projects_path
+from .trash import move_to_trash, purge_in_background
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import venv
+from pathlib import Path
+from time import perf_counter
+from typing import Callable
+
+SEEDS_DIR = ".seeds"
+SEED_FILE = ".pygame-seed.json"
+TEMPLATE_REQUIREMENTS = Path(__file__).parent.parent / "template" / "requirements.txt"
+# A seed whose pip install failed (e.g. offline) is retried after this long
+RETRY_INSTALL = 24 * 3600
+
+# Held while a seed or shared venv is built, parallel commands may need it too
+LOCK_SUFFIX = ".lock"
+STALE_LOCK = 1800
+
+
+def build_once(path: Path, marker: str, build: Callable[[], None]) -> None:
+    """Run `build` unless `path/marker` exists, one process at a time.
+
+    `build` must write the marker last, a folder without it is half built
+    and is removed before building again.
+    """
+    lock = path.with_name(path.name + LOCK_SUFFIX)
+    while not (path / marker).is_file():
+        try:
+            os.mkdir(lock)
+        except FileExistsError:
+            with contextlib.suppress(OSError):
+                if time.time() - os.stat(lock).st_mtime > STALE_LOCK:
+                    os.rmdir(lock)
+            # Another process is building it
+            time.sleep(0.5)
+            continue
+        try:
+            if (path / marker).is_file():
+                break
+            if path.exists():
+                # Left half built by an interrupted run
+                shutil.rmtree(path, ignore_errors=True)
+            try:
+                build()
+            except BaseException:
+                shutil.rmtree(path, ignore_errors=True)
+                raise
+        finally:
+            os.rmdir(lock)
+
+
+def _python() -> str:
+    return os.path.realpath(sys.executable)
+
+
+def _seed_key() -> str:
+    # The interpreter is part of the key, the venv links to its install
+    digest = hashlib.sha256(_python().encode())
+    digest.update(b"\0")
+    digest.update(TEMPLATE_REQUIREMENTS.read_bytes())
+    return f"py{sys.version_info[0]}{sys.version_info[1]}-{digest.hexdigest()[:16]}"
+
+
+def _install_into_seed(seed: Path) -> None:
+    # run.py pulls in asyncio, only needed when a seed is built
+    from .run import FINGERPRINT_FILE, _install_requirements_into_venv
+
+    try:
+        _install_requirements_into_venv(seed, TEMPLATE_REQUIREMENTS)
+    except subprocess.CalledProcessError:
+        # e.g. offline, the seed is still usable and retried later
+        pass
+    with (seed / SEED_FILE).open("w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "python": _python(),
+                "installed": (seed / FINGERPRINT_FILE).is_file(),
+                "built": time.time(),
+            },
+            f,
+            indent=4,
+        )
+
+
+def _seed() -> Path:
+    """Return the seed venv for this interpreter and template, building it once."""
+    root = Path(get_projects_path()) / SEEDS_DIR
+    os.makedirs(root, exist_ok=True)
+    key = _seed_key()
+    seed = root / key
+
+    def build() -> None:
+        start = perf_counter()
+        print("Building the seed venv for new projects (once per Python and template)...")
+        venv.EnvBuilder(with_pip=True).create(str(seed))
+        dedupe_env(seed)
+        _install_into_seed(seed)
+        print(f"\t✓ Seed venv built in {perf_counter() - start:.2f}s")
+
+        # Seeds of older templates for this interpreter are not used anymore.
+        # Other installs of the same Python version keep theirs, and seeds
+        # being built right now are left alone.
+        for other in os.listdir(root):
+            if other == key or other.endswith(LOCK_SUFFIX):
+                continue
+            if (root / (other + LOCK_SUFFIX)).exists():
+                continue
+            with contextlib.suppress(OSError, ValueError, AttributeError):
+                with (root / other / SEED_FILE).open("r", encoding="utf-8") as f:
+                    if json.load(f).get("python") != _python():
+                        continue
+                move_to_trash(str(root / other))
+                purge_in_background()
+
+    build_once(seed, SEED_FILE, build)
+
+    with contextlib.suppress(OSError, ValueError):
+        with (seed / SEED_FILE).open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        if not state.get("installed") and time.time() - state.get("built", 0) > RETRY_INSTALL:
+            print("Installing the template requirements into the seed venv...")
+            _install_into_seed(seed)
+    return seed
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _clone_seed(seed: Path, venv_dir: Path) -> None:
+    """Copy the seed to venv_dir, hardlinking the installed packages.
+
+    pyvenv.cfg and the scripts in bin/ (Scripts/ on Windows) name the venv
+    folder, they are copied with the seed path replaced. The other top
+    level files are copied too, the requirements fingerprint is rewritten
+    in place. Package files are hardlinked: pip replaces files instead of
+    writing to them, and the deduped ones are read-only.
+    """
+    old = os.fsencode(str(seed))
+    new = os.fsencode(str(venv_dir))
+    scripts = {"bin", "Scripts"}
+    for root, dirs, files in os.walk(seed):
+        relative = os.path.relpath(root, seed)
+        target_root = venv_dir if relative == "." else venv_dir / relative
+        os.makedirs(target_root, exist_ok=True)
+        private = relative == "." or relative.split(os.sep, 1)[0] in scripts
+
+        for name in list(dirs):
+            source = os.path.join(root, name)
+            if os.path.islink(source):
+                # e.g. lib64 -> lib
+                os.symlink(os.readlink(source), target_root / name, target_is_directory=True)
+                dirs.remove(name)
+
+        for name in files:
+            if relative == "." and name == SEED_FILE:
+                continue
+            source = os.path.join(root, name)
+            target = target_root / name
+            if os.path.islink(source):
+                # bin/python points to the base interpreter
+                os.symlink(os.readlink(source), target)
+                continue
+            if not private:
+                _link_or_copy(source, str(target))
+                continue
+            with open(source, "rb") as f:
+                data = f.read()
+            with open(target, "wb") as f:
+                f.write(data.replace(old, new))
+            shutil.copystat(source, target)
+
+
+def create_venv(venv_dir: Path) -> None:
+    """Create a venv with pip and the template requirements.
+
+    The venv is cloned from the seed, which only takes the time to link its
+    files. If that fails, a plain venv is created instead.
+    """
+    venv_dir = Path(venv_dir)
+    try:
+        start = perf_counter()
+        _clone_seed(_seed(), venv_dir)
+        print(f"\t✓ Virtual environment cloned from the seed in {perf_counter() - start:.2f}s")
+        return
+    except (OSError, ValueError) as e:
+        print(f"\t! Could not use the seed venv ({e}), creating a new one")
+        shutil.rmtree(venv_dir, ignore_errors=True)
+    venv.EnvBuilder(with_pip=True).create(str(venv_dir))
+    dedupe_env(venv_dir)
@@ -0,0 +1,176 @@
+from .web import HASHED_NAME
+
+import email.utils
+import http.server
+import os
+import re
+import shutil
+from functools import partial
+from typing import Any, Optional
+
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _StaticRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files with precompressed variants, ETags and single ranges."""
+
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        ".wasm": "application/wasm",
+        ".mjs": "text/javascript",
+        ".apk": "application/octet-stream",
+    }
+
+    def _accepted(self):
+        header = self.headers.get("Accept-Encoding", "")
+        accepted = set()
+        for part in header.split(","):
+            name, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00"):
+                continue
+            accepted.add(name.strip().lower())
+        return accepted
+
+    def _select(self, path: str):
+        # Ranges apply to the identity bytes, so encoded variants are skipped
+        if "Range" in self.headers:
+            return path, None
+        accepted = self._accepted()
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    def send_head(self):
+        self._remaining = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(
+                index
+            ):
+                # Redirects and directory listings as usual
+                return super().send_head()
+            path = index
+        if not os.path.isfile(path) or path.endswith((".gz", ".br")):
+            self.send_error(404, "File not found")
+            return None
+
+        served, encoding = self._select(path)
+        try:
+            f = open(served, "rb")
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}{"-" + encoding if encoding else ""}"'
+
+        if self.headers.get("If-None-Match") in (etag, "*"):
+            f.close()
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            match = RANGE.match(range_header.strip())
+            if match and (match.group(1) or match.group(2)):
+                first, last = match.groups()
+                if first:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                else:
+                    start = max(0, size - int(last))
+                if start >= size or start > end:
+                    f.close()
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+                status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(path))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("Accept-Ranges", "bytes")
+        if HASHED_NAME.search(os.path.basename(path)):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        f.seek(start)
+        self._remaining = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        if self._remaining is None:
+            shutil.copyfileobj(source, outputfile)
+            return
+        while self._remaining > 0:
+            chunk = source.read(min(64 * 1024, self._remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            self._remaining -= len(chunk)
+
+
+def serve_directory(args: Any) -> Optional[str]:
+    """Serve a directory, e.g. a web build, over HTTP.
+
+    Precompressed `.br`/`.gz` files next to the originals are sent with the
+    matching Content-Encoding when the client accepts it.
+
+    Expects:
+      - args.directory (str): folder to serve
+      - args.port (int): port to listen on
+      - args.host (str): interface to bind to
+    """
+    if not hasattr(args, "directory") or not args.directory:
+        raise ValueError("args.directory is required")
+
+    directory = os.path.abspath(args.directory)
+    # pygbag builds put the page in build/web
+    if not os.path.isfile(os.path.join(directory, "index.html")) and os.path.isfile(
+        os.path.join(directory, "web", "index.html")
+    ):
+        directory = os.path.join(directory, "web")
+    if not os.path.isdir(directory):
+        print(f"No directory found at '{directory}'")
+        return None
+
+    host = getattr(args, "host", None) or "localhost"
+    port = getattr(args, "port", None) or 8000
+    handler = partial(_StaticRequestHandler, directory=directory)
+    try:
+        server = http.server.ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        print(f"Could not listen on {host}:{port}: {e}")
+        return None
+
+    url = f"http://{host}:{server.server_address[1]}/"
+    print(f"Serving {directory}")
+    print(f"URL: {url}")
+    print("\nPress Ctrl+C to stop the server")
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopped by user")
+    return url
@@ -0,0 +1,289 @@
+from .path import get_path, get_projects_path, _validate_name
+from .registry import update_project
+
+import contextlib
+import os
+import stat
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+TRASH_DIR = ".trash"
+# Entries being removed are moved in here, so they can no longer be restored
+# while a purge runs. Creating it is also the lock against concurrent purges.
+PURGING_DIR = ".purging"
+# A purge that has not made progress for this long is assumed to have died
+STALE_PURGE = 3600
+STAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+def _trash_path() -> str:
+    path = os.path.join(get_projects_path(), TRASH_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _split(entry: str) -> Tuple[str, Optional[datetime]]:
+    """Return the original name and the deletion time of a trash entry."""
+    stamp, _, name = entry.partition("-")
+    try:
+        return name, datetime.strptime(stamp, STAMP_FORMAT)
+    except ValueError:
+        return entry, None
+
+
+def _trashed() -> List[str]:
+    """Return the trash entries that are not being purged, oldest first."""
+    with os.scandir(_trash_path()) as it:
+        return sorted(entry.name for entry in it if not entry.name.startswith("."))
+
+
+def move_to_trash(path: str) -> str:
+    """Move a file or folder of the data directory into the trash.
+
+    The trash lives in the same directory, so this is a single rename no
+    matter how many files the folder holds.
+
+    Returns:
+        The path of the folder in the trash.
+    """
+    stamp = datetime.now().strftime(STAMP_FORMAT)
+    target = os.path.join(_trash_path(), f"{stamp}-{os.path.basename(path)}")
+    os.rename(path, target)
+    return target
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    # Junctions are not symlinks, but must not be followed either
+    if entry.is_symlink():
+        return True
+    attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+def _unlink(path: str, link: bool) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        if os.name != "nt":
+            raise
+        if link:
+            # Directory symlinks and junctions
+            os.rmdir(path)
+        else:
+            # Read-only files, e.g. in .git/objects
+            os.chmod(path, stat.S_IWRITE)
+            os.unlink(path)
+
+
+def _scan(directory: str, depth: int) -> Tuple[int, str, List[str], int, int]:
+    """Remove the files of one directory and return its subdirectories."""
+    subdirs = []
+    removed = errors = 0
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except FileNotFoundError:
+        return depth, directory, subdirs, removed, errors
+    for entry in entries:
+        try:
+            if _is_link(entry):
+                _unlink(entry.path, link=True)
+            elif entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+                continue
+            else:
+                _unlink(entry.path, link=False)
+            removed += 1
+        except OSError:
+            errors += 1
+    return depth, directory, subdirs, removed, errors
+
+
+def remove_tree(path: str, workers: Optional[int] = None) -> Dict[str, int]:
+    """Remove a folder with parallel scandir walks.
+
+    Every directory is listed and emptied of its files by a pool of threads,
+    then the directories are removed deepest first. Symlinks and junctions
+    are removed, never followed.
+
+    Returns:
+        The number of files and folders removed and the entries that failed.
+    """
+    stats = {"files": 0, "folders": 0, "errors": 0}
+    if os.path.islink(path) or os.path.isfile(path):
+        try:
+            _unlink(path, link=os.path.islink(path))
+            stats["files"] += 1
+        except OSError:
+            stats["errors"] += 1
+        return stats
+
+    folders = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan, path, 0)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth, directory, subdirs, removed, errors = future.result()
+                folders.append((depth, directory))
+                stats["files"] += removed
+                stats["errors"] += errors
+                pending |= {executor.submit(_scan, d, depth + 1) for d in subdirs}
+
+    for _, directory in sorted(folders, reverse=True):
+        try:
+            os.rmdir(directory)
+            stats["folders"] += 1
+        except FileNotFoundError:
+            pass
+        except OSError:
+            stats["errors"] += 1
+    return stats
+
+
+def _acquire(purging: str) -> bool:
+    try:
+        os.mkdir(purging)
+        return True
+    except FileExistsError:
+        pass
+    try:
+        if time.time() - os.stat(purging).st_mtime < STALE_PURGE:
+            return False
+    except FileNotFoundError:
+        return _acquire(purging)
+    # Left behind by a purge that was killed, take it over
+    os.utime(purging)
+    return True
+
+
+def purge(workers: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """Remove everything in the trash.
+
+    Returns:
+        The totals of remove_tree, or None if another purge is running. That
+        purge also picks up entries trashed while it runs.
+    """
+    purging = os.path.join(_trash_path(), PURGING_DIR)
+    totals = {"entries": 0, "files": 0, "folders": 0, "errors": 0}
+    while True:
+        if not _acquire(purging):
+            return None if not totals["entries"] else totals
+        try:
+            for entry in _trashed():
+                with contextlib.suppress(OSError):
+                    os.rename(os.path.join(_trash_path(), entry), os.path.join(purging, entry))
+            for entry in os.listdir(purging):
+                os.utime(purging)
+                for key, value in remove_tree(os.path.join(purging, entry), workers).items():
+                    totals[key] += value
+                totals["entries"] += 1
+        finally:
+            with contextlib.suppress(OSError):
+                os.rmdir(purging)
+        # Checked after releasing the lock: a purge started in the meantime
+        # saw the lock and left its entries to this one
+        if not _trashed():
+            return totals
+
+
+def purge_in_background() -> None:
+    """Empty the trash from a detached process."""
+    subprocess.Popen(
+        [sys.executable, "-c", "from pygame_cli.manager.trash import purge; purge()"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _list() -> None:
+    entries = _trashed()
+    purging = os.path.join(_trash_path(), PURGING_DIR)
+    with contextlib.suppress(OSError):
+        if os.listdir(purging):
+            print("A purge is running")
+    if not entries:
+        print("The trash is empty")
+        return
+    print("Total:", len(entries))
+    for entry in entries:
+        name, deleted = _split(entry)
+        when = deleted.strftime("%Y-%m-%d %H:%M:%S") if deleted else "unknown"
+        print(f"  - {name:<30} deleted {when}")
+
+
+def _restore(name: str) -> Optional[str]:
+    matches = [entry for entry in _trashed() if _split(entry)[0] == name]
+    if not matches:
+        print(f"No project named '{name}' in the trash")
+        return None
+    try:
+        _validate_name(name)
+    except ValueError as e:
+        print(f"Cannot restore '{name}': {e}")
+        return None
+
+    path = get_path(name)
+    if os.path.exists(path):
+        print(f"A project or folder named '{name}' already exists")
+        return None
+    try:
+        # The newest copy, if the name was deleted more than once
+        os.rename(os.path.join(_trash_path(), matches[-1]), path)
+    except OSError as e:
+        print(f"Failed to restore '{name}': {e}")
+        return None
+
+    update_project(name)
+    print(f"Project '{name}' restored")
+    return path
+
+
+def _purge() -> None:
+    start = time.perf_counter()
+    if not _trashed():
+        print("The trash is empty")
+        return
+    totals = purge()
+    if totals is None:
+        print("A purge is already running, it will empty the trash")
+        return
+    print(
+        f"✓ Removed {totals['entries']} item(s), {totals['files']} files "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    if totals["errors"]:
+        print(f"\t! {totals['errors']} files could not be removed")
+
+
+def manage_trash(args: Any) -> Optional[str]:
+    """Manage deleted projects.
+
+    `pygame delete` and `pygame format` move projects into the trash and
+    empty it in the background; with `delete --keep` the project stays there
+    until restored or purged.
+
+    Expects:
+      - args.trash_action (str): "list", "purge" or "restore"
+      - args.name (str): project name for "restore"
+    """
+    if not hasattr(args, "trash_action") or not args.trash_action:
+        raise ValueError("args.trash_action is required")
+
+    if args.trash_action in ("list", "ls"):
+        _list()
+    elif args.trash_action in ("purge", "empty"):
+        _purge()
+    elif args.trash_action == "restore":
+        return _restore(args.name)
+    else:
+        print(f"Unknown trash action '{args.trash_action}'")
+    return None
@@ -0,0 +1,203 @@
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Optional, Set, Tuple
+
+# Top level folders that never trigger a restart
+EXCLUDED_ROOTS = {".env", ".git", "build"}
+EXCLUDED_DIRS = {"__pycache__"}
+
+# How long the tree has to stay quiet before changes are reported
+DEBOUNCE = 0.3
+POLL_INTERVAL = 0.5
+
+# inotify(7) constants
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT = struct.Struct("iIII")
+
+
+def _ignored_file(name: str) -> bool:
+    # Editor swap and backup files
+    return name.endswith(("~", ".swp", ".swx", ".tmp")) or name.startswith(".#")
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Watcher:
+    """Watch a project tree for changes.
+
+    Uses inotify on Linux and falls back to polling file mtimes elsewhere.
+    `.env`, `.git`, `build` and `__pycache__` folders are ignored.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.closed = False
+        self._waiting = False
+        self._libc = _load_inotify()
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                self._libc = None
+        if self._libc is not None:
+            for directory in self._directories(root):
+                self._add_watch(directory)
+        else:
+            self._snapshot = self._scan()
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._libc is not None else "polling"
+
+    def _excluded(self, directory: str, name: str) -> bool:
+        if name in EXCLUDED_DIRS:
+            return True
+        return directory == self.root and name in EXCLUDED_ROOTS
+
+    def _directories(self, top: str):
+        for root, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not self._excluded(root, d)]
+            yield root
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), WATCH_MASK
+        )
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory in self._directories(self.root):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if _ignored_file(entry.name):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return snapshot
+
+    def _poll(self, timeout: float) -> Set[str]:
+        if self._libc is None:
+            time.sleep(timeout)
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            return changed
+
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(self.root)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            if mask & IN_ISDIR:
+                if self._excluded(directory, name):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for new_dir in self._directories(os.path.join(directory, name)):
+                        self._add_watch(new_dir)
+            elif _ignored_file(name):
+                continue
+            changed.add(os.path.join(directory, name))
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until something changes, then wait for the tree to settle.
+
+        Args:
+            timeout: Give up after this many seconds, None waits forever.
+
+        Returns:
+            The changed paths relative to the root (with `/` separators),
+            or an empty set on timeout or when the watcher is closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[str] = set()
+        self._waiting = True
+        try:
+            while not self.closed:
+                if not changed and deadline is not None and time.monotonic() >= deadline:
+                    break
+                found = self._poll(DEBOUNCE if changed else POLL_INTERVAL)
+                if found:
+                    changed |= found
+                elif changed:
+                    break
+        finally:
+            self._waiting = False
+            if self.closed:
+                self._close_fd()
+        return {
+            os.path.relpath(path, self.root).replace(os.sep, "/") for path in changed
+        }
+
+    def _close_fd(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def close(self) -> None:
+        """Stop watching. A pending wait() returns within POLL_INTERVAL."""
+        self.closed = True
+        # A wait() running in another thread closes the fd when it returns
+        if not self._waiting:
+            self._close_fd()
@@ -0,0 +1,190 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+HASH_LENGTH = 8
+MANIFEST_FILE = "asset-manifest.json"
+
+# Entry points keep their names, everything they reference gets hashed
+UNHASHED = {"index.html", "favicon.ico", "robots.txt", MANIFEST_FILE}
+# Text files whose references to hashed files are rewritten
+REWRITTEN = {".html", ".htm", ".js", ".mjs", ".css", ".json", ".webmanifest"}
+# Formats that are already compressed, not worth another pass
+COMPRESSED = {
+    ".gz", ".br", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+    ".ogg", ".mp3", ".woff", ".woff2", ".mp4", ".webm",
+}
+# Variants that save less than this are not kept
+MIN_SAVING = 0.05
+MIN_SIZE = 1024
+
+HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}\.[^./]+$" % HASH_LENGTH)
+
+
+def _relative_files(web_dir: str):
+    for root, _, files in os.walk(web_dir):
+        for file in files:
+            path = os.path.join(root, file)
+            yield os.path.relpath(path, web_dir).replace(os.sep, "/")
+
+
+def _reference(path: str) -> re.Pattern:
+    return re.compile(r"(?<![\w.-])" + re.escape(path) + r"(?![\w-])")
+
+
+def hash_names(web_dir: str) -> Dict[str, str]:
+    """Give static files content-hashed names and rewrite references to them.
+
+    `game.apk` becomes `game.1a2b3c4d.apk`, so it can be cached forever.
+    Only files whose path appears literally in a page or script are renamed,
+    a name built at runtime would otherwise break. The mapping is also
+    written to asset-manifest.json.
+
+    Returns:
+        The mapping from old to new relative paths.
+    """
+    texts = {}
+    for relative in _relative_files(web_dir):
+        if os.path.splitext(relative)[1] in REWRITTEN:
+            path = os.path.join(web_dir, relative)
+            with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+                texts[relative] = f.read()
+
+    candidates = set()
+    for relative in _relative_files(web_dir):
+        name = os.path.basename(relative)
+        if name in UNHASHED or HASHED_NAME.search(name):
+            continue
+        if os.path.splitext(name)[1] in {".gz", ".br"}:
+            continue
+        pattern = _reference(relative)
+        if any(pattern.search(text) for text in texts.values()):
+            candidates.add(relative)
+
+    # Hash files after the ones they reference, so a changed script also
+    # renames the pages that load it
+    order: List[str] = []
+    visited = set()
+
+    def visit(relative: str) -> None:
+        if relative in visited:
+            return
+        visited.add(relative)
+        for other in candidates:
+            if other != relative and _reference(other).search(texts.get(relative, "")):
+                visit(other)
+        order.append(relative)
+
+    for relative in sorted(candidates | set(texts)):
+        visit(relative)
+
+    renames: Dict[str, str] = {}
+
+    def rewrite(text: str) -> str:
+        # Longest first, so `a.js` does not rewrite part of `data.js.map`
+        for old, new in sorted(renames.items(), key=lambda item: -len(item[0])):
+            text = _reference(old).sub(new, text)
+        return text
+
+    for relative in order:
+        if relative in texts:
+            texts[relative] = rewrite(texts[relative])
+        if relative not in candidates:
+            continue
+        digest = hashlib.sha256()
+        if relative in texts:
+            digest.update(texts[relative].encode("utf-8", "surrogateescape"))
+        else:
+            with open(os.path.join(web_dir, relative), "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        stem, ext = os.path.splitext(relative)
+        renames[relative] = f"{stem}.{digest.hexdigest()[:HASH_LENGTH]}{ext}"
+
+    for relative, text in texts.items():
+        # Again with every rename, for references inside cycles
+        updated = rewrite(text)
+        path = os.path.join(web_dir, relative)
+        with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+            if f.read() == updated:
+                continue
+        with open(path, "w", encoding="utf-8", errors="surrogateescape") as f:
+            f.write(updated)
+
+    for old, new in renames.items():
+        os.replace(os.path.join(web_dir, old), os.path.join(web_dir, new))
+
+    with open(os.path.join(web_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(renames, f, indent=4, sort_keys=True)
+    return renames
+
+
+def _load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _compress_file(path: str, brotli) -> Dict[str, int]:
+    with open(path, "rb") as f:
+        data = f.read()
+    stat = os.stat(path)
+    variants = {".gz": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = lambda: brotli.compress(data, quality=11)
+
+    saved = {}
+    for suffix, compress in variants.items():
+        compressed = compress()
+        target = path + suffix
+        if len(compressed) > len(data) * (1 - MIN_SAVING):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, "wb") as f:
+            f.write(compressed)
+        # Same mtime as the original, so servers can tell they match
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        saved[suffix] = len(data) - len(compressed)
+    return saved
+
+
+def precompress(
+    web_dir: str, use_brotli: bool = False, workers: Optional[int] = None
+) -> Optional[Dict[str, int]]:
+    """Write .gz (and optionally .br) variants next to every worthwhile file.
+
+    Files are compressed in parallel, zlib and brotli release the GIL.
+
+    Returns:
+        The number of compressed files and the bytes saved per encoding, or
+        None if brotli was requested but is not installed.
+    """
+    brotli = None
+    if use_brotli:
+        brotli = _load_brotli()
+        if brotli is None:
+            return None
+
+    paths = []
+    for relative in _relative_files(web_dir):
+        path = os.path.join(web_dir, relative)
+        if os.path.splitext(relative)[1].lower() in COMPRESSED:
+            continue
+        if os.path.getsize(path) < MIN_SIZE:
+            continue
+        paths.append(path)
+
+    stats = {"files": 0, "gzip": 0, "brotli": 0}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for saved in executor.map(lambda path: _compress_file(path, brotli), paths):
+            stats["files"] += bool(saved)
+            stats["gzip"] += saved.get(".gz", 0)
+            stats["brotli"] += saved.get(".br", 0)
+    return stats
@@ -0,0 +1,114 @@
+import pygame
+import io
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+PACK_FILE = "assets.pak"
+PACK_MAGIC = b"PGPK"
+HEADER = struct.Struct("<4sHHIQ32s")
+ENTRY = struct.Struct("<HQQQB")
+COMPRESSION_ZLIB = 1
+
+
+def _root():
+    # Frozen builds keep the pack next to the executable
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+class _EntryReader(io.RawIOBase):
+    """A read-only, seekable view of one entry, without copying it."""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self._view) - self._pos)
+        buffer[:size] = self._view[self._pos : self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, min(offset, len(self._view)))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class AssetPack:
+    """Read assets from the pack made by `pygame build --pack`.
+
+    The pack is memory-mapped, so entries are read straight from it without
+    being extracted. Paths are the original ones relative to the project,
+    e.g. `assets/player.png`. Files missing from the pack (or every file when
+    there is no pack, like when running from source) are opened from disk.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or _root()
+        self.entries = {}
+        self._data = None
+
+        pack_path = os.path.join(self.root, PACK_FILE)
+        if not os.path.exists(pack_path):
+            return
+
+        with open(pack_path, "rb") as f:
+            try:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # No mmap support (e.g. in the browser), read it whole instead
+                self._data = f.read()
+
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"{pack_path} is not an asset pack")
+        magic, _, _, count, offset, _ = HEADER.unpack_from(self._data, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{pack_path} is not an asset pack")
+        try:
+            for _ in range(count):
+                length, start, size, original_size, compression = ENTRY.unpack_from(
+                    self._data, offset
+                )
+                offset += ENTRY.size
+                name = bytes(self._data[offset : offset + length]).decode("utf-8")
+                offset += length
+                self.entries[name] = (start, size, compression)
+        except struct.error:
+            raise ValueError(f"{pack_path} is truncated") from None
+        self._view = memoryview(self._data)
+
+    def __contains__(self, path):
+        return path.replace("\\", "/") in self.entries
+
+    def open(self, path):
+        entry = self.entries.get(path.replace("\\", "/"))
+        if entry is None:
+            return open(os.path.join(self.root, path), "rb")
+        start, size, compression = entry
+        view = self._view[start : start + size]
+        if compression == COMPRESSION_ZLIB:
+            return io.BytesIO(zlib.decompress(view))
+        return io.BufferedReader(_EntryReader(view))
+
+    def load_image(self, path):
+        return pygame.image.load(self.open(path), os.path.basename(path))
+
+    def load_sound(self, path):
+        return pygame.mixer.Sound(self.open(path))
@@ -0,0 +1,59 @@
+import pygame
+import json
+import os
+import sys
+
+ATLAS_DIR = "atlas"
+
+
+def _root():
+    # Frozen builds keep the atlas next to the executable
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+class Atlas:
+    """Load images by their original path, from a texture atlas if one was built.
+
+    `pygame build --atlas` packs the PNGs under assets/ into a few atlas pages.
+    Images found in the atlas are returned as subsurfaces of a page, anything
+    else (or every image when running from source) is loaded from its file.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or _root()
+        self.pages = []
+        self.images = {}
+        self._surfaces = {}
+
+        index_file = os.path.join(self.root, ATLAS_DIR, "index.json")
+        if os.path.exists(index_file):
+            with open(index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.pages = [None] * len(index["pages"])
+            self._page_files = index["pages"]
+            self.images = index["images"]
+
+    def _page(self, number):
+        page = self.pages[number]
+        if page is None:
+            page = pygame.image.load(
+                os.path.join(self.root, ATLAS_DIR, self._page_files[number])
+            )
+            if pygame.display.get_surface() is not None:
+                page = page.convert_alpha()
+            self.pages[number] = page
+        return page
+
+    def load(self, path):
+        path = path.replace("\\", "/")
+        surface = self._surfaces.get(path)
+        if surface is None:
+            entry = self.images.get(path)
+            if entry is None:
+                surface = pygame.image.load(os.path.join(self.root, path))
+            else:
+                surface = self._page(entry[0]).subsurface(entry[1:])
+            self._surfaces[path] = surface
+        return surface
@@ -0,0 +1,153 @@
+import json
+import os
+from array import array
+from time import perf_counter
+
+# Set by `pygame run --frame-stats [FILE]`
+ENABLE_ENV = "PYGAME_FRAME_STATS"
+OUTPUT_ENV = "PYGAME_FRAME_STATS_OUTPUT"
+
+# Histogram buckets, as multiples of the frame budget (1 / MAX_FPS)
+BUCKETS = (0.5, 1.0, 1.25, 1.5, 2.0, 3.0)
+
+
+class FrameStats:
+    """Per-frame timings of the update, render and flip phases.
+
+    Timings go into ring buffers allocated up front, so recording a frame
+    does not grow any list. Does nothing unless enabled through the
+    environment (see `pygame run --frame-stats`).
+    """
+
+    def __init__(self, max_fps, capacity=3600):
+        self.enabled = os.environ.get(ENABLE_ENV) == "1"
+        self.output = os.environ.get(OUTPUT_ENV) or None
+        self.budget = 1000 / max_fps if max_fps else 0.0
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self._start = self._phase = 0.0
+        if self.enabled:
+            self.update = array("d", bytes(8 * capacity))
+            self.render = array("d", bytes(8 * capacity))
+            self.flip = array("d", bytes(8 * capacity))
+            self.frame = array("d", bytes(8 * capacity))
+
+    def begin(self):
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self._start:
+            # The previous frame ends where this one starts (clock.tick included)
+            elapsed = (now - self._start) * 1000
+            self.frame[(self.count - 1) % self.capacity] = elapsed
+            if self.budget:
+                self.dropped += max(0, round(elapsed / self.budget) - 1)
+        self._start = self._phase = now
+        self.count += 1
+
+    def _mark(self, buffer):
+        if not self._start:
+            return
+        now = perf_counter()
+        buffer[(self.count - 1) % self.capacity] = (now - self._phase) * 1000
+        self._phase = now
+
+    def updated(self):
+        if self.enabled:
+            self._mark(self.update)
+
+    def rendered(self):
+        if self.enabled:
+            self._mark(self.render)
+
+    def flipped(self):
+        if self.enabled:
+            self._mark(self.flip)
+
+    def _frames(self):
+        # Completed frames only, oldest first. The current frame's slot still
+        # holds the frame it is overwriting, so a full ring keeps capacity - 1
+        done = min(self.count - 1, self.capacity - 1)
+        current = (self.count - 1) % self.capacity
+        return [(current - done + i) % self.capacity for i in range(done)]
+
+    def summary(self):
+        order = self._frames()
+        frames = sorted(self.frame[i] for i in order)
+        if not frames:
+            return None
+
+        def percentile(p):
+            return frames[min(len(frames) - 1, int(len(frames) * p / 100))]
+
+        limits = [b * self.budget for b in BUCKETS]
+        histogram = [0] * (len(limits) + 1)
+        for value in frames:
+            bucket = 0
+            while bucket < len(limits) and value >= limits[bucket]:
+                bucket += 1
+            histogram[bucket] += 1
+
+        return {
+            "frames": self.count - 1,
+            "sampled": len(frames),
+            "budget_ms": round(self.budget, 3),
+            "p50_ms": round(percentile(50), 3),
+            "p95_ms": round(percentile(95), 3),
+            "p99_ms": round(percentile(99), 3),
+            "max_ms": round(frames[-1], 3),
+            "dropped": self.dropped,
+            "update_ms": round(sum(self.update[i] for i in order) / len(order), 3),
+            "render_ms": round(sum(self.render[i] for i in order) / len(order), 3),
+            "flip_ms": round(sum(self.flip[i] for i in order) / len(order), 3),
+            "histogram": {
+                **{f"<{b}x": n for b, n in zip(BUCKETS, histogram)},
+                f">={BUCKETS[-1]}x": histogram[-1],
+            },
+        }
+
+    def report(self):
+        if not self.enabled:
+            return
+        summary = self.summary()
+        if summary is None:
+            print("Frame stats: no frames recorded")
+            return
+
+        print("----------- Frame stats -----------")
+        print(f"Frames:  {summary['frames']} ({summary['dropped']} dropped)")
+        print(f"Budget:  {summary['budget_ms']:.2f} ms")
+        print(
+            f"Frame:   p50 {summary['p50_ms']:.2f} ms | p95 {summary['p95_ms']:.2f} ms"
+            f" | p99 {summary['p99_ms']:.2f} ms | max {summary['max_ms']:.2f} ms"
+        )
+        print(
+            f"Phases:  update {summary['update_ms']:.2f} ms | render "
+            f"{summary['render_ms']:.2f} ms | flip {summary['flip_ms']:.2f} ms"
+        )
+        largest = max(summary["histogram"].values())
+        for label, count in summary["histogram"].items():
+            bar = "#" * round(30 * count / largest) if largest else ""
+            print(f"  {label:>7} budget {count:>7} {bar}")
+        print("-----------------------------------")
+
+        if self.output:
+            self.save(self.output, summary)
+            print(f"Frame stats written to {self.output}")
+
+    def save(self, path, summary=None):
+        """Write the summary as JSON, or every sampled frame as CSV."""
+        if path.lower().endswith(".csv"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("frame,update_ms,render_ms,flip_ms,frame_ms\n")
+                order = self._frames()
+                first = self.count - 1 - len(order)
+                for n, i in enumerate(order):
+                    f.write(
+                        f"{first + n},{self.update[i]:.3f},{self.render[i]:.3f},"
+                        f"{self.flip[i]:.3f},{self.frame[i]:.3f}\n"
+                    )
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary or self.summary(), f, indent=4)
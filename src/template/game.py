@@ -1,5 +1,11 @@
 import pygame
 import asyncio
+import signal
+from atlas import Atlas
+from frame_stats import FrameStats
+
+# Posted when `pygame run --watch --reload-assets` sees changes in assets/
+ASSETS_CHANGED = pygame.event.custom_type()
 
 
 class Game:
@@ -10,24 +16,42 @@ class Game:
 
     def start(self):
         self.display = pygame.display.set_mode(self.size)
+        self.images = Atlas()  # self.images.load("assets/<file>.png")
         self.clock = pygame.time.Clock()
+        self.stats = FrameStats(self.max_fps)  # pygame run --frame-stats
         self.fps = 0
         self.dt = 0
         self.running = True
 
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(
+                signal.SIGUSR1,
+                lambda *_: pygame.event.post(pygame.event.Event(ASSETS_CHANGED)),
+            )
+
+    def reload_assets(self):
+        self.images = Atlas()
+
     def update(self):
+        self.stats.begin()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == ASSETS_CHANGED:
+                self.reload_assets()
+        self.stats.updated()
 
         self.display.fill("yellow")
+        self.stats.rendered()
 
         pygame.display.flip()
+        self.stats.flipped()
 
         self.dt = self.clock.tick(self.max_fps) / 1000
 
     def exit(self):
         self.running = False
+        self.stats.report()
 
     async def run(self):
         self.start()
@@ -0,0 +1,104 @@
+# Bench bootstrap test for the pygame-cli library.
+# Runs the bench bootstrap against a stub pygame, so no display or real
+# pygame install is needed.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+from manager.bench import BOOTSTRAP
+
+# Like pygame-ce's C type, the stub Clock refuses to be subclassed
+STUB_PYGAME = textwrap.dedent("""\
+    import atexit
+    import json
+    import os
+    import types
+
+    framerates = []
+
+    class Clock:
+        def __init_subclass__(cls, **kwargs):
+            raise TypeError("type 'pygame.time.Clock' is not an acceptable base type")
+
+        def tick(self, framerate=0):
+            framerates.append(framerate)
+            return 16
+
+        def tick_busy_loop(self, framerate=0):
+            return self.tick(framerate)
+
+        def get_fps(self):
+            return 60.0
+
+    time = types.SimpleNamespace(Clock=Clock)
+    display = types.SimpleNamespace(flip=lambda: None, update=lambda *rects: None)
+    version = types.SimpleNamespace(ver="stub")
+
+    @atexit.register
+    def _save():
+        with open(os.environ["STUB_FRAMERATES"], "w") as f:
+            json.dump(framerates, f)
+    """)
+
+MAIN = textwrap.dedent("""\
+    import pygame
+
+    clock = pygame.time.Clock()
+    assert clock.get_fps() == 60.0
+    for _ in range(100):
+        clock.tick(60)
+        pygame.display.flip()
+    """)
+
+
+def run_bootstrap(root: Path, uncapped: bool):
+    output_file = root / "bench.json"
+    env = dict(os.environ, PYTHONPATH=str(root / "stub"))
+    env["STUB_FRAMERATES"] = str(root / "ticks.json")
+    # 5 warmup frames, then 20 measured frames and no time limit
+    args = [str(output_file), "5", "20", "0", "1" if uncapped else "0"]
+    result = subprocess.run(
+        [sys.executable, str(root / "bench_main.py"), *args],
+        cwd=root / "game",
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    with open(output_file) as f:
+        raw = json.load(f)
+    with open(root / "ticks.json") as f:
+        return raw, json.load(f)
+
+
+try:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "stub" / "pygame").mkdir(parents=True)
+        (root / "stub" / "pygame" / "__init__.py").write_text(STUB_PYGAME)
+        (root / "game").mkdir()
+        (root / "game" / "main.py").write_text(MAIN)
+        (root / "bench_main.py").write_text(BOOTSTRAP)
+
+        print("[1] Testing the bootstrap counts frames after the warmup...")
+        raw, framerates = run_bootstrap(root, uncapped=False)
+        assert len(raw["frame_times_ms"]) == 20, raw
+        assert raw["pygame"] == "stub"
+        assert set(framerates) == {60}, framerates
+
+        print("[2] Testing --uncapped wraps a Clock that can't be subclassed...")
+        raw, framerates = run_bootstrap(root, uncapped=True)
+        assert len(raw["frame_times_ms"]) == 20, raw
+        assert framerates and set(framerates) == {0}, framerates
+
+    print("[PASS] Test complete. No errors detected.")
+    sys.exit(0)
+
+except Exception as e:
+    print(f"\n[FAIL] Test failed with exception: {e!r}")
+    sys.exit(1)
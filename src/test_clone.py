@@ -0,0 +1,108 @@
+# Clone test for the pygame-cli library.
+# Uses local bare repositories as the remotes, so no network is needed.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+
+from manager.clone import clone_project
+from manager.path import get_path, valid_project
+from manager.registry import registered_projects, remove_project
+
+NAMES = ["test_clone_shallow", "test_clone_a", "test_clone_b"]
+
+
+def git(*args, cwd=None):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def make_remote(root: Path, name: str) -> str:
+    work = root / f"{name}-work"
+    work.mkdir()
+    git("init", "-q", str(work))
+    (work / "metadata.json").write_text('{"name": "%s"}' % name)
+    (work / "requirements.txt").write_text("")
+    (work / "main.py").write_text("print('hello')\n")
+    for folder in ("assets", "docs"):
+        (work / folder).mkdir()
+    for i in range(3):
+        (work / "assets" / "big.bin").write_bytes(os.urandom(64 * 1024))
+        (work / "docs" / "notes.txt").write_text(str(i))
+        git("add", "-A", cwd=work)
+        git("commit", "-q", "-m", f"commit {i}", cwd=work)
+    bare = root / f"{name}.git"
+    git("clone", "-q", "--bare", str(work), str(bare))
+    git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    return bare.as_uri()
+
+
+def cleanup():
+    for name in NAMES:
+        if os.path.exists(get_path(name)):
+            shutil.rmtree(get_path(name), ignore_errors=True)
+        remove_project(name)
+
+
+try:
+    cleanup()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+
+        print("[1] Creating bare repositories...")
+        remote_a = make_remote(root, "a")
+        remote_b = make_remote(root, "b")
+
+        print("[2] Testing a shallow, partial and sparse clone...")
+        args = SimpleNamespace(
+            source=remote_a,
+            name=NAMES[0],
+            depth=1,
+            branch=None,
+            filter="blob:none",
+            sparse=["docs"],
+        )
+        with redirect_stdout(StringIO()):
+            path = clone_project(args)
+        assert path is not None and valid_project(NAMES[0])
+        log = subprocess.run(
+            ["git", "rev-list", "--count", "HEAD"], cwd=path, capture_output=True, text=True
+        )
+        assert log.stdout.strip() == "1", "expected a single commit"
+        assert os.path.isfile(os.path.join(path, "docs", "notes.txt"))
+        assert not os.path.exists(os.path.join(path, "assets")), "assets/ was checked out"
+
+        print("[3] Testing a manifest clone with 2 workers...")
+        manifest = root / "manifest.txt"
+        manifest.write_text(f"# test\n{remote_a} {NAMES[1]}\n{remote_b} {NAMES[2]}\n")
+        args = SimpleNamespace(manifest=str(manifest), jobs=2, source=None)
+        output = StringIO()
+        with redirect_stdout(output):
+            clone_project(args)
+        assert valid_project(NAMES[1]) and valid_project(NAMES[2])
+        assert "Cloned 2/2 projects" in output.getvalue()
+        assert f"[{NAMES[1]}] Receiving objects" in output.getvalue()
+
+        print("[4] Testing the clones are registered...")
+        assert set(NAMES) <= set(registered_projects())
+
+    print("[5] Cleaning up test projects...")
+    cleanup()
+
+    print("[PASS] Test complete. No errors detected.")
+    sys.exit(0)
+
+except Exception as e:
+    cleanup()
+    print(f"\n[FAIL] Test failed with exception: {e!r}")
+    sys.exit(1)
@@ -0,0 +1,147 @@
+# Shared env test for the pygame-cli library.
+# Dedupes two fake venvs, shares and unshares a project's venv and clones
+# the seed venv. Building the seed needs network access once.
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import manager.envs
+from manager.dedupe import _store_path, collect_garbage, dedupe_env
+from manager.envs import ENVS_DIR, _load_refs, env_key, manage_envs, shared_key
+from manager.path import create_path, get_path, get_projects_path
+from manager.registry import remove_project, update_project
+from manager.run import _requirements_fingerprint
+from manager.seed import LOCK_SUFFIX, _clone_seed, _seed
+from manager.trash import _trash_path, _trashed, remove_tree
+
+NAMES = ["test_envs_a", "test_envs_b", "test_envs_shared"]
+UNUSED_POOL = f"py{sys.version_info[0]}{sys.version_info[1]}-test-envs-unused"
+SCRIPTS = "Scripts" if os.name == "nt" else "bin"
+
+# The real trash may hold the user's projects, only our entries are removed
+manager.envs.purge_in_background = lambda: None
+trashed_before = set(_trashed())
+
+
+def make_project(name: str, package: bytes) -> Path:
+    path = Path(create_path(name))
+    for folder in (".git", ".env/lib/site-packages/pkg"):
+        (path / folder).mkdir(parents=True, exist_ok=True)
+    (path / "metadata.json").write_text("{}")
+    (path / "requirements.txt").write_text("")
+    (path / ".env/lib/site-packages/pkg/data.bin").write_bytes(package)
+    update_project(name)
+    return path
+
+
+def cleanup():
+    for name in NAMES:
+        path = Path(get_path(name))
+        if shared_key(path) is not None:
+            os.unlink(path / ".env")
+        shutil.rmtree(path, ignore_errors=True)
+        remove_project(name)
+    unused = os.path.join(get_projects_path(), ENVS_DIR, UNUSED_POOL)
+    shutil.rmtree(unused, ignore_errors=True)
+    shutil.rmtree(unused + LOCK_SUFFIX, ignore_errors=True)
+    for entry in set(_trashed()) - trashed_before:
+        remove_tree(os.path.join(_trash_path(), entry))
+
+
+try:
+    cleanup()
+
+    print("[1] Testing two venvs share their package files after dedupe...")
+    package = os.urandom(64 * 1024)
+    digest = hashlib.sha256(package).hexdigest()
+    entry = os.path.join(_store_path(), digest[:2], digest)
+    files = [make_project(name, package) / ".env/lib/site-packages/pkg/data.bin" for name in NAMES[:2]]
+    stats = [dedupe_env(file.parents[3]) for file in files]
+    if None in stats:
+        print("\t! The filesystem does not support hardlinks, skipping")
+    else:
+        assert os.stat(files[0]).st_ino == os.stat(files[1]).st_ino, "not linked"
+        assert os.stat(entry).st_ino == os.stat(files[0]).st_ino, "not in the store"
+        assert stats[0]["stored"] == 1 and stats[1]["saved"] == len(package), stats
+
+        print("[2] Testing dedupe --gc keeps the files still in use...")
+        collect_garbage()
+        assert os.path.isfile(entry), "removed a linked store file"
+        assert files[0].read_bytes() == package
+        for file in files:
+            shutil.rmtree(file.parents[3])
+        collect_garbage()
+        assert not os.path.exists(entry), "kept an unused store file"
+
+    print("[3] Testing env share and unshare round-trip .env...")
+    path = make_project(NAMES[2], b"")
+    with redirect_stdout(StringIO()):
+        manage_envs(SimpleNamespace(env_action="share", name=[NAMES[2]]))
+    key = env_key(path / "requirements.txt")
+    assert shared_key(path) == key, "not shared"
+    assert NAMES[2] in _load_refs().get(key, []), "not referenced"
+
+    print("[4] Testing env gc only removes unused envs...")
+    unused = os.path.join(get_projects_path(), ENVS_DIR, UNUSED_POOL)
+    os.makedirs(unused)
+    os.mkdir(unused + LOCK_SUFFIX)
+    with redirect_stdout(StringIO()):
+        manage_envs(SimpleNamespace(env_action="gc"))
+    assert os.path.isdir(unused), "removed an env being built"
+    os.rmdir(unused + LOCK_SUFFIX)
+    with redirect_stdout(StringIO()):
+        manage_envs(SimpleNamespace(env_action="gc"))
+    pools = os.listdir(os.path.join(get_projects_path(), ENVS_DIR))
+    assert UNUSED_POOL not in pools, "kept an unused env"
+    assert key in pools and shared_key(path) == key, "removed an env in use"
+
+    # Comments and spacing do not make pip run again in a shared env
+    fingerprint = _requirements_fingerprint(path / ".env", path / "requirements.txt")
+    (path / "requirements.txt").write_text("# no requirements\n\n")
+    assert _requirements_fingerprint(path / ".env", path / "requirements.txt") == fingerprint
+
+    with redirect_stdout(StringIO()):
+        manage_envs(SimpleNamespace(env_action="unshare", name=[NAMES[2]]))
+    assert shared_key(path) is None and not os.path.islink(path / ".env"), "still shared"
+    assert NAMES[2] not in _load_refs().get(key, []), "still referenced"
+    assert (path / ".env" / "pyvenv.cfg").is_file(), "no venv"
+
+    print("[5] Testing a venv cloned from the seed points to itself...")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with redirect_stdout(StringIO()):
+            seed = _seed()
+        venv_dir = Path(temp_dir) / "venv"
+        _clone_seed(seed, venv_dir)
+        pip = "pip.exe" if os.name == "nt" else "pip"
+        for file in ("pyvenv.cfg", f"{SCRIPTS}/activate", f"{SCRIPTS}/{pip}"):
+            data = (venv_dir / file).read_bytes()
+            assert os.fsencode(str(seed)) not in data, f"{file} names the seed"
+            if file != "pyvenv.cfg":
+                assert os.fsencode(str(venv_dir)) in data, f"{file} does not name the venv"
+        python = venv_dir / SCRIPTS / ("python.exe" if os.name == "nt" else "python")
+        prefix = subprocess.run(
+            [str(python), "-c", "import sys; print(sys.prefix)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        assert os.path.samefile(prefix, venv_dir), f"sys.prefix is {prefix}"
+
+    print("[6] Cleaning up test projects...")
+    cleanup()
+
+    print("[PASS] Test complete. No errors detected.")
+    sys.exit(0)
+
+except Exception as e:
+    cleanup()
+    print(f"\n[FAIL] Test failed with exception: {e!r}")
+    sys.exit(1)
@@ -0,0 +1,78 @@
+# Requirements install test for the pygame-cli library.
+# pip is replaced by a fake, so no network or real venv is needed.
+
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import manager.run
+from manager.run import FINGERPRINT_FILE, _install_requirements_into_venv
+
+calls = []
+returncode = 0
+
+
+def fake_run(cmd, **kwargs):
+    calls.append(cmd)
+    stderr = b"Collecting nope\nERROR: No matching distribution found for nope\n"
+    return subprocess.CompletedProcess(cmd, returncode, b"", stderr)
+
+
+manager.run.subprocess.run = fake_run
+manager.run.dedupe_after_install = lambda venv_dir: calls.append("dedupe")
+
+try:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        venv_dir = Path(temp_dir) / ".env"
+        venv_dir.mkdir()
+        (venv_dir / "pyvenv.cfg").write_text("version = 3.11.7\n")
+        req_file = Path(temp_dir) / "requirements.txt"
+        req_file.write_text("pygame-ce\n")
+
+        print("[1] Testing a first install runs pip and saves the fingerprint...")
+        with redirect_stdout(StringIO()):
+            assert _install_requirements_into_venv(venv_dir, req_file)
+        assert len(calls) == 2 and calls[1] == "dedupe", calls
+        assert (venv_dir / FINGERPRINT_FILE).is_file(), "no fingerprint"
+
+        print("[2] Testing unchanged requirements skip pip...")
+        calls.clear()
+        output = StringIO()
+        with redirect_stdout(output):
+            assert not _install_requirements_into_venv(venv_dir, req_file)
+        assert not calls, calls
+        assert "skipped pip install" in output.getvalue()
+
+        print("[3] Testing a failed pip install is reported...")
+        req_file.write_text("pygame-ce\nnope\n")
+        returncode = 1
+        output = StringIO()
+        try:
+            with redirect_stdout(output):
+                _install_requirements_into_venv(venv_dir, req_file)
+            raise AssertionError("no error raised")
+        except subprocess.CalledProcessError as e:
+            assert e.returncode == 1
+        assert "dedupe" not in calls, "deduped a failed install"
+        assert "exit code 1" in output.getvalue()
+        assert "No matching distribution" in output.getvalue()
+        assert "Installed requirements" not in output.getvalue()
+
+        print("[4] Testing the failed install is retried on the next run...")
+        calls.clear()
+        with redirect_stdout(StringIO()):
+            try:
+                _install_requirements_into_venv(venv_dir, req_file)
+            except subprocess.CalledProcessError:
+                pass
+        assert calls, "pip was skipped after a failure"
+
+    print("[PASS] Test complete. No errors detected.")
+    sys.exit(0)
+
+except Exception as e:
+    print(f"\n[FAIL] Test failed with exception: {e!r}")
+    sys.exit(1)
@@ -0,0 +1,88 @@
+# Cold start benchmark for the pygame-cli commands.
+# Measures `python -X importtime` for each subcommand and fails when a
+# command imports more than its budget or a module it should not need.
+
+import subprocess
+import sys
+
+RUNS = 3
+
+# Milliseconds of imports (pygame_cli and everything it pulls in) per command
+CORE_BUDGET = 50  # `pygame`, `pygame --version`, `pygame --help`
+DEFAULT_BUDGET = 100
+BUDGETS = {
+    "run": 300,
+    "bench": 300,
+    "build": 300,
+    "new": 500,
+    "clone": 500,
+}
+
+# Heavy modules and the only commands allowed to import them
+HEAVY_MODULES = {
+    "git": {"new", "clone"},
+    "urllib.request": {"build"},
+}
+
+
+def measure(modules):
+    """Return the import time in ms and the imported module names."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        imported.add(name.strip())
+        # Top level imports of the -c script only, not interpreter startup
+        if name.startswith(" pygame_cli"):
+            total += int(cumulative)
+    return total / 1000, imported
+
+
+try:
+    from pygame_cli.cli import COMMANDS
+
+    failed = False
+    checks = [("(none)", ["pygame_cli.cli"], CORE_BUDGET)]
+    for command, (module, _) in COMMANDS.items():
+        modules = ["pygame_cli.cli", f"pygame_cli.manager.{module}"]
+        checks.append((command, modules, BUDGETS.get(command, DEFAULT_BUDGET)))
+
+    for n, (command, modules, budget) in enumerate(checks, start=1):
+        # Best of a few runs, the first one may pay for a cold disk cache
+        results = [measure(modules) for _ in range(RUNS)]
+        elapsed = min(ms for ms, _ in results)
+        imported = results[0][1]
+
+        problems = []
+        if elapsed > budget:
+            problems.append(f"over budget ({budget} ms)")
+        for heavy, allowed in HEAVY_MODULES.items():
+            if heavy in imported and command not in allowed:
+                problems.append(f"imports {heavy}")
+
+        mark = "✗" if problems else "✓"
+        print(f"[{n}] {command:<10} {elapsed:>7.1f} ms {mark} {', '.join(problems)}")
+        failed |= bool(problems)
+
+    if failed:
+        print("\n[FAIL] Startup time regressed.")
+        sys.exit(1)
+    print("[PASS] Startup within budget.")
+    sys.exit(0)
+
+except Exception as e:
+    print(f"\n[FAIL] Startup benchmark failed with exception: {e}")
+    sys.exit(1)
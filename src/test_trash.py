@@ -0,0 +1,84 @@
+# Trash test for the pygame-cli library.
+# Deletes a fake project into the trash, restores it and purges it again.
+
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from types import SimpleNamespace
+
+from manager.delete import delete_project
+from manager.path import create_path, get_path, valid_project
+from manager.registry import registered_projects, update_project
+from manager.trash import manage_trash, remove_tree, _trash_path, _trashed
+
+NAME = "test_trash_project"
+
+
+def make_project(outside: str) -> str:
+    path = create_path(NAME)
+    for folder in (".env/lib/site-packages/pkg", ".git/objects", "assets"):
+        os.makedirs(os.path.join(path, folder))
+    for file in ("metadata.json", "requirements.txt", "main.py"):
+        with open(os.path.join(path, file), "w") as f:
+            f.write("{}")
+    for i in range(200):
+        with open(os.path.join(path, ".env/lib/site-packages/pkg", f"m{i}.py"), "w") as f:
+            f.write("x = 1\n")
+    # Links out of the project must be removed, not followed
+    os.symlink(outside, os.path.join(path, "assets", "shared"), target_is_directory=True)
+    update_project(NAME)
+    return path
+
+
+def ours():
+    return [entry for entry in _trashed() if entry.endswith(f"-{NAME}")]
+
+
+def cleanup():
+    shutil.rmtree(get_path(NAME), ignore_errors=True)
+    for entry in ours():
+        remove_tree(os.path.join(_trash_path(), entry))
+
+
+try:
+    cleanup()
+    with tempfile.TemporaryDirectory() as outside:
+        with open(os.path.join(outside, "keep.txt"), "w") as f:
+            f.write("keep")
+
+        print("[1] Testing delete --keep moves the project to the trash...")
+        path = make_project(outside)
+        args = SimpleNamespace(name=NAME, force=True, keep=True)
+        with redirect_stdout(StringIO()):
+            delete_project(args)
+        assert not os.path.exists(path)
+        assert NAME not in registered_projects(), "still in the registry"
+        assert ours(), "not in the trash"
+
+        print("[2] Testing trash restore...")
+        with redirect_stdout(StringIO()):
+            restored = manage_trash(SimpleNamespace(trash_action="restore", name=NAME))
+        assert restored == path and valid_project(NAME)
+        assert NAME in registered_projects(), "not registered again"
+
+        print("[3] Testing the trashed project is removed without following symlinks...")
+        with redirect_stdout(StringIO()):
+            delete_project(args)
+        stats = remove_tree(os.path.join(_trash_path(), ours()[0]), workers=4)
+        assert not ours(), "still in the trash"
+        assert stats["errors"] == 0 and stats["files"] >= 203, stats
+        assert os.path.isfile(os.path.join(outside, "keep.txt")), "followed a symlink"
+
+    print("[4] Cleaning up test projects...")
+    cleanup()
+
+    print("[PASS] Test complete. No errors detected.")
+    sys.exit(0)
+
+except Exception as e:
+    cleanup()
+    print(f"\n[FAIL] Test failed with exception: {e!r}")
+    sys.exit(1)